@@ -6,6 +6,9 @@ import prometheus_client.multiprocess
 from prometheus_client import CollectorRegistry, make_asgi_app
 
 from .config import VERSION
+from .src.repos import OSRepo
+from .src.repos.duckdb import get_pool
+from .src.repos.mongo.client import close_async_clients
 
 from .routers.auth import (
     callback,
@@ -25,6 +28,7 @@ from .routers.datasets import (
     ingest_dataset,
     stage_dataset,
     update_dataset,
+    upload_large_dataset_files,
 )
 from .routers.notifications import notifications
 from .routers.changes import changes
@@ -35,6 +39,7 @@ from .routers.models import (
     ingest_model,
     stage_model,
     update_model,
+    upload_large_model_files,
 )
 from .routers.pipelines import (
     ingest_pipeline,
@@ -111,12 +116,14 @@ app.include_router(retrieve_dataset.router, prefix="/datasets", tags=["datasets"
 app.include_router(ingest_dataset.router, prefix="/datasets", tags=["datasets"])
 app.include_router(stage_dataset.router, prefix="/datasets", tags=["datasets"])
 app.include_router(update_dataset.router, prefix="/datasets", tags=["datasets"])
+app.include_router(upload_large_dataset_files.router, prefix="/datasets", tags=["datasets"])
 # models
 app.include_router(retrieve_models.router, prefix="/models", tags=["models"])
 app.include_router(create_model.router, prefix="/models", tags=["models"])
 app.include_router(ingest_model.router, prefix="/models", tags=["models"])
 app.include_router(stage_model.router, prefix="/models", tags=["models"])
 app.include_router(update_model.router, prefix="/models", tags=["models"])
+app.include_router(upload_large_model_files.router, prefix="/models", tags=["models"])
 # pipelines
 app.include_router(ingest_pipeline.router, prefix="/pipelines", tags=["pipelines"])
 app.include_router(retrieve_pipelines.router, prefix="/pipelines", tags=["pipelines"])
@@ -147,6 +154,19 @@ metrics_app = make_metrics_app()
 app.mount("/metrics", metrics_app)
 
 
+@app.on_event("startup")
+def startup():
+    # create the bucket once, instead of checking it on every request
+    OSRepo().provision_bucket()
+    # load the duckdb extensions before the first STAC query
+    get_pool()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await close_async_clients()
+
+
 logging.basicConfig(
     filename="/tmp/eotdl-api.log",
     level=logging.DEBUG,
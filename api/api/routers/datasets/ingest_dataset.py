@@ -9,6 +9,7 @@ from ..auth import get_current_user
 from ...src.models import User
 from ...src.usecases.datasets import (
     ingest_dataset_file,
+    ingest_dataset_files,
     complete_dataset_ingestion
 )
 from .responses import ingest_files_responses
@@ -52,6 +53,34 @@ async def ingest_files(
         traceback.print_exc()
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
+class IngestDatasetFilesBody(BaseModel):
+    file_names: List[str]
+
+@router.post(
+    "/{dataset_id}/batch",
+    summary="Ingest several files to a dataset",
+    responses=ingest_files_responses,
+)
+async def ingest_files_batch(
+    dataset_id: str = Path(..., description="ID of the dataset"),
+    body: IngestDatasetFilesBody = Body(..., description="Names of the files to ingest"),
+    user: User = Depends(get_current_user),
+):
+    """
+    Generate the presigned urls to upload several files to an existing dataset with a single request.
+    """
+    try:
+        presigned_urls = await ingest_dataset_files(
+            body.file_names, dataset_id, user
+        )
+        return {
+            "presigned_urls": presigned_urls,
+        }
+    except Exception as e:
+        logger.exception("datasets:ingest")
+        traceback.print_exc()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
 class CompleteIngestionBody(BaseModel):
     version: int
     size: int
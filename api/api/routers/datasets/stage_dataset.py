@@ -1,10 +1,12 @@
 from fastapi.exceptions import HTTPException
-from fastapi import APIRouter, status, Depends, Query, Path
+from fastapi import APIRouter, status, Depends, Query, Path, Body
 import logging
+from pydantic import BaseModel
+from typing import List
 
 from ..auth import get_current_user
 from ...src.models import User
-from ...src.usecases.datasets import stage_dataset_file
+from ...src.usecases.datasets import stage_dataset_file, stage_dataset_files
 from .responses import download_dataset_responses as responses
 
 router = APIRouter()
@@ -28,7 +30,7 @@ async def stage_dataset(
     Stage a dataset file from the EOTDL.
     """
     try:
-        presigned_url = stage_dataset_file(dataset_id, filename, user, version)
+        presigned_url = await stage_dataset_file(dataset_id, filename, user, version)
         return {
             "presigned_url": presigned_url
         }
@@ -36,3 +38,32 @@ async def stage_dataset(
         logger.exception("datasets:download")
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
+
+class StageDatasetFilesBody(BaseModel):
+    filenames: List[str]
+
+
+@router.post(
+    "/{dataset_id}/stage",
+    summary="Generate presigned urls to download dataset files",
+    responses=responses,
+)
+async def stage_dataset_batch(
+    dataset_id: str = Path(..., description="ID of the dataset to download"),
+    body: StageDatasetFilesBody = Body(..., description="Filenames or paths of the files to download"),
+    version: int = Query(None, description="Version of the dataset to download"),
+    user: User = Depends(get_current_user),
+):
+    """
+    Generate the presigned urls to stage several dataset files with a single request.
+    Files that do not exist are returned in `errors`, by name, instead of urls.
+    """
+    try:
+        presigned_urls, errors = await stage_dataset_files(dataset_id, body.filenames, user, version)
+        return {
+            "presigned_urls": presigned_urls,
+            "errors": errors,
+        }
+    except Exception as e:
+        logger.exception("datasets:download")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
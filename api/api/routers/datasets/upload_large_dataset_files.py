@@ -2,6 +2,7 @@ from fastapi.exceptions import HTTPException
 from fastapi import APIRouter, status, Depends, File, Form, UploadFile
 import logging
 from pydantic import BaseModel
+from typing import Optional
 
 from ..auth import get_current_user
 from ...src.models import User
@@ -18,6 +19,7 @@ logger = logging.getLogger(__name__)
 class UploadIdBody(BaseModel):
     filname: str
     checksum: str
+    chunk_size: Optional[int] = None
 
 
 @router.post("/{dataset_id}/uploadId", include_in_schema=False)
@@ -27,10 +29,10 @@ def start_large_dataset_upload(
     user: User = Depends(get_current_user),
 ):
     try:
-        upload_id, parts = generate_upload_id(
-            user, body.checksum, body.filname, dataset_id
+        upload_id, parts, chunk_size = generate_upload_id(
+            user, body.checksum, body.filname, dataset_id, body.chunk_size
         )
-        return {"upload_id": upload_id, "parts": parts}
+        return {"upload_id": upload_id, "parts": parts, "chunk_size": chunk_size}
     except Exception as e:
         logger.exception("datasets:start_large_dataset_upload")
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
@@ -54,15 +56,14 @@ def ingest_large_dataset_chunk(
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
 
-@router.post("/complete/{upload_id}", include_in_schema=False)
+@router.post("/complete_upload/{upload_id}", include_in_schema=False)
 def complete_large_dataset_upload(
     upload_id: str,
-    version: int,
     user: User = Depends(get_current_user),
 ):
     try:
-        dataset = complete_multipart_upload(user, upload_id, version)
-        return {"dataset": dataset}
+        size = complete_multipart_upload(user, upload_id)
+        return {"size": size}
     except Exception as e:
         logger.exception("datasets:complete_large_dataset_upload")
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
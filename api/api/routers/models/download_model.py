@@ -29,7 +29,7 @@ async def download_model(
     Download an entire model or a specific model file from the EOTDL.
     """
     # try:
-    data_stream, object_info, _filename = download_model_file(
+    data_stream, object_info, _filename = await download_model_file(
         model_id, filename, user, version
     )
     response_headers = {
@@ -48,7 +48,7 @@ async def download_model(
 
 
 @router.get("/{model_id}/download")
-async def download_stac_Catalog(
+def download_stac_Catalog(
     model_id: str,
     user: User = Depends(get_current_user),
 ):
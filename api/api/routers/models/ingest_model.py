@@ -8,6 +8,7 @@ from ..auth import get_current_user
 from ...src.models import User
 from ...src.usecases.models import (
     ingest_model_file,
+    ingest_model_files,
     complete_model_ingestion,
 )
 from .responses import ingest_files_responses
@@ -51,6 +52,33 @@ async def ingest_files(
         logger.exception("models:ingest")
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
+class IngestModelFilesBody(BaseModel):
+    file_names: List[str]
+
+@router.post(
+    "/{model_id}/batch",
+    summary="Ingest several files to a model",
+    responses=ingest_files_responses,
+)
+async def ingest_files_batch(
+    model_id: str = Path(..., description="ID of the model"),
+    body: IngestModelFilesBody = Body(..., description="Names of the files to ingest"),
+    user: User = Depends(get_current_user),
+):
+    """
+    Generate the presigned urls to upload several files to an existing model with a single request.
+    """
+    try:
+        presigned_urls = await ingest_model_files(
+            body.file_names, model_id, user
+        )
+        return {
+            "presigned_urls": presigned_urls,
+        }
+    except Exception as e:
+        logger.exception("models:ingest")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
 class CompleteIngestionBody(BaseModel):
     version: int
     size: int
@@ -1,10 +1,12 @@
 from fastapi.exceptions import HTTPException
-from fastapi import APIRouter, status, Depends, Query, Path
+from fastapi import APIRouter, status, Depends, Query, Path, Body
 import logging
+from pydantic import BaseModel
+from typing import List
 
 from ..auth import get_current_user
 from ...src.models import User
-from ...src.usecases.models import stage_model_file
+from ...src.usecases.models import stage_model_file, stage_model_files
 from ..models.responses import download_model_responses as responses
 
 router = APIRouter()
@@ -28,10 +30,40 @@ async def stage_model(
     Stage a model file from the EOTDL.
     """
     try:
-        presigned_url = stage_model_file(model_id, filename, user, version)
+        presigned_url = await stage_model_file(model_id, filename, user, version)
         return {
             "presigned_url": presigned_url
         }
     except Exception as e:
         logger.exception("models:download")
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+class StageModelFilesBody(BaseModel):
+    filenames: List[str]
+
+
+@router.post(
+    "/{model_id}/stage",
+    summary="Generate presigned urls to download model files",
+    responses=responses,
+)
+async def stage_model_batch(
+    model_id: str = Path(..., description="ID of the model to download"),
+    body: StageModelFilesBody = Body(..., description="Filenames or paths of the files to download"),
+    version: int = Query(None, description="Version of the model to download"),
+    user: User = Depends(get_current_user),
+):
+    """
+    Generate the presigned urls to stage several model files with a single request.
+    Files that do not exist are returned in `errors`, by name, instead of urls.
+    """
+    try:
+        presigned_urls, errors = await stage_model_files(model_id, body.filenames, user, version)
+        return {
+            "presigned_urls": presigned_urls,
+            "errors": errors,
+        }
+    except Exception as e:
+        logger.exception("models:download")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
@@ -27,7 +27,7 @@ async def stage_pipeline(
     Stage a pipeline file from the EOTDL.
     """
     try:
-        presigned_url = stage_pipeline_file(pipeline_id, filename, user, version)
+        presigned_url = await stage_pipeline_file(pipeline_id, filename, user, version)
         return {
             "presigned_url": presigned_url
         }
@@ -41,7 +41,7 @@ async def stage_pipeline(
     "/{pipeline_id}/raw/{filename:path}",
     summary="Get raw content of a pipeline file",
 )
-async def raw_pipeline(
+def raw_pipeline(
     pipeline_id: str = Path(..., description="ID of the pipeline to stage"),
     filename: str = Path(
         ..., description="Filename or path to the file to download from the pipeline"
@@ -1,15 +1,22 @@
 import logging
 import traceback
 
-from fastapi import APIRouter, HTTPException, status, Request
+from fastapi import APIRouter, HTTPException, status, Request, Query, Depends
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from typing import Optional
+from fastapi.responses import JSONResponse, StreamingResponse, Response
+from pydantic import BaseModel, Field
+from typing import Optional, List
+import json
 
 
-from ...src.usecases.stac import retrieve_stac_collections, retrieve_stac_collection, retrieve_stac_items, search_stac_columns, retrieve_stac_item, search_stac_items
+from ...src.usecases.stac import retrieve_stac_collections, retrieve_stac_collection, retrieve_stac_items, stream_stac_items, search_stac_columns, retrieve_stac_item, search_stac_items
+from ...src.usecases.stac.retrieve_stac_items import DEFAULT_LIMIT, MAX_LIMIT
+from ...src.usecases.stac.search_stac_items import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT
+from ...src.usecases.stac.retrieve_stac_collections import DEFAULT_COLLECTIONS_LIMIT, MAX_COLLECTIONS_LIMIT, get_collections_ttl
+from ...src.usecases.stac.stac_index import rebuild_stac_index
+from ...src.errors import TooManyQueriesError
+from ..auth import admin_key_auth
 from ...config import VERSION
 
 router = APIRouter()
@@ -18,7 +25,10 @@ logger = logging.getLogger(__name__)
 conforms_to = [
     "https://api.stacspec.org/v1.0.0/core",
     "https://api.stacspec.org/v1.0.0/collections",
-    # "https://api.stacspec.org/v1.0.0/item-search",
+    "https://api.stacspec.org/v1.0.0/item-search",
+    "https://api.stacspec.org/v1.0.0-rc.2/item-search#filter",
+    "http://www.opengis.net/spec/cql2/1.0/conf/basic-cql2",
+    "http://www.opengis.net/spec/cql2/1.0/conf/cql2-json",
 ]
 
 
@@ -67,18 +77,18 @@ def stac_landing_page(request: Request):
                 "type": "application/json",
                 "href": base_url + "stac/collections"
             },
-            # {
-            #     "rel": "search",
-            #     "type": "application/json",
-            #     "href": base_url + "stac/search",
-            #     "method": "GET"
-            # },
-            # {
-            #     "rel": "search",
-            #     "type": "application/geo+json",
-            #     "href": base_url + "stac/search",
-            #     "method": "POST"
-            # },
+            {
+                "rel": "search",
+                "type": "application/geo+json",
+                "href": base_url + "stac/search",
+                "method": "GET"
+            },
+            {
+                "rel": "search",
+                "type": "application/geo+json",
+                "href": base_url + "stac/search",
+                "method": "POST"
+            },
         ]
         }
 
@@ -113,9 +123,19 @@ def api_html(request: Request):
     )
 
 @router.get("/collections")
-def collections(request: Request):
+def collections(
+    request: Request,
+    limit: int = Query(
+        DEFAULT_COLLECTIONS_LIMIT, ge=1, le=MAX_COLLECTIONS_LIMIT, description="Maximum number of collections per page"
+    ),
+    token: Optional[str] = Query(None, description="Token of the page, from the `next` link of the previous page"),
+):
     try:
-        return retrieve_stac_collections(request)
+        etag, content = retrieve_stac_collections(request, limit, token)
+        headers = {"ETag": etag, "Cache-Control": f"max-age={int(get_collections_ttl())}"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=content, media_type="application/json", headers=headers)
     except Exception as e:
         logger.exception("stac:collections")
         traceback.print_exc()
@@ -132,9 +152,18 @@ def collection(collection_name: str, request: Request):
     
 
 @router.get("/collections/{collection_name}/items")
-def items(collection_name: str, version: Optional[int] = 1):
+def items(
+    collection_name: str,
+    request: Request,
+    version: Optional[int] = 1,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT, description="Maximum number of items per page"),
+    token: Optional[str] = Query(None, description="Token of the page, from the `next` link of the previous page"),
+    f: Optional[str] = Query(None, description="Use `ndjson` to stream all the items as newline-delimited GeoJSON"),
+):
     try:
-        return retrieve_stac_items(collection_name, version)
+        if f == "ndjson":
+            return StreamingResponse(stream_stac_items(collection_name, version), media_type="application/x-ndjson")
+        return retrieve_stac_items(request, collection_name, version, limit, token)
     except Exception as e:
         logger.exception("stac:items")
         traceback.print_exc()
@@ -149,24 +178,84 @@ def item(collection_name: str, item_id: str, version: Optional[int] = 1):
         traceback.print_exc()
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     
-@router.get("/search", include_in_schema=False)
-def search(collection: str):
+def split(value):
+    return value.split(",") if value else None
+
+@router.get("/search")
+def search(
+    request: Request,
+    collections: Optional[str] = Query(None, description="Comma separated names of the collections"),
+    ids: Optional[str] = Query(None, description="Comma separated ids of the items"),
+    bbox: Optional[str] = Query(None, description="Bounding box, as minx,miny,maxx,maxy"),
+    intersects: Optional[str] = Query(None, description="GeoJSON geometry"),
+    datetime: Optional[str] = Query(None, description="RFC 3339 datetime or interval, open ends with `..`"),
+    filter: Optional[str] = Query(None, description="CQL2-JSON filter"),
+    filter_lang: Optional[str] = Query(None, alias="filter-lang"),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    token: Optional[str] = Query(None, description="Token of the page, from the `next` link of the previous page"),
+    collection: Optional[str] = Query(None, include_in_schema=False),
+):
     try:
-        return search_stac_columns(collection)
+        if collection is not None:  # columns of a catalog, used by the library
+            return search_stac_columns(collection)
+        try:
+            intersects = json.loads(intersects) if intersects else None
+        except json.JSONDecodeError:
+            raise Exception("Invalid intersects geometry")
+        return search_stac_items(
+            request,
+            split(collections), split(ids), bbox, intersects, datetime, filter, filter_lang, limit, token
+        )
+    except TooManyQueriesError as e:  # all the cursors are busy, clients can retry
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
-        logger.exception("stac:item")
+        logger.exception("stac:search")
         traceback.print_exc()
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
-class SearchRequest(BaseModel): 
-    catalog_id: str
-    query: str
+class SearchRequest(BaseModel):
+    collections: Optional[List[str]] = None
+    ids: Optional[List[str]] = None
+    bbox: Optional[List[float]] = None
+    intersects: Optional[dict] = None
+    datetime: Optional[str] = None
+    filter: Optional[dict] = None
+    filter_lang: Optional[str] = Field(None, alias="filter-lang")
+    limit: int = Field(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT)
+    token: Optional[str] = None
 
-@router.post("/search", include_in_schema=False)
-def search(search_request: SearchRequest):
+@router.post("/search")
+def search_post(search_request: SearchRequest, request: Request):
     try:
-        return search_stac_items(search_request.collection_id, search_request.query)
+        return search_stac_items(
+            request,
+            search_request.collections,
+            search_request.ids,
+            search_request.bbox,
+            search_request.intersects,
+            search_request.datetime,
+            search_request.filter,
+            search_request.filter_lang,
+            search_request.limit,
+            search_request.token,
+            method="POST",
+        )
+    except TooManyQueriesError as e:  # all the cursors are busy, clients can retry
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
-        logger.exception("stac:item")
+        logger.exception("stac:search")
         traceback.print_exc()
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@router.post("/index", include_in_schema=False)
+def stac_index(isAdmin: bool = Depends(admin_key_auth)):
+    """
+    Indexes the latest version of every collection, for the collections ingested before
+    the index existed (they are not found by searches without `collections` until then).
+    """
+    try:
+        return rebuild_stac_index()
+    except Exception as e:
+        logger.exception("stac:index")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
@@ -1,5 +1,6 @@
 from .datasets import (
     FileDoesNotExistError,
+    TooManyFilesError,
     ChunkUploadChecksumMismatch,
     DatasetDoesNotExistError,
     DatasetAlreadyLikedError,
@@ -33,4 +34,5 @@ from .pipelines import (
     PipelineAlreadyExistsError,
     PipelineVersionDoesNotExistError,
     PipelineNotActiveError
-)
\ No newline at end of file
+)
+from .stac import TooManyQueriesError
\ No newline at end of file
@@ -19,6 +19,12 @@ class DatasetNotActiveError(Exception):
         super().__init__(self.message)
 
 
+class TooManyFilesError(Exception):
+    def __init__(self, max_files):
+        message = f"At most {max_files} files can be requested at once"
+        super().__init__(message)
+
+
 class FileDoesNotExistError(Exception):
     message = "File doesn't exist"
 
@@ -0,0 +1,5 @@
+class TooManyQueriesError(Exception):
+    message = "Too many concurrent searches, try again later"
+
+    def __init__(self):
+        super().__init__(self.message)
@@ -8,5 +8,5 @@ from .verison import Version
 from .metadata import Metadata
 from .change import Change, ChangeType, ChangeStatus
 from .notification import Notification, NotificationType, NotificationStatus
-from .files import File, Folder, Files
+from .files import File, Folder, Files, UploadingFile
 from .pipeline import Pipeline
\ No newline at end of file
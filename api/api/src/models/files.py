@@ -31,10 +31,11 @@ class UploadingFile(BaseModel):
     id: str
     upload_id: str
     filename: str
-    version: int
+    version: Optional[int] = None
     dataset: Optional[str] = None
     model: Optional[str] = None
     checksum: str
     createdAt: datetime = Field(default_factory=datetime.now)
     updatedAt: datetime = Field(default_factory=datetime.now)
     parts: List[int] = []
+    chunk_size: Optional[int] = None  # size of the parts, resumed uploads must use it
@@ -1,8 +1,14 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import Optional
 
 
 class Version(BaseModel):
     version_id: int
     createdAt: datetime = Field(default_factory=datetime.now)
     size: int = 0
+    # computed from the catalog when the ingestion is completed
+    extent: Optional[dict] = None
+    summaries: Optional[dict] = None
+    items: Optional[int] = None
+    assets_size: Optional[int] = None
@@ -13,3 +13,10 @@ from .mongo import MongoChangesRepo as ChangesDBRepo
 from .mongo import MongoNotificationsRepo as NotificationsDBRepo
 from .mongo import MongoPipelinesRepo as PipelinesDBRepo
 from .mongo import MongoAuthRepo as AuthDBRepo
+from .cache import CatalogCacheRepo, MemoryCacheRepo
+from .duckdb import DuckDBRepo
+from .mongo import MongoSTACRepo as STACDBRepo
+from .mongo import AsyncMongoDatasetsRepo as AsyncDatasetsDBRepo
+from .mongo import AsyncMongoModelsRepo as AsyncModelsDBRepo
+from .mongo import AsyncMongoPipelinesRepo as AsyncPipelinesDBRepo
+from .mongo import AsyncMongoFilesRepo as AsyncFilesDBRepo
@@ -2,26 +2,85 @@ import base64
 import hashlib
 import os
 import secrets
+import threading
+import time
 from urllib.parse import urlencode
 
 import jwt
 import requests
 
+from ..cache import MemoryCacheRepo
+
+# seconds before the signing keys are fetched again, and between fetches when a
+# token is signed with an unknown key
+JWKS_TTL = 3600
+JWKS_REFRESH_INTERVAL = 60
+# verified tokens are cached until they expire, at most this number of seconds
+MAX_TOKEN_CACHE_TTL = 24 * 3600
+
 
 class LogtoRepo:
+    """
+    The discovery document and the signing keys (JWKS) of the tenant are fetched once
+    per process and shared by all instances, so tokens are validated without requests.
+    """
+
+    # shared by all instances
+    well_known = {}  # domain: discovery document
+    jwks = {}  # jwks uri: (fetched at, keys by kid)
+    lock = threading.Lock()
+
     def __init__(self):
         self.domain = os.environ["LOGTO_DOMAIN"]
         self.client_id = os.environ["LOGTO_APP_ID"]
         self.client_secret = os.environ["LOGTO_APP_SECRET"]
-        well_known = requests.get(
-            f"https://{self.domain}/oidc/.well-known/openid-configuration", timeout=10
-        ).json()
+        well_known = self.get_well_known()
         self.issuer = well_known["issuer"]
         self.authz_endpoint = well_known["authorization_endpoint"]
         self.token_endpoint = well_known["token_endpoint"]
         self.jwks_uri = well_known["jwks_uri"]
         self.userinfo_endpoint = well_known.get("userinfo_endpoint")
-        self.algorithms = ["RS256"]
+
+    def get_well_known(self):
+        with self.lock:
+            well_known = self.well_known.get(self.domain)
+        if well_known is None:
+            # requested without the lock, requests for other tenants are not blocked
+            response = requests.get(
+                f"https://{self.domain}/oidc/.well-known/openid-configuration",
+                timeout=10,
+            )
+            response.raise_for_status()
+            well_known = response.json()
+            with self.lock:
+                self.well_known[self.domain] = well_known
+        return well_known
+
+    def get_signing_key(self, kid):
+        with self.lock:
+            fetched, keys = self.jwks.get(self.jwks_uri, (None, {}))
+        age = None if fetched is None else time.monotonic() - fetched
+        # an unknown key may be a new one after a rotation
+        if age is None or age > JWKS_TTL or (kid not in keys and age > JWKS_REFRESH_INTERVAL):
+            # fetched without the lock, so tokens signed with cached keys are not
+            # blocked by the request, and the new keys are swapped in when complete
+            keys = self.fetch_signing_keys()
+            with self.lock:
+                self.jwks[self.jwks_uri] = (time.monotonic(), keys)
+        if kid not in keys:
+            raise Exception("Public key not found in JWKS")
+        return keys[kid]
+
+    def fetch_signing_keys(self):
+        response = requests.get(self.jwks_uri, timeout=10)
+        response.raise_for_status()
+        keys = {}
+        for jwk in response.json()["keys"]:
+            try:
+                keys[jwk["kid"]] = jwt.PyJWK(jwk)
+            except (KeyError, jwt.PyJWKError):  # keys that can not sign tokens
+                pass
+        return keys
 
     def generate_login_url(self, redirect_uri):
         code_verifier = (
@@ -71,36 +130,33 @@ class LogtoRepo:
         }
 
     def validate_token(self, id_token):
-        jwks_resp = requests.get(self.jwks_uri, timeout=10)
-        jwks_resp.raise_for_status()
-        jwks = jwks_resp.json()
         unverified_header = jwt.get_unverified_header(id_token)
-        key = None
-        for jwk in jwks["keys"]:
-            if jwk["kid"] == unverified_header["kid"]:
-                key = jwt.algorithms.ECAlgorithm.from_jwk(jwk)
-                break
-        if key is None:
-            raise Exception("Public key not found in JWKS")
+        key = self.get_signing_key(unverified_header.get("kid"))
         payload = jwt.decode(
             id_token,
             key=key,
-            algorithms=["ES384"],
+            algorithms=[key.algorithm_name],
             audience=self.client_id,
             issuer=self.issuer,
+            options={"require": ["exp"]},
         )
         return payload
 
     def parse_token(self, token):
-        payload = jwt.decode(
-            token, algorithms=self.algorithms, options={"verify_signature": False}
-        )
-        return {
+        # tokens are cached by their hash once verified, until they expire
+        cache = MemoryCacheRepo("tokens", MAX_TOKEN_CACHE_TTL)
+        key = hashlib.sha256(token.encode()).hexdigest()
+        data = cache.get(key)
+        if data is not None:
+            return data
+        payload = self.validate_token(token)
+        data = {
             "uid": payload.get("sub"),
             "name": payload.get("name"),
             "email": payload.get("email"),
             "picture": payload.get("picture"),
         }
+        return cache.put(key, data, ttl=payload["exp"] - time.time())
 
     def get_userinfo(self, access_token):
         r = requests.get(
@@ -13,6 +13,11 @@ class Boto3Repo:
             "UploadId"
         ]
 
+    def abort_multipart_upload(self, storage, upload_id):
+        return self.client.abort_multipart_upload(
+            Bucket=self.bucket, Key=storage, UploadId=upload_id
+        )
+
     def store_chunk(self, data, storage, part, upload_id):
         # Calculate SHA256 hash of the chunk data
         if isinstance(data, bytes):
@@ -2,8 +2,17 @@ import boto3
 
 import os
 
+client = {}
+
 
 def get_client():
+    # clients are thread safe, shared by all the requests of the worker
+    if not "s3" in client:
+        client["s3"] = create_client()
+    return client["s3"]
+
+
+def create_client():
     if not "S3_SSL" in os.environ:  # use SSL if not specified
         HTTPS = True
     else:
@@ -18,7 +27,9 @@ def get_client():
         endpoint_url=HTTP_PREFIX + os.environ["S3_ENDPOINT"],
         verify=False,
         config=boto3.session.Config(
-            signature_version="s3v4", s3={"addressing_style": "path"}
+            signature_version="s3v4",
+            s3={"addressing_style": "path"},
+            max_pool_connections=int(os.getenv("S3_MAX_CONNECTIONS", "64")),
         ),
         # config=boto3.session.Config(signature_version="s3v4"),
     )
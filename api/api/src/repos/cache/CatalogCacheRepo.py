@@ -0,0 +1,125 @@
+from collections import OrderedDict
+import os
+import threading
+
+import prometheus_client
+import pyarrow.parquet as pq
+
+eotdl_api_catalog_cache_requests = prometheus_client.Counter(
+    "eotdl_api_catalog_cache_requests",
+    documentation="Requests to the catalog cache",
+    labelnames=["result"],
+)
+
+
+class CatalogCacheRepo:
+    """
+    Process level cache of catalog tables, keyed by dataset (or model) id, version and
+    the ETag of the catalog in the object storage, so a catalog that changed is never
+    served. Tables are evicted in LRU order when they exceed CATALOG_CACHE_SIZE bytes.
+    If CATALOG_CACHE_PATH is set, downloaded catalogs are also kept on disk, shared by
+    all the workers of the API.
+    """
+
+    # shared by all instances, like the storage client
+    tables = OrderedDict()
+    lock = threading.Lock()
+    size = 0
+
+    def __init__(self):
+        self.max_size = int(os.getenv("CATALOG_CACHE_SIZE", str(1024 * 1024 * 1024)))
+        self.path = os.getenv("CATALOG_CACHE_PATH", "")
+
+    def get(self, id, version, etag):
+        with self.lock:
+            entry = self.tables.get((id, version))
+            if entry is not None and entry["etag"] == etag:
+                self.tables.move_to_end((id, version))
+                eotdl_api_catalog_cache_requests.labels("hit").inc()
+                return entry["table"]
+        # catalogs downloaded by other workers
+        file_path = self.get_file_path(id, version, etag)
+        if file_path and os.path.exists(file_path):
+            table = pq.read_table(file_path)
+            self.put(id, version, etag, table)
+            eotdl_api_catalog_cache_requests.labels("disk").inc()
+            return table
+        eotdl_api_catalog_cache_requests.labels("miss").inc()
+        return None
+
+    def put(self, id, version, etag, table):
+        with self.lock:
+            previous = self.tables.pop((id, version), None)
+            if previous is not None:
+                CatalogCacheRepo.size -= previous["size"]
+            if table.nbytes > self.max_size:
+                return table
+            self.tables[(id, version)] = {"etag": etag, "table": table, "indexes": {}, "size": table.nbytes}
+            CatalogCacheRepo.size += table.nbytes
+            self.evict()
+        return table
+
+    def get_index(self, id, version, etag, build):
+        """
+        Returns an index of a cached table (anything with `nbytes`, e.g. the row numbers
+        of the searches), built with `build(table)` the first time and kept with the
+        table, one for each `build`. Indexes are built without the lock, so requests for
+        other catalogs are not blocked while a large catalog is indexed.
+        """
+        with self.lock:
+            entry = self.tables.get((id, version))
+            if entry is None or entry["etag"] != etag:
+                return None
+            if build in entry["indexes"]:
+                return entry["indexes"][build]
+            table = entry["table"]
+        index = build(table)
+        with self.lock:
+            entry = self.tables.get((id, version))
+            # the table may have been evicted or replaced while the index was built
+            if entry is None or entry["etag"] != etag:
+                return index
+            if build in entry["indexes"]:  # built by a concurrent request
+                return entry["indexes"][build]
+            entry["indexes"][build] = index
+            entry["size"] += index.nbytes
+            CatalogCacheRepo.size += index.nbytes
+            self.evict(keep=(id, version))
+        return index
+
+    def evict(self, keep=None):
+        # least recently used tables first
+        for key in list(self.tables):
+            if CatalogCacheRepo.size <= self.max_size:
+                break
+            if key != keep:
+                CatalogCacheRepo.size -= self.tables.pop(key)["size"]
+
+    def get_file_path(self, id, version, etag):
+        if not self.path:
+            return None
+        return os.path.join(self.path, id, f"catalog.v{version}.{etag}.parquet")
+
+    def remove_stale_files(self, id, version, etag):
+        """
+        Removes the files of previous catalogs of a version from disk, once the current
+        one is there. Files being downloaded (.tmp) are skipped, other workers may be
+        writing them.
+        """
+        file_path = self.get_file_path(id, version, etag)
+        if not file_path:
+            return
+        folder, current = os.path.split(file_path)
+        for file_name in os.listdir(folder):
+            if file_name.startswith(f"catalog.v{version}.") and file_name.endswith(".parquet") and file_name != current:
+                try:
+                    os.remove(os.path.join(folder, file_name))
+                except FileNotFoundError:  # removed by another worker
+                    pass
+
+    def invalidate(self, id):
+        # files on disk are named by etag so they are never served stale, they are
+        # removed when the new catalog is downloaded (see `remove_stale_files`)
+        with self.lock:
+            for key in [key for key in self.tables if key[0] == id]:
+                CatalogCacheRepo.size -= self.tables.pop(key)["size"]
@@ -0,0 +1,55 @@
+import threading
+import time
+
+import prometheus_client
+
+eotdl_api_memory_cache_requests = prometheus_client.Counter(
+    "eotdl_api_memory_cache_requests",
+    documentation="Requests to the in-process caches",
+    labelnames=["namespace", "result"],
+)
+
+
+class MemoryCacheRepo:
+    """
+    Process level cache of values that expire after `ttl` seconds, in namespaces
+    shared by all instances. Values may be stale for up to `ttl` seconds in the
+    workers that did not change them.
+    """
+
+    namespaces = {}
+    lock = threading.Lock()
+
+    def __init__(self, namespace, ttl, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.namespace = namespace
+        with self.lock:
+            self.entries = self.namespaces.setdefault(namespace, {})
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            eotdl_api_memory_cache_requests.labels(self.namespace, "miss").inc()
+            return None
+        eotdl_api_memory_cache_requests.labels(self.namespace, "hit").inc()
+        return entry[1]
+
+    def put(self, key, value, ttl=None):
+        # a ttl shorter than the one of the namespace, e.g. for tokens about to expire
+        with self.lock:
+            if len(self.entries) >= self.max_entries:
+                # expired entries first, the oldest ones if none expired
+                now = time.monotonic()
+                expired = [k for k, (expires, _) in self.entries.items() if expires < now]
+                for k in expired or list(self.entries)[: len(self.entries) // 2]:
+                    self.entries.pop(k, None)
+            self.entries[key] = (time.monotonic() + (self.ttl if ttl is None else min(ttl, self.ttl)), value)
+        return value
+
+    def invalidate(self, key=None):
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
@@ -0,0 +1,2 @@
+from .CatalogCacheRepo import CatalogCacheRepo
+from .MemoryCacheRepo import MemoryCacheRepo
\ No newline at end of file
@@ -0,0 +1,95 @@
+import os
+import queue
+import time
+import uuid
+
+import prometheus_client
+import pyarrow as pa
+
+from .client import get_pool, has_s3_secret
+from ...errors import TooManyQueriesError
+
+eotdl_api_duckdb_query_seconds = prometheus_client.Histogram(
+    "eotdl_api_duckdb_query_seconds",
+    documentation="Latency of the DuckDB queries over catalogs",
+    labelnames=["source"],
+)
+eotdl_api_duckdb_pool_wait_seconds = prometheus_client.Histogram(
+    "eotdl_api_duckdb_pool_wait_seconds",
+    documentation="Time waiting for a free DuckDB cursor",
+)
+
+
+class DuckDBRepo:
+    """
+    Queries over catalogs, either arrow tables in memory or remote parquet files read
+    with httpfs (only the row groups and columns that are needed are downloaded).
+    Cursors come from a pool, call `close` to return them. If none is released within
+    DUCKDB_POOL_TIMEOUT seconds, the query is rejected instead of waiting indefinitely.
+    """
+
+    def __init__(self):
+        self.pool = get_pool()
+        start = time.perf_counter()
+        try:
+            self.cursor = self.pool.acquire(timeout=float(os.getenv("DUCKDB_POOL_TIMEOUT", "10")))
+        except queue.Empty:
+            raise TooManyQueriesError()
+        finally:
+            eotdl_api_duckdb_pool_wait_seconds.observe(time.perf_counter() - start)
+        self.registered = []
+
+    def supported(self, type):
+        # structs without fields (e.g. items without assets) can not be read by duckdb
+        if pa.types.is_struct(type):
+            return type.num_fields > 0 and all(self.supported(field.type) for field in type)
+        if pa.types.is_list(type) or pa.types.is_large_list(type):
+            return self.supported(type.value_type)
+        return True
+
+    def register(self, table):
+        """
+        Registers an arrow table to be queried by name, without the columns that
+        duckdb does not support.
+        """
+        # unique names, cursors of concurrent requests share the database
+        name = f"catalog_{uuid.uuid4().hex}"
+        columns = [field.name for field in table.schema if self.supported(field.type)]
+        self.cursor.register(name, table.select(columns))
+        self.registered.append(name)
+        return name
+
+    def remote_path(self, dataset_id, file_name):
+        """
+        Path of a file in the object storage that DuckDB can read, or None if the
+        storage credentials are not available (use a presigned url instead).
+        """
+        if not has_s3_secret():
+            return None
+        return f"s3://{os.environ['S3_BUCKET']}/{dataset_id}/{file_name}"
+
+    def execute(self, sql, params=[], fetch=lambda result: result.fetchall()):
+        # queries over registered tables run in memory, others read remote files
+        source = "memory" if any(name in sql for name in self.registered) else "remote"
+        start = time.perf_counter()
+        try:
+            return fetch(self.cursor.execute(sql, params))
+        finally:
+            eotdl_api_duckdb_query_seconds.labels(source).observe(time.perf_counter() - start)
+
+    def columns(self, source, params=[]):
+        rows = self.execute(f"DESCRIBE SELECT * FROM {source}", params)
+        return {row[0]: row[1] for row in rows}
+
+    def query(self, sql, params=[]):
+        return self.execute(sql, params, lambda result: result.fetch_arrow_table())
+
+    def close(self):
+        try:
+            for name in self.registered:
+                self.cursor.unregister(name)
+        finally:
+            # the cursor goes back to the pool even if a table could not be unregistered
+            # (names are unique, a leftover table is never queried again)
+            self.registered = []
+            self.pool.release(self.cursor)
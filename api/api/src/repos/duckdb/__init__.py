@@ -0,0 +1,2 @@
+from .DuckDBRepo import DuckDBRepo
+from .client import get_pool
\ No newline at end of file
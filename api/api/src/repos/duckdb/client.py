@@ -0,0 +1,87 @@
+import logging
+import os
+import queue
+import threading
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+client = {}
+lock = threading.Lock()
+
+
+class CursorPool:
+    """
+    Cursors of a single in-memory database, created once with the extensions loaded
+    and shared by the requests. Requests wait for a free cursor when all are in use.
+    """
+
+    def __init__(self, connection, size):
+        self.connection = connection
+        self.size = size
+        self.cursors = queue.Queue()
+        for _ in range(size):
+            self.cursors.put(connection.cursor())
+
+    def acquire(self, timeout=None):
+        return self.cursors.get(timeout=timeout)
+
+    def release(self, cursor):
+        self.cursors.put(cursor)
+
+
+def quote(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def create_s3_secret(connection):
+    # catalogs are read with s3:// urls, which are stable (unlike presigned urls) so
+    # the footers of the parquet files are cached across requests
+    secure = "S3_REGION" in os.environ  # same as the minio client
+    options = {
+        "KEY_ID": os.environ["ACCESS_KEY_ID"],
+        "SECRET": os.environ["SECRET_ACCESS_KEY"],
+        "ENDPOINT": os.environ["S3_ENDPOINT"],
+        "REGION": os.environ.get("S3_REGION", "us-east-1"),
+    }
+    connection.execute(
+        "CREATE SECRET eotdl (TYPE s3, URL_STYLE 'path', USE_SSL "
+        + ("true" if secure else "false")
+        + "".join(f", {key} {quote(value)}" for key, value in options.items())
+        + ")"
+    )
+
+
+def create_connection():
+    connection = duckdb.connect(database=":memory:")
+    connection.execute("SET GLOBAL TimeZone='UTC'")
+    # cache parquet footers and remote file blocks, validated with the file's last modification
+    connection.execute("SET GLOBAL parquet_metadata_cache=true")
+    connection.execute("SET GLOBAL enable_external_file_cache=true")
+    client["s3"] = False
+    try:
+        connection.execute("INSTALL httpfs; LOAD httpfs;")
+        connection.execute("SET GLOBAL s3_url_style='path';")
+        if "S3_ENDPOINT" in os.environ:
+            create_s3_secret(connection)
+            client["s3"] = True
+    except (duckdb.Error, KeyError):
+        # catalogs can still be queried from memory
+        logger.exception("duckdb: httpfs could not be loaded")
+    return connection
+
+
+def get_pool():
+    # one pool per process, initialized at startup (or by the first query). The first
+    # queries may run in several threads of the pool of the sync routes at the same time
+    if not "duckdb" in client:
+        with lock:
+            if not "duckdb" in client:
+                size = int(os.getenv("DUCKDB_POOL_SIZE", "8"))
+                client["duckdb"] = CursorPool(create_connection(), size)
+    return client["duckdb"]
+
+
+def has_s3_secret():
+    get_pool()
+    return client["s3"]
@@ -4,12 +4,67 @@ import hashlib
 import requests
 from io import BytesIO
 import copy
+import io
+
+
+class RemoteFile(io.RawIOBase):
+    """
+    Read only file over an object in the storage, each read is a range request. Files
+    like parquet catalogs can be read partially (e.g. the footer and some row groups)
+    without downloading the whole object.
+    """
+
+    def __init__(self, client, bucket, object, size):
+        self.client = client
+        self.bucket = bucket
+        self.object = object
+        self.size = size
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self.position = max(0, offset)
+        return self.position
+
+    def readinto(self, buffer):
+        length = min(len(buffer), self.size - self.position)
+        if length <= 0:
+            return 0
+        response = self.client.get_object(self.bucket, self.object, offset=self.position, length=length)
+        try:
+            data = response.read()
+        finally:
+            response.close()
+            response.release_conn()
+        buffer[: len(data)] = data
+        self.position += len(data)
+        return len(data)
 
 
 class MinioRepo:
+    """
+    Instances share the client (and its connections), so they can be created for each
+    request. No request is made on creation, the bucket is provisioned at startup
+    (which also caches its region in the client, so presigned urls are signed locally).
+    """
+
     def __init__(self):
         self.client = get_client()
         self.bucket = os.environ["S3_BUCKET"]
+
+    def provision_bucket(self):
         if not self.client.bucket_exists(self.bucket):
             self.client.make_bucket(self.bucket)
 
@@ -47,7 +102,30 @@ class MinioRepo:
             self.bucket, self.get_object(dataset_id, file_name)
         )
     
+    def download_file(self, dataset_id, file_name, file_path):
+        # streamed to disk, never keeping the whole object in memory
+        return self.client.fget_object(
+            self.bucket, self.get_object(dataset_id, file_name), file_path
+        )
+
+    def open_file(self, dataset_id, file_name, size=None):
+        """
+        Opens an object to read it in ranges (pass its size if known to skip a request).
+        """
+        if size is None:
+            size = self.object_info(dataset_id, file_name).size
+        return RemoteFile(self.client, self.bucket, self.get_object(dataset_id, file_name), size)
+
     def read_file(self, dataset_id, file_name):
         return self.client.get_object(
             self.bucket, self.get_object(dataset_id, file_name)
-        )
\ No newline at end of file
+        )
+
+    def upload_file(self, dataset_id, file_name, file_path):
+        return self.client.fput_object(
+            self.bucket, self.get_object(dataset_id, file_name), file_path
+        )
+
+    def list_files(self, dataset_id):
+        # objects under the prefix, with their etag
+        return self.client.list_objects(self.bucket, prefix=f"{dataset_id}/")
@@ -1,8 +1,25 @@
 from minio import Minio
+import certifi
 import os
+import urllib3
 
 client = {}
 
+
+def get_http_client():
+    # shared by all the requests of the worker, with a connection for each thread
+    # of the pool of the sync routes (and the staging of thousands of files)
+    return urllib3.PoolManager(
+        timeout=urllib3.Timeout(connect=10, read=300),
+        maxsize=int(os.getenv("S3_MAX_CONNECTIONS", "64")),
+        cert_reqs="CERT_REQUIRED",
+        ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+        retries=urllib3.Retry(
+            total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]
+        ),
+    )
+
+
 def get_client():
     if not 'minio' in client:
         if 'S3_REGION' in os.environ:
@@ -12,12 +29,14 @@ def get_client():
                 secret_key=os.environ['SECRET_ACCESS_KEY'],
                 secure=True,
                 region=os.environ['S3_REGION'],
+                http_client=get_http_client(),
             )
         else:
             client['minio'] = Minio(
                 endpoint=os.environ['S3_ENDPOINT'],
                 access_key=os.environ['ACCESS_KEY_ID'],
                 secret_key=os.environ['SECRET_ACCESS_KEY'],
-                secure=False
+                secure=False,
+                http_client=get_http_client(),
             )
     return client['minio']
@@ -0,0 +1,11 @@
+from .AsyncMongoRepo import AsyncMongoRepo
+
+
+class AsyncMongoDatasetsRepo(AsyncMongoRepo):
+    # async version of the methods of `MongoDatasetsRepo` used by the async routes
+
+    async def retrieve_dataset(self, dataset_id):
+        return await self.retrieve("datasets", dataset_id)
+
+    async def find_one_dataset_by_name(self, name):
+        return await self.find_one_by_name("datasets", name)
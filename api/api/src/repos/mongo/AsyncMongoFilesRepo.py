@@ -0,0 +1,17 @@
+from .AsyncMongoRepo import AsyncMongoRepo
+
+
+class AsyncMongoFilesRepo(AsyncMongoRepo):
+    # async version of the methods of `MongoFilesRepo` used by the async routes
+
+    async def retrieve_file(self, files_id, filename, version=None):
+        query = [
+            {"$match": {"id": files_id}},
+            {"$unwind": "$files"},
+            {"$match": {"files.name": filename}}
+        ]
+        if version:
+            query.append({"$match": {"files.versions": version}})
+        query.append({"$group": {"_id": "$_id", "files": {"$push": "$files"}}})
+        results = await (await self.db["files"].aggregate(query)).to_list()
+        return results[0] if results else None
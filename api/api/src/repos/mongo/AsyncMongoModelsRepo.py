@@ -0,0 +1,11 @@
+from .AsyncMongoRepo import AsyncMongoRepo
+
+
+class AsyncMongoModelsRepo(AsyncMongoRepo):
+    # async version of the methods of `MongoModelsRepo` used by the async routes
+
+    async def retrieve_model(self, model_id):
+        return await self.retrieve("models", model_id)
+
+    async def find_one_model_by_name(self, name):
+        return await self.find_one_by_name("models", name)
@@ -0,0 +1,11 @@
+from .AsyncMongoRepo import AsyncMongoRepo
+
+
+class AsyncMongoPipelinesRepo(AsyncMongoRepo):
+    # async version of the methods of `MongoPipelinesRepo` used by the async routes
+
+    async def retrieve_pipeline(self, pipeline_id):
+        return await self.retrieve("pipelines", pipeline_id)
+
+    async def find_one_pipeline_by_name(self, name):
+        return await self.find_one_by_name("pipelines", name)
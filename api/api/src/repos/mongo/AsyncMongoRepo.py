@@ -0,0 +1,69 @@
+from .client import get_async_db
+from bson.objectid import ObjectId
+
+
+class AsyncMongoRepo:
+    """
+    Same methods as `MongoRepo`, awaited from the async routes so a slow query does not
+    block the event loop. Must be created in a coroutine.
+    """
+
+    def __init__(self):
+        self.db = get_async_db()
+
+    async def exists(self, collection, value, field="_id"):
+        if field == "_id":
+            value = ObjectId(value)
+        return await self.db[collection].find_one({field: value}) is not None
+
+    def generate_id(self):
+        return str(ObjectId())
+
+    async def persist(self, collection, data, id=None):
+        if id is not None:
+            data["_id"] = ObjectId(id)
+            return await self.db[collection].insert_one(data)
+        return (await self.db[collection].insert_one(data)).inserted_id
+
+    async def retrieve(
+        self,
+        collection,
+        value=None,
+        field="id",
+        limit=None,
+        sort=None,
+        order=None,
+        selector=None,
+        match={},
+    ):
+        # retrieve all
+        if value is None:
+            query = self.db[collection].find(match)
+            if sort is not None:
+                query = query.sort(sort, order)
+            if limit is not None:
+                query = query.limit(limit)
+            return await query.to_list()
+        # retrieve one
+        if field == "_id":
+            value = ObjectId(value)
+        return await self.db[collection].find_one({field: value}, selector)
+
+    async def retrieve_many(self, collection, values, field="_id"):
+        if field == "_id":
+            values = [ObjectId(value) for value in values]
+        return await self.db[collection].find({field: {"$in": values}}).to_list()
+
+    async def update(self, collection, id, data):
+        return await self.db[collection].update_one({"_id": ObjectId(id)}, {"$set": data})
+
+    async def delete(self, collection, value, field="id"):
+        if field == "_id":
+            value = ObjectId(value)
+        return await self.db[collection].delete_one({field: value})
+
+    async def find_one(self, collection, data):
+        return await self.db[collection].find_one(data)
+
+    async def find_one_by_name(self, collection, name):
+        return await self.db[collection].find_one({"name": name})
@@ -66,14 +66,16 @@ class MongoFilesRepo(MongoRepo):
         query.append({"$group": {"_id": "$_id", "files": {"$push": "$files"}}})
         return list(self.db["files"].aggregate(query))
 
-    def find_upload(self, uid, filename, file_version, dataset_id):
+    def find_upload(self, uid, filename, dataset_or_model_id):
         return self.find_one(
             "uploading",
             {
                 "uid": uid,
                 "filename": filename,
-                "dataset": dataset_id,
-                "version": file_version,
+                "$or": [
+                    {"dataset": dataset_or_model_id},
+                    {"model": dataset_or_model_id},
+                ],
             },
         )
 
@@ -94,3 +96,10 @@ class MongoFilesRepo(MongoRepo):
 
     def update_upload(self, upload_id, data):
         return self.update("uploading", upload_id, data)
+
+    def add_upload_part(self, id, part_number, updatedAt):
+        return self._update(
+            "uploading",
+            {"id": id},
+            {"$addToSet": {"parts": part_number}, "$set": {"updatedAt": updatedAt}},
+        )
@@ -0,0 +1,34 @@
+from .MongoRepo import MongoRepo
+
+# fields of the datasets, models and pipelines needed by the STAC collections
+COLLECTION_PROJECTION = {
+    "_id": 0,
+    "name": 1,
+    "metadata.description": 1,
+    "metadata.license": 1,
+    "versions.version_id": 1,
+    "versions.extent": 1,
+    "versions.summaries": 1,
+    "versions.items": 1,
+    "versions.assets_size": 1,
+}
+# only active and public (documents without the fields are)
+PUBLIC_MATCH = {"active": {"$ne": False}, "visibility": {"$in": ["public", None]}}
+
+
+class MongoSTACRepo(MongoRepo):
+    def __init__(self):
+        super().__init__()
+
+    def retrieve_collections(self, offset, limit):
+        # datasets, models and pipelines in a single query, sorted by name so pages are stable
+        stages = [{"$match": PUBLIC_MATCH}, {"$project": COLLECTION_PROJECTION}]
+        pipeline = [
+            *stages,
+            {"$unionWith": {"coll": "models", "pipeline": stages}},
+            {"$unionWith": {"coll": "pipelines", "pipeline": stages}},
+            {"$sort": {"name": 1}},
+            {"$skip": offset},
+            {"$limit": limit},
+        ]
+        return list(self.db["datasets"].aggregate(pipeline))
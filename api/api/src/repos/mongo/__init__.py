@@ -8,3 +8,9 @@ from .MongoChangesRepo import MongoChangesRepo
 from .MongoNotificationsRepo import MongoNotificationsRepo
 from .MongoPipelinesRepo import MongoPipelinesRepo
 from .MongoAuthRepo import MongoAuthRepo
+from .MongoSTACRepo import MongoSTACRepo
+from .AsyncMongoRepo import AsyncMongoRepo
+from .AsyncMongoDatasetsRepo import AsyncMongoDatasetsRepo
+from .AsyncMongoModelsRepo import AsyncMongoModelsRepo
+from .AsyncMongoPipelinesRepo import AsyncMongoPipelinesRepo
+from .AsyncMongoFilesRepo import AsyncMongoFilesRepo
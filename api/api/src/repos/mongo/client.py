@@ -1,7 +1,22 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, AsyncMongoClient
+import asyncio
 import os
+import weakref
 
 client = MongoClient(os.environ['MONGO_URL'])
+# async clients are bound to the event loop they are first used in (one per worker)
+async_clients = weakref.WeakKeyDictionary()
 
 def get_db(name=os.environ['MONGO_DB_NAME']):
-	return client[name]
\ No newline at end of file
+	return client[name]
+
+def get_async_db(name=os.environ['MONGO_DB_NAME']):
+	loop = asyncio.get_running_loop()
+	if loop not in async_clients:
+		async_clients[loop] = AsyncMongoClient(os.environ['MONGO_URL'])
+	return async_clients[loop][name]
+
+async def close_async_clients():
+	loop = asyncio.get_running_loop()
+	if loop in async_clients:
+		await async_clients.pop(loop).close()
@@ -6,9 +6,10 @@ from .retrieve_datasets import (
 )
 from .retrieve_dataset import retrieve_dataset_by_name, retrieve_private_dataset_by_name
 from .create_dataset import create_dataset
-from .ingest_file import ingest_dataset_file
+from .ingest_file import ingest_dataset_file, ingest_dataset_files
 from .complete_dataset_ingestion import complete_dataset_ingestion
-from .stage_dataset import stage_dataset_file
+from .upload_large_file import generate_upload_id, ingest_dataset_chunk, complete_multipart_upload
+from .stage_dataset import stage_dataset_file, stage_dataset_files
 from .update_dataset import update_dataset, toggle_like_dataset
 from .deactivate_dataset import deactivate_dataset
 from .private_datasets import make_dataset_private, allow_user_to_private_dataset, remove_user_from_private_dataset
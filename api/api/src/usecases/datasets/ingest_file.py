@@ -7,8 +7,9 @@ import json
 import shutil
 import pystac
 
-from .retrieve_dataset import retrieve_owned_dataset
-from ...errors import DatasetVersionDoesNotExistError
+from .retrieve_dataset import retrieve_owned_dataset_async
+from ..files.staged_files import MAX_BATCH_FILES
+from ...errors import DatasetVersionDoesNotExistError, TooManyFilesError
 from ...repos import DatasetsDBRepo, OSRepo#, GeoDBRepo
 # from ..files import ingest_file, ingest_existing_file
 # from ..user import retrieve_user_credentials
@@ -17,12 +18,23 @@ from ...repos import DatasetsDBRepo, OSRepo#, GeoDBRepo
 
 
 async def ingest_dataset_file(file_name, dataset_id, user):
-    dataset = retrieve_owned_dataset(dataset_id, user)
+    dataset = await retrieve_owned_dataset_async(dataset_id, user)
     os_repo = OSRepo()
     presigned_url = os_repo.generate_presigned_put_url(dataset_id, file_name)
     return presigned_url
 
 
+async def ingest_dataset_files(file_names, dataset_id, user):
+    if len(file_names) > MAX_BATCH_FILES:
+        raise TooManyFilesError(MAX_BATCH_FILES)
+    dataset = await retrieve_owned_dataset_async(dataset_id, user)
+    os_repo = OSRepo()
+    return {
+        file_name: os_repo.generate_presigned_put_url(dataset_id, file_name)
+        for file_name in file_names
+    }
+
+
 # async def ingest_dataset_files_batch(batch, dataset_id, checksums, user, version):
 #     dataset = retrieve_owned_dataset(dataset_id, user.uid)
 #     versions = [v.version_id for v in dataset.versions]
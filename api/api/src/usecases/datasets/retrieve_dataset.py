@@ -1,6 +1,6 @@
 from ...models import Dataset
 from ...errors import DatasetDoesNotExistError, UserUnauthorizedError, DatasetNotActiveError, NoAccessToPrivateError
-from ...repos import DatasetsDBRepo
+from ...repos import DatasetsDBRepo, AsyncDatasetsDBRepo
 # from ..files import retrieve_files
 
 
@@ -26,8 +26,7 @@ def retrieve_dataset_by_name(name):
     return retrieve(data)
 
 
-def retrieve_owned_dataset(dataset_id, user):
-    dataset = retrieve_dataset(dataset_id)
+def check_owned_dataset(dataset, user):
     if dataset.uid != user.uid:
         raise UserUnauthorizedError()
     if dataset.allowed_users and user.id not in dataset.allowed_users:
@@ -35,6 +34,21 @@ def retrieve_owned_dataset(dataset_id, user):
     return dataset
 
 
+def retrieve_owned_dataset(dataset_id, user):
+    return check_owned_dataset(retrieve_dataset(dataset_id), user)
+
+
+async def retrieve_dataset_async(dataset_id):
+    # for the async routes, without blocking the event loop
+    repo = AsyncDatasetsDBRepo()
+    data = await repo.retrieve_dataset(dataset_id)
+    return retrieve(data)
+
+
+async def retrieve_owned_dataset_async(dataset_id, user):
+    return check_owned_dataset(await retrieve_dataset_async(dataset_id), user)
+
+
 # def retrieve_dataset_files(dataset_id, version=None):
 #     dataset = retrieve_dataset(dataset_id)
 #     return retrieve_files(dataset.versions, dataset.files, version)
@@ -1,7 +1,10 @@
 import json
 import prometheus_client
 
+from ...errors import TooManyFilesError
 from ...repos import OSRepo#, GeoDBRepo, FilesDBRepo
+from ..files.staged_files import check_file_exists, check_files_exist, MAX_BATCH_FILES
+from .retrieve_dataset import retrieve_dataset_async
 # from .retrieve_dataset import retrieve_dataset
 # from ..user import retrieve_user_credentials
 
@@ -12,12 +15,25 @@ eotdl_api_downloaded_bytes = prometheus_client.Counter(
     labelnames=["user_email"],
 )
 
-def stage_dataset_file(dataset_id, filename, user, version=None):
+async def stage_dataset_file(dataset_id, filename, user, version=None):
+    # files of the catalog are found in memory, see `check_file_exists`
+    await check_file_exists(dataset_id, filename, retrieve_dataset_async)
+    return OSRepo().get_presigned_url(dataset_id, filename)
+
+
+async def stage_dataset_files(dataset_id, filenames, user, version=None):
+    if len(filenames) > MAX_BATCH_FILES:
+        raise TooManyFilesError(MAX_BATCH_FILES)
+    # files that do not exist are returned as errors instead of urls
+    errors = await check_files_exist(dataset_id, filenames, retrieve_dataset_async)
     os_repo = OSRepo()
-    # if file does not exist, return None
-    if not os_repo.exists(dataset_id, filename):
-        raise Exception(f"File `{filename}` does not exist")
-    return os_repo.get_presigned_url(dataset_id, filename)
+    # urls are signed locally, without a request to the storage for each file
+    presigned_urls = {
+        filename: os_repo.get_presigned_url(dataset_id, filename)
+        for filename in filenames
+        if filename not in errors
+    }
+    return presigned_urls, errors
 
 
 # def download_dataset_file(dataset_id, filename, user, version=None):
@@ -0,0 +1,133 @@
+import os
+import re
+import pyarrow as pa
+import pyarrow.compute as pc
+from starlette.concurrency import run_in_threadpool
+
+from ...repos import OSRepo, MemoryCacheRepo
+
+
+# files per request in the batch endpoints
+MAX_BATCH_FILES = 1000
+
+
+def get_stage_check():
+    # "catalog" finds the files in the catalog first, "storage" always asks the storage
+    return os.getenv("STAGE_FILES_CHECK", "catalog")
+
+
+def get_staged_files_ttl():
+    return float(os.getenv("STAGED_FILES_TTL", "300"))
+
+
+class StagedFiles:
+    """
+    Sorted names of the files of a collection that are referenced by the assets of its
+    catalog, to check that a file exists with a binary search instead of a request to
+    the storage.
+    """
+
+    def __init__(self, table, collection_id):
+        prefix = f"/{collection_id}/stage/"
+        names = []
+        if "assets" in table.schema.names:
+            assets = table.column("assets").combine_chunks()
+            for i, field in enumerate(assets.type):
+                if "href" not in [f.name for f in field.type]:
+                    continue
+                hrefs = pc.struct_field(pc.struct_field(assets, [i]), ["href"]).drop_null()
+                hrefs = hrefs.filter(pc.match_substring(hrefs, prefix))
+                names.append(
+                    pc.replace_substring_regex(hrefs, f"^.*?{re.escape(prefix)}", "").cast(pa.string())
+                )
+        names = pa.chunked_array(names, pa.string()).combine_chunks() if names else pa.array([], pa.string())
+        names = pc.unique(names)
+        self.names = pc.take(names, pc.array_sort_indices(names))
+
+    def __contains__(self, file_name):
+        lo, hi = 0, len(self.names)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.names[mid].as_py() < file_name:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo < len(self.names) and self.names[lo].as_py() == file_name
+
+
+def get_staged_files_cache():
+    return MemoryCacheRepo("staged-files", get_staged_files_ttl(), max_entries=1000)
+
+
+def load_staged_files(collection_id, collection):
+    # imported here, the stac usecases depend on the datasets usecases
+    from ..stac.retrieve_catalog import retrieve_catalog_table
+
+    try:
+        version = max(v.version_id for v in collection.versions)
+        table = retrieve_catalog_table(collection_id, version)
+    except Exception:
+        table = pa.table({})
+    return StagedFiles(table, collection_id)
+
+
+async def retrieve_staged_files(collection_id, retrieve_collection):
+    """
+    Files in the catalog of the latest version of a collection, cached for STAGED_FILES_TTL
+    seconds. Collections without a catalog have no files. The collection is awaited, the
+    catalog is read in the thread pool.
+    """
+    cache = MemoryCacheRepo("staged-files", get_staged_files_ttl(), max_entries=1000)
+    files = cache.get(collection_id)
+    if files is not None:
+        return files
+    try:
+        collection = await retrieve_collection(collection_id)
+    except Exception:
+        collection = None
+    files = await run_in_threadpool(load_staged_files, collection_id, collection)
+    return cache.put(collection_id, files)
+
+
+def load_staged_files(collection_id, collection):
+    # imported here, the stac usecases depend on the datasets usecases
+    from ..stac.retrieve_catalog import retrieve_catalog_table
+
+    try:
+        version = max(v.version_id for v in collection.versions)
+        table = retrieve_catalog_table(collection_id, version)
+    except Exception:
+        table = pa.table({})
+    return StagedFiles(table, collection_id)
+
+
+def check_file_in_storage(collection_id, filename):
+    if not OSRepo().exists(collection_id, filename):
+        raise Exception(f"File `{filename}` does not exist")
+
+
+async def check_file_exists(collection_id, filename, retrieve_collection):
+    """
+    Raises if a file of a collection does not exist. Files of the catalog are found in
+    memory, other files (e.g. the catalogs, or files ingested after the catalog was
+    cached) are checked in the storage, in the thread pool. `retrieve_collection` is
+    async, so the database does not block the event loop of the async routes.
+    """
+    if get_stage_check() == "catalog":
+        if filename in await retrieve_staged_files(collection_id, retrieve_collection):
+            return
+    await run_in_threadpool(check_file_in_storage, collection_id, filename)
+
+
+async def check_files_exist(collection_id, filenames, retrieve_collection):
+    """
+    Returns the errors of the files of a collection that do not exist, by name. Files
+    are checked like in `check_file_exists`, the catalog is only retrieved once.
+    """
+    errors = {}
+    for filename in filenames:
+        try:
+            await check_file_exists(collection_id, filename, retrieve_collection)
+        except Exception as e:
+            errors[filename] = str(e)
+    return errors
@@ -5,9 +5,10 @@ from .retrieve_models import (
     retrieve_popular_models,
 )
 from .create_model import create_model
-from .ingest_file import ingest_model_file
+from .ingest_file import ingest_model_file, ingest_model_files
 from .complete_model_ingestion import complete_model_ingestion
-from .stage_model import stage_model_file
+from .upload_large_file import generate_upload_id, ingest_model_chunk, complete_multipart_upload
+from .stage_model import stage_model_file, stage_model_files
 from .update_model import update_model, toggle_like_model
 from .deactivate_model import deactivate_model
 from .private_models import make_model_private, allow_user_to_private_model
\ No newline at end of file
@@ -1,15 +1,22 @@
-from ...repos import OSRepo, ModelsDBRepo
+from ...repos import OSRepo, ModelsDBRepo, CatalogCacheRepo
 from ...models import Version
 from .retrieve_model import retrieve_model, retrieve_owned_model
 
 def complete_model_ingestion(model_id, user, version, size):
     model_repo = ModelsDBRepo()
     model = retrieve_owned_model(model_id, user.uid)
+    # a new catalog is published, cached tables of the model are stale
+    CatalogCacheRepo().invalidate(model_id)
+    # imported here, the stac usecases depend on the models usecases
+    from ..stac.stac_index import process_catalog
+
     if version == 1:
-        model.versions[0].size = size
+        stac = process_catalog(model.id, model.name, version)
+        model.versions[0] = model.versions[0].model_copy(update={"size": size, **stac})
         return model_repo.update_model(model.id, model.model_dump())
-    latest_version = Version(version_id=version, size=size)
     version_ids = sorted([v.version_id for v in model.versions])
-    assert latest_version.version_id not in version_ids, "Latest version already exists"
-    assert len(version_ids) == latest_version.version_id - 1, "Latest version is not the next version"
-    return model_repo.create_model_version(model, latest_version.model_dump())
\ No newline at end of file
+    assert version not in version_ids, "Latest version already exists"
+    assert len(version_ids) == version - 1, "Latest version is not the next version"
+    stac = process_catalog(model.id, model.name, version)
+    latest_version = Version(version_id=version, size=size, **stac)
+    return model_repo.create_model_version(model, latest_version.model_dump())
@@ -1,16 +1,17 @@
 import json
 import prometheus_client
+from starlette.concurrency import run_in_threadpool
 
-from ...repos import OSRepo, GeoDBRepo, FilesDBRepo
-from .retrieve_model import retrieve_model
+from ...repos import OSRepo, GeoDBRepo, AsyncFilesDBRepo
+from .retrieve_model import retrieve_model, retrieve_model_async
 from ..user import retrieve_user_credentials
 from ..datasets.stage_dataset import eotdl_api_downloaded_bytes
 
 
-def download_model_file(model_id, filename, user, version=None):
+async def download_model_file(model_id, filename, user, version=None):
     os_repo = OSRepo()
     if version is None:  # retrieve latest version
-        version = retrieve_latest_file_version(model_id, filename)
+        version = await retrieve_latest_file_version(model_id, filename)
 
     async def track_download_volume(*args, **kwargs):
         async for data in os_repo.data_stream(*args, **kwargs):
@@ -18,7 +19,7 @@ def download_model_file(model_id, filename, user, version=None):
             yield data
 
     filename = f"{filename}_{version}"
-    object_info = os_repo.object_info(model_id, filename)
+    object_info = await run_in_threadpool(os_repo.object_info, model_id, filename)
     return track_download_volume, object_info, filename
 
 
@@ -33,10 +34,10 @@ def download_stac_catalog(model_id, user):
     return json.loads(gdf.to_json())
 
 
-def retrieve_latest_file_version(model_id, filename):
-    files_repo = FilesDBRepo()
-    model = retrieve_model(model_id)
-    files = files_repo.retrieve_file(model.files, filename)
+async def retrieve_latest_file_version(model_id, filename):
+    files_repo = AsyncFilesDBRepo()
+    model = await retrieve_model_async(model_id)
+    files = await files_repo.retrieve_file(model.files, filename)
     if not files or "files" not in files:
         raise Exception("File does not exist")
     file = sorted(files["files"], key=lambda x: x["version"])[-1]
@@ -1,8 +1,21 @@
-from .retrieve_model import retrieve_owned_model
+from .retrieve_model import retrieve_owned_model_async
+from ..files.staged_files import MAX_BATCH_FILES
+from ...errors import TooManyFilesError
 from ...repos import OSRepo
 
 async def ingest_model_file(file_name, model_id, user):
-    model = retrieve_owned_model(model_id, user.uid)
+    model = await retrieve_owned_model_async(model_id, user.uid)
     os_repo = OSRepo()
     presigned_url = os_repo.generate_presigned_put_url(model_id, file_name)
-    return presigned_url
\ No newline at end of file
+    return presigned_url
+
+
+async def ingest_model_files(file_names, model_id, user):
+    if len(file_names) > MAX_BATCH_FILES:
+        raise TooManyFilesError(MAX_BATCH_FILES)
+    model = await retrieve_owned_model_async(model_id, user.uid)
+    os_repo = OSRepo()
+    return {
+        file_name: os_repo.generate_presigned_put_url(model_id, file_name)
+        for file_name in file_names
+    }
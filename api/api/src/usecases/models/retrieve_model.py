@@ -1,6 +1,6 @@
 from ...models import Model
 from ...errors import ModelDoesNotExistError, UserUnauthorizedError, ModelNotActiveError, NoAccessToPrivateError
-from ...repos import ModelsDBRepo
+from ...repos import ModelsDBRepo, AsyncModelsDBRepo
 
 
 def retrieve(data):
@@ -23,10 +23,24 @@ def retrieve_model_by_name(name):
     return retrieve(data)
 
 
-def retrieve_owned_model(model_id, uid):
-    model = retrieve_model(model_id)
+def check_owned_model(model, uid):
     if model.uid != uid:
         raise UserUnauthorizedError()
     if model.allowed_users and uid not in model.allowed_users:
         raise NoAccessToPrivateError()
     return model
+
+
+def retrieve_owned_model(model_id, uid):
+    return check_owned_model(retrieve_model(model_id), uid)
+
+
+async def retrieve_model_async(model_id):
+    # for the async routes, without blocking the event loop
+    repo = AsyncModelsDBRepo()
+    data = await repo.retrieve_model(model_id)
+    return retrieve(data)
+
+
+async def retrieve_owned_model_async(model_id, uid):
+    return check_owned_model(await retrieve_model_async(model_id), uid)
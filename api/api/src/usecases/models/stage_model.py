@@ -1,6 +1,9 @@
 import prometheus_client
 
+from ...errors import TooManyFilesError
 from ...repos import OSRepo
+from ..files.staged_files import check_file_exists, check_files_exist, MAX_BATCH_FILES
+from .retrieve_model import retrieve_model_async
 
 # ValueError: Duplicated timeseries in CollectorRegistry: {'eotdl_api_downloaded_bytes_created', 'eotdl_api_downloaded_bytes', 'eotdl_api_downloaded_bytes_total'}
 
@@ -10,8 +13,21 @@ from ...repos import OSRepo
 #     labelnames=["user_email"],
 # )
 
-def stage_model_file(model_id, filename, user, version=None):
+async def stage_model_file(model_id, filename, user, version=None):
+    # files of the catalog are found in memory, see `check_file_exists`
+    await check_file_exists(model_id, filename, retrieve_model_async)
+    return OSRepo().get_presigned_url(model_id, filename)
+
+async def stage_model_files(model_id, filenames, user, version=None):
+    if len(filenames) > MAX_BATCH_FILES:
+        raise TooManyFilesError(MAX_BATCH_FILES)
+    # files that do not exist are returned as errors instead of urls
+    errors = await check_files_exist(model_id, filenames, retrieve_model_async)
     os_repo = OSRepo()
-    if not os_repo.exists(model_id, filename):
-        raise Exception(f"File `{filename}` does not exist")
-    return os_repo.get_presigned_url(model_id, filename)
\ No newline at end of file
+    # urls are signed locally, without a request to the storage for each file
+    presigned_urls = {
+        filename: os_repo.get_presigned_url(model_id, filename)
+        for filename in filenames
+        if filename not in errors
+    }
+    return presigned_urls, errors
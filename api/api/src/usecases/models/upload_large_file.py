@@ -1,52 +1,42 @@
 from datetime import datetime
 
-from ...repos import FilesDBRepo, OSRepo, S3Repo, ModelsDBRepo
-from ...models import UploadingFile, File
+from ...repos import FilesDBRepo, OSRepo, S3Repo
+from ...models import UploadingFile
 from .retrieve_model import retrieve_owned_model
 from ...errors import UploadIdDoesNotExist, ChunkUploadChecksumMismatch
 
 
-def generate_upload_id(user, checksum, filename, model_id):
+def generate_upload_id(user, checksum, filename, model_id, chunk_size=None):
     files_repo, os_repo, s3_repo = FilesDBRepo(), OSRepo(), S3Repo()
     # check if model already exists
     model = retrieve_owned_model(model_id, user.uid)
-    # check if file exists
-    files = files_repo.retrieve_file(model.files, filename)
-    if files and "files" in files:
-        # retrieve most recent version
-        file = sorted(files["files"], key=lambda x: x["version"])[-1]
-        if file["checksum"] == checksum:  # the file has not been modified
-            raise Exception("File already exists")
-        file_version = file["version"] + 1
-    else:
-        file_version = 1
+    # file is stored in the same location than with presigned urls
+    storage = os_repo.get_object(model.id, filename)
     # check if upload already exists
-    data = files_repo.find_upload(user.uid, filename, file_version, model_id)
+    data = files_repo.find_upload(user.uid, filename, model_id)
     if data:
         uploading = UploadingFile(**data)
-        # abort if trying to resume existing upload with a different file
-        if uploading.checksum != checksum:
+        # abort if trying to resume existing upload with a different file, or if the
+        # size of its parts is unknown (they may not line up with the new ones)
+        if uploading.checksum != checksum or (chunk_size and not uploading.chunk_size):
+            s3_repo.abort_multipart_upload(storage, uploading.upload_id)
             files_repo.delete_upload(uploading.id)
-        else:  # resume upload
-            return uploading.upload_id, uploading.parts
-    # TODO: check if user can ingest file
+        else:  # resume upload, with the size of the parts already uploaded
+            return uploading.upload_id, uploading.parts, uploading.chunk_size
     # create new upload
     id = files_repo.generate_id()
-    storage = os_repo.get_object(model.id, f"{filename}_{file_version}")
-    upload_id = s3_repo.multipart_upload_id(
-        storage
-    )  # does this work if the file already exists ?
+    upload_id = s3_repo.multipart_upload_id(storage)
     uploading = UploadingFile(
         uid=user.uid,
         id=id,
         upload_id=upload_id,
         model=model_id,
-        version=file_version,
         filename=filename,
         checksum=checksum,
+        chunk_size=chunk_size,
     )
     files_repo.persist_upload(uploading.id, uploading.model_dump())
-    return upload_id, []
+    return upload_id, [], chunk_size
 
 
 def ingest_model_chunk(file, part_number, upload_id, checksum, user):
@@ -55,25 +45,16 @@ def ingest_model_chunk(file, part_number, upload_id, checksum, user):
     if not data or data["uid"] != user.uid:
         raise UploadIdDoesNotExist()
     uploading = UploadingFile(**data)
-    storage = os_repo.get_object(
-        uploading.model, f"{uploading.filename}_{uploading.version}"
-    )
+    storage = os_repo.get_object(uploading.model, uploading.filename)
     _checksum = s3_repo.store_chunk(file, storage, part_number, upload_id)
     if checksum != _checksum:
         raise ChunkUploadChecksumMismatch()
-    uploading.parts.append(part_number)
-    uploading.updatedAt = datetime.now()
-    files_repo.update("uploading", uploading.id, uploading.model_dump())
+    files_repo.add_upload_part(uploading.id, part_number, datetime.now())
     return "Chunk uploaded"
 
 
-def complete_multipart_upload(user, upload_id, version):
-    models_repo, files_repo, os_repo, s3_repo = (
-        ModelsDBRepo(),
-        FilesDBRepo(),
-        OSRepo(),
-        S3Repo(),
-    )
+def complete_multipart_upload(user, upload_id):
+    files_repo, os_repo, s3_repo = FilesDBRepo(), OSRepo(), S3Repo()
     # check if upload already exists
     data = files_repo.find_upload_by_id(user.uid, upload_id)
     if not data:
@@ -82,26 +63,9 @@ def complete_multipart_upload(user, upload_id, version):
     # check if model exists
     model = retrieve_owned_model(uploading.model, user.uid)
     # complete upload
-    storage = os_repo.get_object(model.id, f"{uploading.filename}_{uploading.version}")
+    storage = os_repo.get_object(model.id, uploading.filename)
     s3_repo.complete_multipart_upload(storage, upload_id)
-    object_info = os_repo.object_info(
-        model.id, f"{uploading.filename}_{uploading.version}"
-    )
-    # we don't compute checksum since for very large files will take a long time...
-    # We are not checking if the fil already exists here...
-    new_file = File(
-        name=uploading.filename,
-        size=object_info.size,
-        checksum=uploading.checksum,  # should compute again, but can be expensive...
-        version=uploading.version,
-        versions=[version],
-    )
-    files_repo.add_file(model.files, new_file.model_dump())
-    # TODO: check if user can ingest
-    version = [v for v in model.versions if v.version_id == version][0]
-    version.size += object_info.size
-    model.updatedAt = datetime.now()
-    models_repo.update_model(model.id, model.model_dump())
-    # TODO: report usage
+    object_info = os_repo.object_info(model.id, uploading.filename)
+    # the size is added to the version when the ingestion is completed
     files_repo.delete_upload(uploading.id)
-    return model
+    return object_info.size
@@ -1,6 +1,6 @@
 from ...models import Pipeline
 from ...errors import PipelineDoesNotExistError, UserUnauthorizedError, PipelineNotActiveError
-from ...repos import PipelinesDBRepo
+from ...repos import PipelinesDBRepo, AsyncPipelinesDBRepo
 
 
 def retrieve(data):
@@ -23,8 +23,22 @@ def retrieve_pipeline_by_name(name):
     return retrieve(data)
 
 
-def retrieve_owned_pipeline(pipeline_id, uid):
-    model = retrieve_pipeline(pipeline_id)
+def check_owned_pipeline(model, uid):
     if model.uid != uid:
         raise UserUnauthorizedError()
-    return model
\ No newline at end of file
+    return model
+
+
+def retrieve_owned_pipeline(pipeline_id, uid):
+    return check_owned_pipeline(retrieve_pipeline(pipeline_id), uid)
+
+
+async def retrieve_pipeline_async(pipeline_id):
+    # for the async routes, without blocking the event loop
+    repo = AsyncPipelinesDBRepo()
+    data = await repo.retrieve_pipeline(pipeline_id)
+    return retrieve(data)
+
+
+async def retrieve_owned_pipeline_async(pipeline_id, uid):
+    return check_owned_pipeline(await retrieve_pipeline_async(pipeline_id), uid)
\ No newline at end of file
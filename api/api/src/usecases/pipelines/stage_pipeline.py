@@ -1,12 +1,13 @@
 import json
 
 from ...repos import OSRepo
+from ..files.staged_files import check_file_exists
+from .retrieve_pipeline import retrieve_pipeline_async
 
-def stage_pipeline_file(pipeline_id, filename, user, version=None):
-    os_repo = OSRepo()
-    if not os_repo.exists(pipeline_id, filename):
-        raise Exception(f"File `{filename}` does not exist")
-    return os_repo.get_presigned_url(pipeline_id, filename)
+async def stage_pipeline_file(pipeline_id, filename, user, version=None):
+    # files of the catalog are found in memory, see `check_file_exists`
+    await check_file_exists(pipeline_id, filename, retrieve_pipeline_async)
+    return OSRepo().get_presigned_url(pipeline_id, filename)
 
 def read_file(pipeline_id, filename, version=None):
     os_repo = OSRepo()
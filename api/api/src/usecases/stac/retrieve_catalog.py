@@ -0,0 +1,150 @@
+import os
+import tempfile
+import uuid
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from ..datasets.retrieve_dataset import retrieve_dataset_by_name
+from ..models.retrieve_model import retrieve_model_by_name
+from ..pipelines.retrieve_pipeline import retrieve_pipeline_by_name
+from ...repos import OSRepo, CatalogCacheRepo
+from ...errors import DatasetDoesNotExistError, ModelDoesNotExistError
+
+
+def retrieve_collection(collection_name):
+    try:
+        return retrieve_dataset_by_name(collection_name)
+    except DatasetDoesNotExistError:
+        try:
+            return retrieve_model_by_name(collection_name)
+        except ModelDoesNotExistError:
+            return retrieve_pipeline_by_name(collection_name)
+
+
+def retrieve_catalog_table(collection_id, version):
+    """
+    Returns the catalog of a version as an arrow table. Catalogs are only downloaded
+    if they are not cached or changed in the storage since they were cached.
+    """
+    file_name = f"catalog.v{version}.parquet"
+    etag = OSRepo().object_info(collection_id, file_name).etag
+    return load_catalog_table(collection_id, version, etag)
+
+
+def load_catalog_table(collection_id, version, etag):
+    cache = CatalogCacheRepo()
+    table = cache.get(collection_id, version, etag)
+    if table is not None:
+        return table
+    os_repo = OSRepo()
+    file_name = f"catalog.v{version}.parquet"
+    file_path = cache.get_file_path(collection_id, version, etag)
+    if file_path:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        # other workers only see the file once it is complete, each download has its own
+        # temporary file in case several workers download the catalog at the same time
+        tmp_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+        os_repo.download_file(collection_id, file_name, tmp_path)
+        os.replace(tmp_path, file_path)
+        cache.remove_stale_files(collection_id, version, etag)
+        table = pq.read_table(file_path)
+    else:
+        with tempfile.TemporaryDirectory() as tmp_path:
+            os_repo.download_file(collection_id, file_name, os.path.join(tmp_path, file_name))
+            table = pq.read_table(os.path.join(tmp_path, file_name))
+    return cache.put(collection_id, version, etag, table)
+
+
+def retrieve_catalog_rows(collection_id, version, offset, limit):
+    """
+    Returns `limit` rows of a catalog from `offset`, and the number of rows of the
+    catalog. Catalogs that fit in the cache are sliced in memory, larger catalogs only
+    read the row groups covering the rows (found with the metadata of the file).
+    """
+    file_name = f"catalog.v{version}.parquet"
+    os_repo = OSRepo()
+    info = os_repo.object_info(collection_id, file_name)
+    if info.size <= CatalogCacheRepo().max_size:
+        table = load_catalog_table(collection_id, version, info.etag)
+        return table.slice(offset, limit), table.num_rows
+    with os_repo.open_file(collection_id, file_name, info.size) as f:
+        parquet_file = pq.ParquetFile(f)
+        row_groups, start, first = [], 0, None
+        for i in range(parquet_file.num_row_groups):
+            num_rows = parquet_file.metadata.row_group(i).num_rows
+            if start + num_rows > offset and start < offset + limit:
+                first = start if first is None else first
+                row_groups.append(i)
+            start += num_rows
+        if not row_groups:
+            return parquet_file.schema_arrow.empty_table(), start
+        table = parquet_file.read_row_groups(row_groups)
+    return table.slice(offset - first, limit), start
+
+
+def retrieve_catalog_batches(collection_id, version, batch_size):
+    """
+    Returns a generator of the rows of a catalog in batches. Catalogs that fit in the
+    cache are split in memory, larger catalogs are read one batch at a time.
+    """
+    file_name = f"catalog.v{version}.parquet"
+    os_repo = OSRepo()
+    # the catalog is found before iterating, so errors are raised by the caller
+    info = os_repo.object_info(collection_id, file_name)
+    if info.size <= CatalogCacheRepo().max_size:
+        table = load_catalog_table(collection_id, version, info.etag)
+        return iter(table.to_batches(max_chunksize=batch_size))
+
+    def generate():
+        with os_repo.open_file(collection_id, file_name, info.size) as f:
+            yield from pq.ParquetFile(f).iter_batches(batch_size=batch_size)
+
+    return generate()
+
+
+class CatalogIndex:
+    """
+    Item ids of a catalog in sorted order, to find items with a binary search
+    instead of scanning the whole id column.
+    """
+
+    def __init__(self, table):
+        ids = table.column("id")
+        self.rows = pc.sort_indices(ids)
+        self.ids = pc.take(ids, self.rows).combine_chunks()
+        self.nbytes = self.rows.nbytes + self.ids.nbytes
+
+    def find(self, item_id):
+        lo, hi = 0, len(self.ids)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.ids[mid].as_py() < item_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self.ids) and self.ids[lo].as_py() == item_id:
+            return self.rows[lo].as_py()
+        return None
+
+
+def retrieve_catalog_item(collection_id, version, item_id):
+    """
+    Returns the row of an item in the catalog as a table, or None if it does not exist.
+    Cached catalogs are searched with an index, built once and kept with the table.
+    Otherwise only the row groups whose statistics may contain the item are read from
+    the storage, instead of downloading the whole catalog.
+    """
+    file_name = f"catalog.v{version}.parquet"
+    os_repo, cache = OSRepo(), CatalogCacheRepo()
+    info = os_repo.object_info(collection_id, file_name)
+    table = cache.get(collection_id, version, info.etag)
+    if table is None:
+        with os_repo.open_file(collection_id, file_name, info.size) as f:
+            table = pq.read_table(f, filters=[("id", "=", item_id)])
+        return table if table.num_rows > 0 else None
+    index = cache.get_index(collection_id, version, info.etag, CatalogIndex)
+    if index is None:  # evicted since it was retrieved
+        table = table.filter(pc.equal(table.column("id"), item_id))
+        return table if table.num_rows > 0 else None
+    row = index.find(item_id)
+    return table.slice(row, 1) if row is not None else None
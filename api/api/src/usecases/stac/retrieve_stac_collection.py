@@ -3,6 +3,7 @@ from ..datasets.retrieve_dataset import retrieve_dataset_by_name
 from ..models.retrieve_model import retrieve_model_by_name
 from ..pipelines.retrieve_pipeline import retrieve_pipeline_by_name
 from ...errors import DatasetDoesNotExistError, ModelDoesNotExistError
+from .summarize_catalog import collection_fields
 
 def retrieve_stac_collection(collection_name: str, request: Request = None):
     try:
@@ -26,14 +27,7 @@ def retrieve_stac_collection(collection_name: str, request: Request = None):
         "title": obj.name,
         "description": obj.metadata.description,
         "license": obj.metadata.license,
-        # "extent": {
-        #     "spatial": {
-        #         "bbox": [[-180, -90, 180, 90]]
-        #     },
-        #     "temporal": {
-        #         "interval": [["2020-01-01T00:00:00Z", None]]
-        #     }
-        # },
+        **collection_fields(obj.versions),
         "links": [
             {
                 "href": f"{base_url}/{obj.name}",
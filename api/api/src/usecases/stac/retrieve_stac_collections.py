@@ -1,63 +1,77 @@
+import hashlib
+import json
+import os
 from fastapi import Request
 
 from api.config import VERSION
 
-from ..datasets import retrieve_datasets
-from ..models import retrieve_models
-from ..pipelines import retrieve_pipelines
+from .retrieve_stac_items import parse_token
+from .summarize_catalog import collection_fields
+from ...models import Version
+from ...repos import STACDBRepo, MemoryCacheRepo
 
+DEFAULT_COLLECTIONS_LIMIT = 100
+MAX_COLLECTIONS_LIMIT = 1000
 
-def retrieve_stac_collections(request: Request):
-    datasets = retrieve_datasets()
-    models = retrieve_models()
-    pipelines = retrieve_pipelines()
 
+def get_collections_ttl():
+    return float(os.getenv("STAC_COLLECTIONS_TTL", "30"))
+
+
+def retrieve_stac_collections(request: Request, limit=DEFAULT_COLLECTIONS_LIMIT, token=None):
+    """
+    Returns the ETag and the JSON of a page of collections. Pages are rendered from a
+    single query with the fields they need and cached for STAC_COLLECTIONS_TTL seconds.
+    """
+    limit = min(limit, MAX_COLLECTIONS_LIMIT)
+    offset = parse_token(token)
     # Handle HTTPS in production behind reverse proxy
     if request.headers.get("x-forwarded-proto") == "https":
         base_url = str(request.base_url).replace("http://", "https://").rstrip("/") + "/stac/collections"
     else:
         base_url = str(request.base_url).rstrip("/") + "/stac/collections"
+    cache = MemoryCacheRepo("stac-collections", get_collections_ttl())
+    page = cache.get((base_url, offset, limit))
+    if page is not None:
+        return page
+    # one more to know if there is a next page
+    data = STACDBRepo().retrieve_collections(offset, limit + 1)
     collections = []
     links = []
 
     def build_collection(obj):
+        metadata = obj.get("metadata", {})
+        versions = [Version(**version) for version in obj.get("versions", [])]
         return {
             "stac_version": "1.0.0",
             "type": "Collection",
             # "id": obj.id,
-            "id": obj.name, # if we use id the items will not be found
-            "title": obj.name,
-            "description": f"{obj.name} collection",
-            "license": "proprietary",
-            # "extent": {
-            #     "spatial": {
-            #         "bbox": [[-180, -90, 180, 90]]
-            #     },
-            #     "temporal": {
-            #         "interval": [["2020-01-01T00:00:00Z", None]]
-            #     }
-            # },
+            "id": obj["name"], # if we use id the items will not be found
+            "title": obj["name"],
+            "description": metadata.get("description") or f"{obj['name']} collection",
+            "license": metadata.get("license") or "proprietary",
+            **collection_fields(versions),
             "links": [
                 {
-                    "href": f"{base_url}/{obj.name}",
+                    "href": f"{base_url}/{obj['name']}",
                     "rel": "self",
                     "type": "application/json"
                 },
                 {
-                    "href": f"{base_url}/{obj.name}/items",
+                    "href": f"{base_url}/{obj['name']}/items",
                     "rel": "items",
                     "type": "application/geo+json"
                 }
             ]
         }
 
-    for obj in datasets + models + pipelines:
+    for obj in data[:limit]:
         collections.append(build_collection(obj))
         links.append({
-            "href": f"{base_url}/{obj.name}",
+            "href": f"{base_url}/{obj['name']}",
             "rel": "child",
             "type": "application/json",
-            "title": obj.name
+            "title": obj["name"]
         })
 
     # Add self link to the root response
@@ -66,8 +80,16 @@ def retrieve_stac_collections(request: Request):
         "rel": "self",
         "type": "application/json"
     })
+    if len(data) > limit:
+        links.append({
+            "href": f"{base_url}?limit={limit}&token={offset + limit}",
+            "rel": "next",
+            "type": "application/json"
+        })
 
-    return {
+    content = json.dumps({
         "collections": collections,
         "links": links
-    }
\ No newline at end of file
+    }).encode()
+    etag = '"' + hashlib.sha1(content).hexdigest() + '"'
+    return cache.put((base_url, offset, limit), (etag, content))
@@ -1,68 +1,87 @@
-import pandas as pd
+import json
 import stac_geoparquet
-import pyarrow.parquet as pq
-from tqdm import tqdm
-import requests
-import tempfile
-import os
+import pyarrow as pa
+from fastapi.encoders import jsonable_encoder
 
-from ..datasets.retrieve_dataset import retrieve_dataset_by_name
-from ..models.retrieve_model import retrieve_model_by_name
-from ..pipelines.retrieve_pipeline import retrieve_pipeline_by_name
-from ...repos import OSRepo
-from ...errors import DatasetDoesNotExistError, ModelDoesNotExistError
+from .retrieve_catalog import retrieve_collection, retrieve_catalog_rows, retrieve_catalog_batches
 
-def retrieve_stac_items(collection_name, version):
+DEFAULT_LIMIT = 1000
+MAX_LIMIT = 10000
+
+
+def parse_token(token):
+    # tokens are opaque for clients, internally they are the offset of the next page
     try:
-        data = retrieve_dataset_by_name(collection_name)
-    except DatasetDoesNotExistError:
-        try:
-            data = retrieve_model_by_name(collection_name)
-        except ModelDoesNotExistError:
-            data = retrieve_pipeline_by_name(collection_name)
-    os_repo = OSRepo()
-    catalog_presigned_url = os_repo.get_presigned_url(data.id, f"catalog.v{version}.parquet")
-    
-    # Download the file first since pyarrow doesn't support HTTP URLs directly
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.parquet') as temp_file:
-        try:
-            # Download the file from the presigned URL
-            response = requests.get(catalog_presigned_url)
-            response.raise_for_status()
-            temp_file.write(response.content)
-            temp_file.flush()
-            
-            # Read the parquet file
-            table = pq.read_table(temp_file.name)
-            items = []
-            for item in tqdm(stac_geoparquet.arrow.stac_table_to_items(table), total=len(table)):
-                items.append(item)
-            
-            # Return as FeatureCollection according to STAC API specification
-            return {
-                "type": "FeatureCollection",
-                "features": items,
-                "links": [
-                    {
-                        "rel": "self",
-                        "type": "application/geo+json",
-                        "href": f"/stac/collections/{collection_name}/items"
-                    },
-                    {
-                        "rel": "parent",
-                        "type": "application/json",
-                        "href": f"/stac/collections/{collection_name}"
-                    },
-                    {
-                        "rel": "root",
-                        "type": "application/json",
-                        "href": "/stac"
-                    }
-                ],
-                "numberMatched": len(items),
-                "numberReturned": len(items)
-            }
-        finally:
-            # Clean up the temporary file
-            if os.path.exists(temp_file.name):
-                os.unlink(temp_file.name)
\ No newline at end of file
+        offset = int(token) if token else 0
+    except ValueError:
+        raise Exception(f"Invalid token `{token}`")
+    if offset < 0:
+        raise Exception(f"Invalid token `{token}`")
+    return offset
+
+
+def stac_url(request):
+    # Handle HTTPS in production behind reverse proxy
+    base_url = str(request.base_url)
+    if request.headers.get("x-forwarded-proto") == "https":
+        base_url = base_url.replace("http://", "https://")
+    return base_url.rstrip("/") + "/stac"
+
+
+def retrieve_stac_items(request, collection_name, version, limit=DEFAULT_LIMIT, token=None):
+    limit = min(limit, MAX_LIMIT)
+    base_url = stac_url(request)
+    offset = parse_token(token)
+    data = retrieve_collection(collection_name)
+    # only the items in the page are read and converted
+    rows, num_rows = retrieve_catalog_rows(data.id, version, offset, limit)
+    items = list(stac_geoparquet.arrow.stac_table_to_items(rows))
+    links = [
+        {
+            "rel": "self",
+            "type": "application/geo+json",
+            "href": f"{base_url}/collections/{collection_name}/items"
+        },
+        {
+            "rel": "parent",
+            "type": "application/json",
+            "href": f"{base_url}/collections/{collection_name}"
+        },
+        {
+            "rel": "root",
+            "type": "application/json",
+            "href": base_url
+        }
+    ]
+    if offset + limit < num_rows:
+        links.append({
+            "rel": "next",
+            "type": "application/geo+json",
+            "href": f"{base_url}/collections/{collection_name}/items?version={version}&limit={limit}&token={offset + limit}"
+        })
+
+    # Return as FeatureCollection according to STAC API specification
+    return {
+        "type": "FeatureCollection",
+        "features": items,
+        "links": links,
+        "numberMatched": num_rows,
+        "numberReturned": len(items)
+    }
+
+
+def stream_stac_items(collection_name, version, batch_size=DEFAULT_LIMIT):
+    """
+    Returns a generator of the items of the collection as newline-delimited GeoJSON,
+    reading and converting the catalog in batches so memory does not grow with the collection.
+    """
+    # the catalog is retrieved before streaming, so errors are reported with the response
+    data = retrieve_collection(collection_name)
+    batches = retrieve_catalog_batches(data.id, version, batch_size)
+
+    def generate():
+        for batch in batches:
+            for item in stac_geoparquet.arrow.stac_table_to_items(pa.Table.from_batches([batch])):
+                yield json.dumps(jsonable_encoder(item)) + "\n"
+
+    return generate()
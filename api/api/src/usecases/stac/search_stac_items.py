@@ -1,66 +1,371 @@
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+import json
 import duckdb
+import numpy as np
+import pyarrow as pa
+import shapely
+import stac_geoparquet
 
-from ..datasets.retrieve_dataset import retrieve_dataset_by_name
-from ..models.retrieve_model import retrieve_model_by_name
-from ..pipelines.retrieve_pipeline import retrieve_pipeline_by_name
-from ...repos import OSRepo
-from ...errors import DatasetDoesNotExistError, ModelDoesNotExistError
+from .retrieve_catalog import retrieve_collection, load_catalog_table
+from .retrieve_stac_items import stac_url
+from .stac_index import search_collections
+from ...repos import OSRepo, CatalogCacheRepo, DuckDBRepo
+from ...errors import (
+    DatasetDoesNotExistError,
+    DatasetNotActiveError,
+    ModelDoesNotExistError,
+    ModelNotActiveError,
+    PipelineDoesNotExistError,
+    PipelineNotActiveError,
+)
 
-# TODO: versioning, spatial and temporal queries
+DEFAULT_SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 10000
+# rows read at a time when geometries are filtered
+GEOMETRY_CHUNK_SIZE = 1000
 
-def search_stac_items(collection_name, query, version=1):
+# collections in the index that can not be searched anymore
+UNAVAILABLE_ERRORS = (
+    DatasetDoesNotExistError,
+    DatasetNotActiveError,
+    ModelDoesNotExistError,
+    ModelNotActiveError,
+    PipelineDoesNotExistError,
+    PipelineNotActiveError,
+)
+
+COMPARISON_OPS = {"=": "=", "<>": "<>", "!=": "<>", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+
+
+def parse_bbox(bbox):
+    if isinstance(bbox, str):
+        bbox = bbox.split(",")
+    try:
+        bbox = [float(x) for x in bbox]
+    except (TypeError, ValueError):
+        raise Exception(f"Invalid bbox `{bbox}`")
+    if len(bbox) == 6:  # 3D bbox, elevation is ignored
+        bbox = [bbox[0], bbox[1], bbox[3], bbox[4]]
+    if len(bbox) != 4 or bbox[1] > bbox[3]:
+        raise Exception(f"Invalid bbox `{bbox}`")
+    return bbox
+
+
+def parse_timestamp(value):
     try:
-        data = retrieve_dataset_by_name(collection_name)
-    except DatasetDoesNotExistError:
+        timestamp = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise Exception(f"Invalid datetime `{value}`")
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp
+
+
+def parse_datetime(value):
+    """
+    Returns the (start, end) of a RFC 3339 datetime or interval, None for open ends.
+    """
+    if "/" not in value:
+        timestamp = parse_timestamp(value)
+        return timestamp, timestamp
+    start, end = value.split("/", 1)
+    start = parse_timestamp(start) if start not in ("", "..") else None
+    end = parse_timestamp(end) if end not in ("", "..") else None
+    if start is None and end is None:
+        raise Exception(f"Invalid datetime `{value}`")
+    if start is not None and end is not None and start > end:
+        raise Exception(f"Invalid datetime `{value}`")
+    return start, end
+
+
+def quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+def compile_filter(node, columns, collection_name, params):
+    """
+    Compiles a CQL2-JSON expression (basic CQL2 plus `like`, `between` and `in`) to
+    SQL. Values are never written to the query, they are appended to `params`.
+    """
+    if isinstance(node, (bool, int, float, str)):
+        params.append(node)
+        return "?"
+    if not isinstance(node, dict):
+        raise Exception(f"Invalid filter `{json.dumps(node)}`")
+    if "property" in node:
+        name = node["property"].removeprefix("properties.")
+        if name == "collection":
+            params.append(collection_name)
+            return "?"
+        # properties that are not in this catalog match nothing
+        return quote(name) if name in columns else "NULL"
+    if "timestamp" in node or "date" in node:
+        params.append(parse_timestamp(node.get("timestamp", node.get("date"))))
+        return "?"
+    op, args = str(node.get("op", "")).lower(), node.get("args", [])
+    sql = lambda arg: compile_filter(arg, columns, collection_name, params)
+    if op in ("and", "or") and len(args) >= 2:
+        return "(" + f" {op.upper()} ".join(sql(arg) for arg in args) + ")"
+    if op == "not" and len(args) == 1:
+        return f"(NOT {sql(args[0])})"
+    if op in COMPARISON_OPS and len(args) == 2:
+        return f"({sql(args[0])} {COMPARISON_OPS[op]} {sql(args[1])})"
+    if op == "like" and len(args) == 2:
+        return f"({sql(args[0])} LIKE {sql(args[1])})"
+    if op == "between" and len(args) == 3:
+        return f"({sql(args[0])} BETWEEN {sql(args[1])} AND {sql(args[2])})"
+    if op == "in" and len(args) == 2 and isinstance(args[1], list) and args[1]:
+        return f"({sql(args[0])} IN ({', '.join(sql(arg) for arg in args[1])}))"
+    if op == "isnull" and len(args) == 1:
+        return f"({sql(args[0])} IS NULL)"
+    raise Exception(f"Unsupported filter operator `{node.get('op')}`")
+
+
+def compile_search(columns, collection_name, ids=None, bbox=None, datetime=None, filter=None):
+    """
+    Returns the WHERE clause and parameters of a search over a catalog. The bbox is
+    compared with the `bbox` column, so parquet statistics skip row groups outside of it,
+    but geometries must still be tested against the area of interest.
+    """
+    clauses, params = [], []
+    if ids:
+        clauses.append(f"id IN ({', '.join('?' * len(ids))})")
+        params += ids
+    if bbox and columns.get("bbox", "").startswith("STRUCT"):
+        xmin, ymin, xmax, ymax = bbox
+        clauses.append("bbox.ymin <= ? AND bbox.ymax >= ?")
+        params += [ymax, ymin]
+        if xmin <= xmax:  # bboxes crossing the antimeridian are only tested by geometry
+            clauses.append("bbox.xmin <= ? AND bbox.xmax >= ?")
+            params += [xmax, xmin]
+    if datetime:
+        start, end = datetime
+        if "datetime" not in columns:
+            clauses.append("FALSE")
+        else:
+            # items with a time range match if it overlaps the interval
+            has_range = "start_datetime" in columns and "end_datetime" in columns
+            if start is not None:
+                clauses.append("COALESCE(end_datetime, datetime) >= ?" if has_range else "datetime >= ?")
+                params.append(start)
+            if end is not None:
+                clauses.append("COALESCE(start_datetime, datetime) <= ?" if has_range else "datetime <= ?")
+                params.append(end)
+    if filter:
+        clauses.append(compile_filter(filter, columns, collection_name, params))
+    return " AND ".join(clauses) or "TRUE", params
+
+
+def area_of_interest(bbox=None, intersects=None):
+    if intersects is not None:
         try:
-            data = retrieve_model_by_name(collection_name)
-        except ModelDoesNotExistError:
-            data = retrieve_pipeline_by_name(collection_name)
+            return shapely.from_geojson(json.dumps(intersects))
+        except shapely.errors.GEOSException:
+            raise Exception("Invalid intersects geometry")
+    if bbox is not None:
+        xmin, ymin, xmax, ymax = bbox
+        if xmin > xmax:
+            return shapely.union(shapely.box(xmin, ymin, 180, ymax), shapely.box(-180, ymin, xmax, ymax))
+        return shapely.box(*bbox)
+    return None
+
+
+def row_numbers(table):
+    # kept with the cached catalog, so searches do not allocate them again
+    return pa.array(np.arange(table.num_rows), pa.int64())
+
+
+def catalog_source(duckdb_repo, collection_id, version):
+    """
+    Cached catalogs are queried from memory, larger catalogs are read remotely. Returns
+    the source of the queries, its parameters and the table if it is in memory.
+    """
     os_repo = OSRepo()
-    catalog_presigned_url = os_repo.get_presigned_url(data.id, f"catalog.v{version}.parquet")
-    
-    # Create a DuckDB connection and load required extensions
-    con = duckdb.connect(database=':memory:')
-    con.execute("INSTALL httpfs; LOAD httpfs;")
-    con.execute("INSTALL spatial; LOAD spatial;")
-    
-    # Set request parameters for S3 presigned URL
-    con.execute("SET s3_url_style='path';")
-    
-    # Read parquet file directly with DuckDB and execute query
-    sql = f"""
-    SELECT *
-    FROM read_parquet('{catalog_presigned_url}')
-    WHERE {query}
+    file_name = f"catalog.v{version}.parquet"
+    info = os_repo.object_info(collection_id, file_name)
+    cache = CatalogCacheRepo()
+    if info.size <= cache.max_size:
+        table = load_catalog_table(collection_id, version, info.etag)
+        # queries return the rows that match, taken from the table without copying them in duckdb
+        rows = cache.get_index(collection_id, version, info.etag, row_numbers)
+        if rows is None:  # evicted since it was loaded, or too large to be cached
+            rows = row_numbers(table)
+        return duckdb_repo.register(table.append_column("__row", rows)), [], table
+    path = duckdb_repo.remote_path(collection_id, file_name)
+    return "read_parquet(?)", [path or os_repo.get_presigned_url(collection_id, file_name)], None
+
+
+def search_catalog(duckdb_repo, source, source_params, table, where, params, aoi, offset, limit):
+    """
+    Returns the matching rows of a catalog from `offset`, the offset of the next page
+    and whether all the catalog has been read.
     """
+    # without ORDER BY, rows keep the order of the catalog (insertion order is preserved)
+    sql = f"SELECT {'__row' if table is not None else '*'} FROM {source} WHERE {where} LIMIT ? OFFSET ?"
+    tables, count = [], 0
+    while count < limit:
+        size = limit - count if aoi is None else max(limit - count, GEOMETRY_CHUNK_SIZE)
+        rows = duckdb_repo.query(sql, source_params + params + [size, offset])
+        rows = table.take(rows.column("__row")) if table is not None else rows
+        done = rows.num_rows < size
+        if aoi is not None and rows.num_rows > 0:
+            geometries = shapely.from_wkb(rows.column("geometry").to_numpy(zero_copy_only=False))
+            matches = np.flatnonzero(shapely.intersects(geometries, aoi))[: limit - count]
+            if len(matches) == limit - count:  # next page starts after the last match
+                done = False
+                offset += int(matches[-1]) + 1
+            else:
+                offset += rows.num_rows
+            rows = rows.take(matches)
+        else:
+            offset += rows.num_rows
+        tables.append(rows)
+        count += rows.num_rows
+        if done:
+            return tables, offset, True
+    return tables, offset, False
 
-    # Execute query and fetch results
-    result = con.execute(sql).fetchdf()
-    
-    # Close the connection
-    con.close()
-    
-    # Convert results to JSON
-    items = result.to_json(orient='records')
-    return items
+
+def parse_search_token(token, num_collections):
+    # tokens are opaque for clients, internally they are the collection index and offset
+    try:
+        collection, offset = (int(x) for x in token.split(":")) if token else (0, 0)
+    except ValueError:
+        raise Exception(f"Invalid token `{token}`")
+    if collection < 0 or collection >= num_collections or offset < 0:
+        raise Exception(f"Invalid token `{token}`")
+    return collection, offset
+
+
+def search_link(base_url, search, token, method):
+    if method == "POST":
+        return {
+            "rel": "next",
+            "type": "application/geo+json",
+            "href": f"{base_url}/search",
+            "method": "POST",
+            "body": {**search, "token": token},
+            "merge": False,
+        }
+    params = {
+        key: ",".join(str(v) for v in value) if isinstance(value, list) else json.dumps(value) if isinstance(value, dict) else value
+        for key, value in search.items()
+    }
+    return {
+        "rel": "next",
+        "type": "application/geo+json",
+        "href": f"{base_url}/search?" + urlencode({**params, "token": token}),
+        "method": "GET",
+    }
+
+
+def search_stac_items(
+    request,
+    collections=None,
+    ids=None,
+    bbox=None,
+    intersects=None,
+    datetime=None,
+    filter=None,
+    filter_lang=None,
+    limit=DEFAULT_SEARCH_LIMIT,
+    token=None,
+    method="GET",
+):
+    """
+    STAC item search over the catalogs of the collections (latest versions). Queries are
+    compiled to parameterized SQL and run by DuckDB, pages are linked with `next` tokens.
+    Without collections, the collections to search are found in the index of footprints.
+    """
+    if bbox is not None and intersects is not None:
+        raise Exception("Only one of bbox and intersects can be used")
+    if filter_lang not in (None, "cql2-json"):
+        raise Exception(f"Unsupported filter-lang `{filter_lang}`, use cql2-json")
+    if isinstance(filter, str):
+        try:
+            filter = json.loads(filter)
+        except json.JSONDecodeError:
+            raise Exception("Invalid filter, use cql2-json")
+    limit = max(1, min(limit or DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT))
+    search = {"limit": limit}
+    values = [
+        ("collections", collections),
+        ("ids", ids),
+        ("bbox", bbox),
+        ("intersects", intersects),
+        ("datetime", datetime),
+        ("filter", filter),
+    ]
+    for key, value in values:
+        if value:
+            search[key] = value
+    bbox = parse_bbox(bbox) if bbox else None
+    interval = parse_datetime(datetime) if datetime else None
+    aoi = area_of_interest(bbox, intersects)
+    indexed = not collections
+    if indexed:
+        if bbox is None and interval is None and not ids:
+            raise Exception("Search at least one collection, or by bbox, intersects, datetime or ids")
+        collections = search_collections(list(aoi.bounds) if aoi is not None else None, interval, ids)
+    start, offset = parse_search_token(token, len(collections)) if collections else (0, 0)
+    items, next_token = [], None
+    duckdb_repo = DuckDBRepo()
+    try:
+        for ix in range(start, len(collections)):
+            offset = offset if ix == start else 0
+            try:
+                data = retrieve_collection(collections[ix])
+            except UNAVAILABLE_ERRORS:
+                if not indexed:
+                    raise
+                continue
+            if indexed and getattr(data, "visibility", "public") != "public":
+                continue
+            version = max(v.version_id for v in data.versions) if data.versions else 1
+            source, source_params, table = catalog_source(duckdb_repo, data.id, version)
+            columns = duckdb_repo.columns(source, source_params)
+            where, params = compile_search(columns, collections[ix], ids, bbox, interval, filter)
+            try:
+                tables, offset, done = search_catalog(
+                    duckdb_repo, source, source_params, table, where, params, aoi, offset, limit - len(items)
+                )
+            except duckdb.Error as e:
+                raise Exception(f"Invalid search: {e}")
+            for rows in tables:
+                for item in stac_geoparquet.arrow.stac_table_to_items(rows):
+                    item["collection"] = collections[ix]
+                    items.append(item)
+            if not done:
+                next_token = f"{ix}:{offset}"
+                break
+            if len(items) == limit and ix + 1 < len(collections):
+                next_token = f"{ix + 1}:0"
+                break
+    finally:
+        duckdb_repo.close()
+    base_url = stac_url(request)
+    links = [
+        {"rel": "root", "type": "application/json", "href": base_url},
+    ]
+    if next_token:
+        links.append(search_link(base_url, search, next_token, method))
+    return {
+        "type": "FeatureCollection",
+        "features": items,
+        "links": links,
+        "numberReturned": len(items),
+    }
 
 
 def search_stac_columns(collection_name, version=1):
+    data = retrieve_collection(collection_name)
+    file_name = f"catalog.v{version}.parquet"
+    duckdb_repo = DuckDBRepo()
     try:
-        data = retrieve_dataset_by_name(collection_name)
-    except DatasetDoesNotExistError:
-        try:
-            data = retrieve_model_by_name(collection_name)
-        except ModelDoesNotExistError:
-            data = retrieve_pipeline_by_name(collection_name)
-    os_repo = OSRepo()
-    catalog_presigned_url = os_repo.get_presigned_url(data.id, f"catalog.v{version}.parquet")
-    con = duckdb.connect(database=':memory:')
-    con.execute("INSTALL httpfs; LOAD httpfs;")
-    con.execute("SET s3_url_style='path';")
-    # Get schema information from parquet file
-    result = con.execute(f"SELECT * FROM parquet_schema('{catalog_presigned_url}')").fetchdf()
-    # Create dict with column name as key and type as value
-    columns = {name: type_ for name, type_ in zip(result['name'], result['type'])}
-    con.close()
-    return columns
+        path = duckdb_repo.remote_path(data.id, file_name) or OSRepo().get_presigned_url(data.id, file_name)
+        # column names and types, from the footer of the parquet file
+        rows = duckdb_repo.execute("SELECT name, type FROM parquet_schema(?)", [path])
+    finally:
+        duckdb_repo.close()
+    return {name: type_ for name, type_ in rows}
@@ -0,0 +1,218 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import shapely
+
+from .retrieve_catalog import retrieve_catalog_table
+from .summarize_catalog import summarize_catalog
+from ..datasets import retrieve_datasets
+from ..models import retrieve_models
+from ..pipelines import retrieve_pipelines
+from ...repos import OSRepo, DuckDBRepo
+
+logger = logging.getLogger(__name__)
+
+# footprints of the items of each collection are kept under this prefix of the storage
+INDEX_PREFIX = "stac-index"
+
+FOOTPRINTS_SCHEMA = pa.schema(
+    [
+        ("collection", pa.string()),
+        ("id", pa.string()),
+        ("xmin", pa.float64()),
+        ("ymin", pa.float64()),
+        ("xmax", pa.float64()),
+        ("ymax", pa.float64()),
+        ("start_datetime", pa.timestamp("us", tz="UTC")),
+        ("end_datetime", pa.timestamp("us", tz="UTC")),
+    ]
+)
+
+
+def to_utc(column):
+    # catalogs written by the library have naive timestamps, in UTC
+    if column.type.tz is None:
+        return pc.assume_timezone(column, "UTC").cast(pa.timestamp("us", tz="UTC"))
+    return column.cast(pa.timestamp("us", tz="UTC"))
+
+
+def footprints_table(table, collection_name):
+    """
+    Bounding box and time range of the items of a catalog. Items without geometry
+    (e.g. files that are not georeferenced) have null bounds, so searches by bbox skip
+    them but searches by ids or datetime still find them.
+    """
+    geometries = shapely.from_wkb(table.column("geometry").to_numpy(zero_copy_only=False))
+    bounds = shapely.bounds(geometries)
+    located = ~shapely.is_missing(geometries) & ~shapely.is_empty(geometries)
+    names = table.schema.names
+    if "datetime" in names:
+        datetime = to_utc(table.column("datetime"))
+    else:
+        datetime = pa.nulls(table.num_rows, FOOTPRINTS_SCHEMA.field("start_datetime").type)
+    start, end = datetime, datetime
+    if "start_datetime" in names and "end_datetime" in names:
+        start = pc.coalesce(to_utc(table.column("start_datetime")), datetime)
+        end = pc.coalesce(to_utc(table.column("end_datetime")), datetime)
+    footprints = pa.table(
+        [
+            pa.repeat(pa.scalar(collection_name, pa.string()), table.num_rows),
+            table.column("id").cast(pa.string()),
+            *[pa.array(bounds[:, i], pa.float64(), mask=~located) for i in range(4)],
+            start,
+            end,
+        ],
+        schema=FOOTPRINTS_SCHEMA,
+    )
+    return footprints
+
+
+def write_partition(collection_id, footprints):
+    # only the partition of the collection is rewritten, the rest of the index does not change
+    with tempfile.TemporaryDirectory() as tmp_path:
+        file_path = os.path.join(tmp_path, f"{collection_id}.parquet")
+        pq.write_table(footprints, file_path)
+        OSRepo().upload_file(INDEX_PREFIX, f"{collection_id}.parquet", file_path)
+    collections_index.invalidate()
+
+
+def index_collection(collection_id, collection_name, version):
+    """
+    Replaces the footprints of a collection in the index with those of a version.
+    """
+    table = retrieve_catalog_table(collection_id, version)
+    footprints = footprints_table(table, collection_name)
+    write_partition(collection_id, footprints)
+    return footprints.num_rows
+
+
+class CollectionsIndex:
+    """
+    Footprints of the items of all the collections, kept in memory by each worker.
+    Partitions are listed at most every STAC_INDEX_TTL seconds, and only those that
+    changed (by ETag) are downloaded again.
+    """
+
+    def __init__(self):
+        self.partitions = {}  # file name: (etag, table)
+        self.table = FOOTPRINTS_SCHEMA.empty_table()
+        self.checked = None
+        self.lock = threading.Lock()
+
+    def invalidate(self):
+        with self.lock:
+            self.checked = None
+
+    def read_partition(self, os_repo, file_name):
+        response = os_repo.read_file(INDEX_PREFIX, file_name)
+        try:
+            return pq.read_table(pa.BufferReader(response.read()), schema=FOOTPRINTS_SCHEMA)
+        finally:
+            response.close()
+            response.release_conn()
+
+    def get_table(self):
+        ttl = float(os.getenv("STAC_INDEX_TTL", "60"))
+        with self.lock:
+            if self.checked is not None and time.monotonic() - self.checked < ttl:
+                return self.table
+            os_repo = OSRepo()
+            etags = {
+                os.path.basename(obj.object_name): obj.etag
+                for obj in os_repo.list_files(INDEX_PREFIX)
+            }
+            changed = set(self.partitions) - set(etags)
+            for file_name in changed:
+                self.partitions.pop(file_name)
+            for file_name, etag in etags.items():
+                if self.partitions.get(file_name, (None,))[0] != etag:
+                    self.partitions[file_name] = (etag, self.read_partition(os_repo, file_name))
+                    changed.add(file_name)
+            if changed:
+                tables = [table for _, table in self.partitions.values()]
+                self.table = pa.concat_tables(tables) if tables else FOOTPRINTS_SCHEMA.empty_table()
+            self.checked = time.monotonic()
+            return self.table
+
+
+collections_index = CollectionsIndex()
+
+
+def search_collections(bbox=None, datetime=None, ids=None):
+    """
+    Names of the collections with items in the bbox and time interval (or with the ids),
+    found in the index without reading the catalogs. Items are matched by their bounding
+    box, so collections must still be searched to test the geometries.
+    """
+    clauses, params = [], []
+    if bbox is not None:
+        xmin, ymin, xmax, ymax = bbox
+        clauses.append("ymin <= ? AND ymax >= ?")
+        params += [ymax, ymin]
+        if xmin <= xmax:
+            clauses.append("xmin <= ? AND xmax >= ?")
+            params += [xmax, xmin]
+    if datetime is not None:
+        start, end = datetime
+        if start is not None:
+            clauses.append("end_datetime >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("start_datetime <= ?")
+            params.append(end)
+    if ids:
+        clauses.append(f"id IN ({', '.join('?' * len(ids))})")
+        params += ids
+    duckdb_repo = DuckDBRepo()
+    try:
+        name = duckdb_repo.register(collections_index.get_table())
+        rows = duckdb_repo.execute(
+            f"SELECT DISTINCT collection FROM {name} WHERE {' AND '.join(clauses) or 'TRUE'} ORDER BY collection",
+            params,
+        )
+    finally:
+        duckdb_repo.close()
+    return [row[0] for row in rows]
+
+
+def rebuild_stac_index():
+    """
+    Indexes the latest version of every collection, for collections ingested before
+    the index existed.
+    """
+    indexed = {}
+    for collection in retrieve_datasets() + retrieve_models() + retrieve_pipelines():
+        version = max(v.version_id for v in collection.versions) if collection.versions else 1
+        try:
+            indexed[collection.name] = index_collection(collection.id, collection.name, version)
+        except Exception as e:
+            indexed[collection.name] = str(e)
+    return indexed
+
+
+def process_catalog(collection_id, collection_name, version):
+    """
+    Called when an ingestion is completed: indexes the footprints of the new catalog and
+    returns its summary (see `summarize_catalog`), to be stored with the version. Both are
+    derived from the catalog, failing to compute them does not fail the ingestion.
+    """
+    try:
+        table = retrieve_catalog_table(collection_id, version)
+        footprints = footprints_table(table, collection_name)
+    except Exception:
+        logger.exception("stac:catalog")
+        return {}
+    try:
+        write_partition(collection_id, footprints)
+    except Exception:
+        logger.exception("stac:index")
+    try:
+        return summarize_catalog(table, footprints)
+    except Exception:
+        logger.exception("stac:summary")
+        return {}
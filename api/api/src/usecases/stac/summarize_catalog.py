@@ -0,0 +1,122 @@
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# fields of the items that are not summarized
+CORE_FIELDS = {
+    "type",
+    "stac_version",
+    "stac_extensions",
+    "id",
+    "bbox",
+    "geometry",
+    "assets",
+    "links",
+    "collection",
+    "datetime",
+    "start_datetime",
+    "end_datetime",
+}
+# properties with more distinct values are summarized by their range
+MAX_SUMMARY_VALUES = 10
+WORLD_BBOX = [-180.0, -90.0, 180.0, 90.0]
+SUMMARIZED_TYPES = (
+    pa.types.is_integer,
+    pa.types.is_floating,
+    pa.types.is_string,
+    pa.types.is_large_string,
+    pa.types.is_boolean,
+)
+
+
+def format_timestamp(value):
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ") if value is not None else None
+
+
+def assets_size(table):
+    # sum of the `size` of every asset, assets are the fields of the `assets` struct
+    if "assets" not in table.schema.names:
+        return 0
+    assets = table.column("assets")
+    total = 0
+    for field in assets.type:
+        if pa.types.is_struct(field.type) and field.type.get_field_index("size") >= 0:
+            total += pc.sum(pc.struct_field(pc.struct_field(assets, field.name), "size")).as_py() or 0
+    return total
+
+
+def summarize_property(column):
+    type = column.type
+    if pa.types.is_timestamp(type):
+        min_max = pc.min_max(column)
+        return {
+            "minimum": format_timestamp(min_max["min"].as_py()),
+            "maximum": format_timestamp(min_max["max"].as_py()),
+        }
+    if not any(is_type(type) for is_type in SUMMARIZED_TYPES):
+        return None
+    values = pc.unique(column.drop_null())
+    if len(values) <= MAX_SUMMARY_VALUES:
+        return sorted(values.to_pylist())
+    if pa.types.is_integer(type) or pa.types.is_floating(type):
+        min_max = pc.min_max(column)
+        return {"minimum": min_max["min"].as_py(), "maximum": min_max["max"].as_py()}
+    return None
+
+
+def summarize_catalog(table, footprints):
+    """
+    Extent, number of items, size of the assets and summaries of the properties of
+    a catalog, stored with the version so collections are described without reading
+    their catalogs. `footprints` are the bboxes and time ranges of the items (see
+    `stac_index.footprints_table`).
+    """
+    bbox = WORLD_BBOX
+    # items without geometry have null bounds
+    if footprints.num_rows > footprints.column("xmin").null_count:
+        bbox = [
+            pc.min(footprints.column("xmin")).as_py(),
+            pc.min(footprints.column("ymin")).as_py(),
+            pc.max(footprints.column("xmax")).as_py(),
+            pc.max(footprints.column("ymax")).as_py(),
+        ]
+    start = pc.min(footprints.column("start_datetime")).as_py() if footprints.num_rows else None
+    end = pc.max(footprints.column("end_datetime")).as_py() if footprints.num_rows else None
+    summaries = {}
+    for name in table.schema.names:
+        if name in CORE_FIELDS:
+            continue
+        summary = summarize_property(table.column(name))
+        if summary:
+            summaries[name] = summary
+    return {
+        "extent": {
+            "spatial": {"bbox": [bbox]},
+            "temporal": {"interval": [[format_timestamp(start), format_timestamp(end)]]},
+        },
+        "summaries": summaries,
+        "items": table.num_rows,
+        "assets_size": assets_size(table),
+    }
+
+
+def collection_fields(versions):
+    """
+    Extent and summaries of the latest of the versions of a dataset, model or pipeline,
+    as fields of a STAC collection.
+    """
+    versions = sorted(versions, key=lambda v: v.version_id)
+    version = versions[-1] if versions else None
+    if version is None or version.extent is None:
+        # versions ingested before extents were computed
+        return {
+            "extent": {
+                "spatial": {"bbox": [WORLD_BBOX]},
+                "temporal": {"interval": [[None, None]]},
+            },
+        }
+    return {
+        "extent": version.extent,
+        "summaries": version.summaries or {},
+        "eotdl:items": version.items,
+        "eotdl:assets_size": version.assets_size,
+    }
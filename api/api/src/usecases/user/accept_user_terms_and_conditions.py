@@ -4,6 +4,7 @@ from ...models.user import TermsAndConditions
 from ...errors import UserDoesNotExistError
 from ...repos import UserDBRepo, EOXRepo
 from .retrieve_user import retrieve_user
+from .users_cache import users_cache
 
 
 def accept_user_terms_and_conditions(user):
@@ -23,4 +24,5 @@ def accept_user_terms_and_conditions(user):
     )
     user = User(**data)
     repo.update_user(user.id, user.dict())
+    users_cache().invalidate(user.uid)
     return user
@@ -1,6 +1,7 @@
 from ...repos import UserDBRepo
 from ...models import User
 from ...errors import InvalidApiKey
+from .users_cache import api_keys_cache, credential_hash
 
 
 def delete_api_key(user: User, key: str) -> str:
@@ -9,4 +10,6 @@ def delete_api_key(user: User, key: str) -> str:
     if not key or key["uid"] != user.uid:
         raise InvalidApiKey()
     repo.delete_key(key["id"])
+    # other workers accept the key until their cache expires
+    api_keys_cache().invalidate(credential_hash(key["id"]))
     return "Key deleted"
@@ -3,38 +3,45 @@ from datetime import datetime
 from ...models.user import User
 from ...repos import UserDBRepo
 from .retrieve_user import retrieve_user
+from .users_cache import users_cache, get_user_update_interval
 from ...errors import UserDoesNotExistError
 
 
+def profile_changes(user: dict, data: dict) -> dict:
+    # fields of the user that differ from those of the identity provider (or api key)
+    profile = dict(
+        uid=data["uid"],
+        name=data["name"] if data.get("name") else user.get("name"),
+        picture=data["picture"] if data.get("picture") else user.get("picture"),
+        email=data["email"],
+    )
+    return {k: v for k, v in profile.items() if user.get(k) != v}
+
+
 def persist_user(data: dict) -> User:
+    """
+    Called by every authenticated request. The user is only written when its profile
+    changed or `updatedAt` is older than USER_UPDATE_INTERVAL seconds, and is cached
+    for the following requests.
+    """
+    cache = users_cache()
+    user = cache.get(data["uid"])
+    if user is not None and not profile_changes(user.model_dump(), data):
+        return user
     repo = UserDBRepo()
     try:
         user = retrieve_user(data["uid"]).model_dump()
-        user.update(
-            name=data["name"] if data.get("name") else user.get("name"),
-            picture=data["picture"] if data.get("picture") else user.get("picture"),
-            email=data["email"],
-            updatedAt=datetime.now(),
-        )
-        updated_user = User(**user)
-        repo.update_user(user["id"], updated_user.model_dump())
-        return updated_user
     except UserDoesNotExistError:
         # check if user exists by email
         user = repo.find_one_user_by_email(data["email"])
-        if user:
-            user.update(
-                uid=data["uid"],
-                name=data["name"] if data.get("name") else user.get("name"),
-                picture=data["picture"] if data.get("picture") else user.get("picture"),
-                email=data["email"],
-                updatedAt=datetime.now(),
-            )
-            updated_user = User(**user)
-            repo.update_user(user["id"], updated_user.model_dump())
-            return updated_user
-        # user does not exist, create new user
-        data["id"] = repo.generate_id()
-        new_user = User(**data)
-        repo.persist_user(new_user.model_dump(), new_user.id)
-        return new_user
+        if not user:
+            # user does not exist, create new user
+            new_user = User(**{**data, "id": repo.generate_id()})
+            repo.persist_user(new_user.model_dump(), new_user.id)
+            return cache.put(new_user.uid, new_user)
+    changes = profile_changes(user, data)
+    updated_at = user.get("updatedAt")
+    if changes or updated_at is None or (datetime.now() - updated_at).total_seconds() > get_user_update_interval():
+        user.update(changes, updatedAt=datetime.now())
+        repo.update_user(user["id"], User(**user).model_dump())
+    return cache.put(data["uid"], User(**user))
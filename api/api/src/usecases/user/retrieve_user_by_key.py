@@ -1,14 +1,23 @@
 from ...repos import UserDBRepo
 from ...errors import UserDoesNotExistError, InvalidApiKey
 from ...models import User
+from .users_cache import users_cache, api_keys_cache, credential_hash
 
 
 def retrieve_user_by_key(api_key: str) -> User:
     repo = UserDBRepo()
-    data = repo.retrieve_user_by_key(api_key)
-    if data is None:
-        raise InvalidApiKey()
-    user = repo.retrieve_user_by_uid(data["uid"])
+    keys = api_keys_cache()
+    uid = keys.get(credential_hash(api_key))
+    if uid is None:
+        data = repo.retrieve_user_by_key(api_key)
+        if data is None:
+            raise InvalidApiKey()
+        uid = keys.put(credential_hash(api_key), data["uid"])
+    users = users_cache()
+    user = users.get(uid)
+    if user is not None:
+        return user
+    user = repo.retrieve_user_by_uid(uid)
     if user is None:
         raise UserDoesNotExistError()
-    return User(**user)
+    return users.put(uid, User(**user))
@@ -5,6 +5,7 @@ from ...repos import UserDBRepo
 from ...errors import UserAlreadyExistsError, NameCharsValidationError, NameLengthValidationError
 from ...models import User 
 from .retrieve_user import retrieve_user
+from .users_cache import users_cache
 
 # we do it here instead of in model because first time a user is created, the name can come from the IdP
 def validate_name(name: str, regex: str = "^[^a-zA-Z]{1}|[^a-zA-Z0-9-]", max_length: int = 15, min_length: int = 3) -> str:
@@ -31,4 +32,5 @@ def update_user(user: User, data: dict) -> User:
     )
     user = User(**user_data)
     repo.update_user(user_data['id'], user.model_dump())
+    users_cache().invalidate(user.uid)
     return user
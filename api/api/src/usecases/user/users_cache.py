@@ -0,0 +1,30 @@
+import hashlib
+import os
+
+from ...repos import MemoryCacheRepo
+
+
+def get_auth_cache_ttl():
+    return float(os.getenv("AUTH_CACHE_TTL", "60"))
+
+
+def get_user_update_interval():
+    return float(os.getenv("USER_UPDATE_INTERVAL", "3600"))
+
+
+def credential_hash(credential):
+    # api keys are not kept in memory in clear
+    return hashlib.sha256(credential.encode()).hexdigest()
+
+
+def users_cache():
+    """
+    Users by uid, shared by the authentication of all the requests of a worker. Changes
+    made by other workers (e.g. a new name) are seen after at most AUTH_CACHE_TTL seconds.
+    """
+    return MemoryCacheRepo("users", get_auth_cache_ttl())
+
+
+def api_keys_cache():
+    # uid of the owner by hash of the api key
+    return MemoryCacheRepo("api-keys", get_auth_cache_ttl())
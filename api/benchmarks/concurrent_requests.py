@@ -0,0 +1,80 @@
+"""
+Latency of concurrent requests to a running API, to compare the async routes before and
+after they await the database instead of blocking the event loop.
+
+    python api/benchmarks/concurrent_requests.py --url http://localhost:8000 \
+        --api-key <key> --dataset-id <id of a dataset owned by the key>
+
+An async route (`--route ingest`, presigned upload urls, which retrieves the dataset, or
+`--route stage`, presigned download url, which checks the file in the storage) is
+requested with `--concurrency` clients while the home route, which only runs in the
+event loop, is probed: while the database blocks the loop the probes wait for it. Without MongoDB,
+run the API with `mock_database.py`, which simulates the latency of the queries.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+    return {
+        p: round(1000 * latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))], 1)
+        for p in (50, 95, 99)
+    }
+
+
+async def timed(request):
+    start = time.perf_counter()
+    response = await request()
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+def request(client, args):
+    headers = {"X-API-Key": args.api_key}
+    if args.route == "stage":
+        return client.get(f"/datasets/{args.dataset_id}/stage/benchmark.tif", headers=headers)
+    return client.post(f"/datasets/{args.dataset_id}/batch", json={"file_names": ["benchmark.tif"]}, headers=headers)
+
+
+async def worker(client, args, latencies):
+    for _ in range(args.requests // args.concurrency):
+        latencies.append(await timed(lambda: request(client, args)))
+
+
+async def probe(client, latencies, done):
+    while not done.is_set():
+        latencies.append(await timed(lambda: client.get("/")))
+        await asyncio.sleep(0.01)
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.concurrency + 1)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        await client.get("/")  # connect before measuring
+        ingest, home, done = [], [], asyncio.Event()
+        start = time.perf_counter()
+        probing = asyncio.create_task(probe(client, home, done))
+        await asyncio.gather(*[worker(client, args, ingest) for _ in range(args.concurrency)])
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probing
+    print(f"{len(ingest)} requests with {args.concurrency} clients in {elapsed:.1f}s ({len(ingest) / elapsed:.0f} req/s)")
+    print(f"async route (ms): {percentiles(ingest)}, mean {1000 * statistics.mean(ingest):.1f}")
+    print(f"home route (ms):  {percentiles(home)}, mean {1000 * statistics.mean(home):.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--api-key", required=True)
+    parser.add_argument("--dataset-id", required=True)
+    parser.add_argument("--route", choices=["ingest", "stage"], default="ingest")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,167 @@
+"""
+Runs the API with an in-memory database (mongomock) that takes `--latency` seconds to
+answer each query, to run `concurrent_requests.py` without MongoDB or the storage.
+
+    python api/benchmarks/mock_database.py --port 8000 --latency 0.02
+
+Queries of the sync repos sleep (blocking the thread, like pymongo), queries of the
+async repos await the sleep. Requests to the storage (checking that a staged file exists)
+also take `--latency` seconds and block the thread, like minio. Prints the api key and
+dataset id to benchmark with.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from unittest.mock import patch
+
+# the api reads its configuration on import
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("MONGO_DB_NAME", "eotdl-benchmark")
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/eotdl-benchmark-prometheus")
+# presigned urls are signed locally when the region is known
+os.environ.setdefault("S3_ENDPOINT", "storage.benchmark")
+os.environ.setdefault("S3_REGION", "us-east-1")
+os.environ.setdefault("S3_BUCKET", "eotdl")
+os.environ.setdefault("ACCESS_KEY_ID", "key")
+os.environ.setdefault("SECRET_ACCESS_KEY", "secret")
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bson import ObjectId
+import mongomock
+import uvicorn
+
+QUERIES = ("find_one", "find", "insert_one", "update_one", "delete_one", "count_documents")
+
+
+class SlowCollection:
+    def __init__(self, collection, latency):
+        self.collection = collection
+        self.latency = latency
+
+    def __getattr__(self, name):
+        attr = getattr(self.collection, name)
+        if name not in QUERIES:
+            return attr
+
+        def query(*args, **kwargs):
+            time.sleep(self.latency)
+            return attr(*args, **kwargs)
+
+        return query
+
+
+class AsyncCursor:
+    def __init__(self, cursor, latency):
+        self.cursor = cursor
+        self.latency = latency
+
+    def sort(self, *args):
+        self.cursor = self.cursor.sort(*args)
+        return self
+
+    def limit(self, limit):
+        self.cursor = self.cursor.limit(limit)
+        return self
+
+    async def to_list(self, length=None):
+        await asyncio.sleep(self.latency)
+        return list(self.cursor)
+
+
+class AsyncCollection:
+    def __init__(self, collection, latency):
+        self.collection = collection
+        self.latency = latency
+
+    def find(self, *args, **kwargs):
+        return AsyncCursor(self.collection.find(*args, **kwargs), self.latency)
+
+    def __getattr__(self, name):
+        attr = getattr(self.collection, name)
+
+        async def query(*args, **kwargs):
+            await asyncio.sleep(self.latency)
+            return attr(*args, **kwargs)
+
+        return query
+
+
+class Database:
+    def __init__(self, db, collection_class, latency):
+        self.db = db
+        self.collection_class = collection_class
+        self.latency = latency
+
+    def __getitem__(self, name):
+        return self.collection_class(self.db[name], self.latency)
+
+    def __getattr__(self, name):
+        return self[name]
+
+
+def slow_exists(latency):
+    def exists(self, dataset_id, file_name):
+        time.sleep(latency)
+        return True
+
+    return exists
+
+
+def seed(db):
+    uid, dataset_id = "benchmark-user", str(ObjectId())
+    db.users.insert_one(
+        {"id": str(ObjectId()), "uid": uid, "name": "benchmark", "email": "benchmark@eotdl.com", "picture": None}
+    )
+    db["keys"].insert_one({"id": "benchmark-key", "uid": uid})
+    db.datasets.insert_one(
+        {
+            "_id": ObjectId(dataset_id),
+            "id": dataset_id,
+            "uid": uid,
+            "name": "benchmark",
+            "metadata": {"description": "", "authors": ["benchmark"], "source": "http://benchmark", "license": "free"},
+            "versions": [],
+            "tags": [],
+            "active": True,
+            "allowed_users": [],
+        }
+    )
+    return "benchmark-key", dataset_id
+
+
+def main(args):
+    from api.src.repos.mongo import MongoRepo, client
+    from api.src.repos.minio import MinioRepo
+
+    db = mongomock.MongoClient().db
+    api_key, dataset_id = seed(db)
+    sync_db = Database(db, SlowCollection, args.latency)
+    async_db = Database(db, AsyncCollection, args.latency)
+    patches = [
+        patch.object(client, "get_db", return_value=sync_db),
+        patch.object(sys.modules[MongoRepo.__module__], "get_db", return_value=sync_db),
+        # nothing to provision, every staged file exists
+        patch.object(MinioRepo, "provision_bucket"),
+        patch.object(MinioRepo, "exists", slow_exists(args.latency)),
+    ]
+    # before the async routes awaited the database, there were no async repos
+    async_repo = sys.modules.get("api.src.repos.mongo.AsyncMongoRepo")
+    if async_repo is not None:
+        patches.append(patch.object(async_repo, "get_async_db", return_value=async_db))
+    for p in patches:
+        p.start()
+    print(f"--api-key {api_key} --dataset-id {dataset_id}", flush=True)
+    from api.main import app
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds of each query")
+    main(parser.parse_args())
@@ -0,0 +1,90 @@
+import base64
+import sys
+import time
+import jwt
+import pytest
+from unittest.mock import patch, MagicMock
+
+from api.src.repos import AuthRepo, MemoryCacheRepo
+
+logto = sys.modules[AuthRepo.__module__]
+
+SECRETS = {"old": b"old secret" * 4, "new": b"new secret" * 4}
+
+def jwk(kid):
+    k = base64.urlsafe_b64encode(SECRETS[kid]).rstrip(b"=").decode()
+    return {"kty": "oct", "kid": kid, "alg": "HS256", "k": k}
+
+def token(kid="old", exp=3600, **claims):
+    payload = {"sub": "test", "name": "test name", "email": "test email", "aud": "app", "iss": "issuer", "exp": int(time.time()) + exp, **claims}
+    return jwt.encode(payload, SECRETS[kid], algorithm="HS256", headers={"kid": kid})
+
+@pytest.fixture
+def requests_get(monkeypatch):
+    monkeypatch.setenv("LOGTO_DOMAIN", "logto.test")
+    monkeypatch.setenv("LOGTO_APP_ID", "app")
+    monkeypatch.setenv("LOGTO_APP_SECRET", "secret")
+    AuthRepo.well_known.clear()
+    AuthRepo.jwks.clear()
+    MemoryCacheRepo("tokens", 0).invalidate()
+    keys = [jwk("old")]
+    def get(url, timeout):
+        response = MagicMock()
+        if url.endswith("openid-configuration"):
+            response.json.return_value = {"issuer": "issuer", "authorization_endpoint": "authz", "token_endpoint": "token", "jwks_uri": "jwks"}
+        else:
+            response.json.return_value = {"keys": list(keys)}
+        return response
+    with patch.object(logto.requests, "get", side_effect=get) as mocked:
+        mocked.keys = keys
+        yield mocked
+    MemoryCacheRepo("tokens", 0).invalidate()
+
+def test_discovery_is_cached(requests_get):
+    AuthRepo()
+    AuthRepo()
+    assert requests_get.call_count == 1
+
+def test_parse_token(requests_get):
+    repo = AuthRepo()
+    data = repo.parse_token(token())
+    assert data == {"uid": "test", "name": "test name", "email": "test email", "picture": None}
+    AuthRepo().parse_token(token(name="other"))
+    # discovery document and keys
+    assert requests_get.call_count == 2
+
+def test_verified_tokens_are_cached(requests_get):
+    t = token()
+    with patch.object(AuthRepo, "validate_token", wraps=AuthRepo().validate_token) as validate:
+        AuthRepo().parse_token(t)
+        AuthRepo().parse_token(t)
+    validate.assert_called_once()
+
+def test_invalid_tokens(requests_get):
+    repo = AuthRepo()
+    with pytest.raises(jwt.InvalidSignatureError):
+        repo.parse_token(jwt.encode({"sub": "test", "exp": int(time.time()) + 60}, "wrong" * 8, algorithm="HS256", headers={"kid": "old"}))
+    with pytest.raises(jwt.ExpiredSignatureError):
+        repo.parse_token(token(exp=-60))
+    with pytest.raises(jwt.InvalidAudienceError):
+        repo.parse_token(token(aud="other"))
+
+def test_rotated_keys(requests_get, monkeypatch):
+    repo = AuthRepo()
+    repo.parse_token(token())
+    requests_get.keys.append(jwk("new"))
+    # unknown keys are not fetched again before the refresh interval
+    with pytest.raises(Exception, match="Public key not found"):
+        repo.parse_token(token("new"))
+    monkeypatch.setattr(logto, "JWKS_REFRESH_INTERVAL", 0)
+    assert repo.parse_token(token("new"))["uid"] == "test"
+    assert requests_get.call_count == 3
+
+def test_keys_are_fetched_without_the_lock(requests_get):
+    repo = AuthRepo()
+    get = requests_get.side_effect
+    def get_unlocked(url, timeout):
+        assert not AuthRepo.lock.locked()
+        return get(url, timeout)
+    requests_get.side_effect = get_unlocked
+    assert repo.parse_token(token())["uid"] == "test"
@@ -0,0 +1,54 @@
+from unittest.mock import MagicMock, patch
+
+from api.src.models import User
+from api.src.usecases.datasets.upload_large_file import generate_upload_id
+
+MODULE = "api.src.usecases.datasets.upload_large_file"
+
+USER = User(id="123", uid="123", name="test", email="test@test.com", picture="test")
+
+
+def generate(upload, chunk_size):
+    files_repo, s3_repo = MagicMock(), MagicMock()
+    files_repo.find_upload.return_value = upload
+    files_repo.generate_id.return_value = "new-id"
+    s3_repo.multipart_upload_id.return_value = "new-upload-id"
+    with (
+        patch(f"{MODULE}.FilesDBRepo", return_value=files_repo),
+        patch(f"{MODULE}.OSRepo"),
+        patch(f"{MODULE}.S3Repo", return_value=s3_repo),
+        patch(f"{MODULE}.retrieve_owned_dataset"),
+    ):
+        return generate_upload_id(USER, "sha1", "large.bin", "dataset-id", chunk_size), files_repo, s3_repo
+
+
+def upload(**kwargs):
+    return {
+        "uid": "123",
+        "id": "upload",
+        "upload_id": "upload-id",
+        "filename": "large.bin",
+        "dataset": "dataset-id",
+        "checksum": "sha1",
+        "parts": [1, 2],
+        **kwargs,
+    }
+
+
+def test_new_uploads_store_the_chunk_size():
+    result, files_repo, _ = generate(None, 5)
+    assert result == ("new-upload-id", [], 5)
+    assert files_repo.persist_upload.call_args[0][1]["chunk_size"] == 5
+
+
+def test_uploads_are_resumed_with_their_chunk_size():
+    result, files_repo, s3_repo = generate(upload(chunk_size=8), 5)
+    assert result == ("upload-id", [1, 2], 8)
+    s3_repo.abort_multipart_upload.assert_not_called()
+
+
+def test_uploads_without_chunk_size_are_restarted():
+    result, files_repo, s3_repo = generate(upload(), 5)
+    assert result == ("new-upload-id", [], 5)
+    s3_repo.abort_multipart_upload.assert_called_once()
+    files_repo.delete_upload.assert_called_once_with("upload")
@@ -0,0 +1,46 @@
+import asyncio
+from unittest.mock import patch
+
+from api.src.repos.mongo.client import get_async_db
+
+
+class AsyncCollection:
+    # the async methods used by the repos, over a mongomock collection
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def find_one(self, *args):
+        return self.collection.find_one(*args)
+
+
+class FakeOSRepo:
+    def generate_presigned_put_url(self, dataset_id, file_name):
+        return f"https://s3/{dataset_id}/{file_name}?signature"
+
+
+def test_ingest_dataset_files_awaits_the_db(client, mock_mongo_dataset, dataset):
+    async_db = {"datasets": AsyncCollection(mock_mongo_dataset.datasets)}
+    with (
+        patch("api.src.repos.mongo.AsyncMongoRepo.get_async_db", return_value=async_db),
+        patch("api.src.usecases.datasets.ingest_file.OSRepo", FakeOSRepo),
+        patch("api.src.repos.mongo.MongoRepo.MongoRepo.retrieve", side_effect=AssertionError("sync query")),
+    ):
+        response = client.post(f"/datasets/{dataset['id']}/batch", json={"file_names": ["a.tif"]})
+    assert response.status_code == 200
+    assert response.json() == {"presigned_urls": {"a.tif": f"https://s3/{dataset['id']}/a.tif?signature"}}
+
+
+def test_ingest_dataset_files_of_missing_dataset(client, mock_mongo_dataset):
+    async_db = {"datasets": AsyncCollection(mock_mongo_dataset.datasets)}
+    with patch("api.src.repos.mongo.AsyncMongoRepo.get_async_db", return_value=async_db):
+        response = client.post("/datasets/missing/batch", json={"file_names": ["a.tif"]})
+    assert response.status_code == 409
+
+
+def test_async_db_per_event_loop():
+    async def db():
+        return get_async_db(), get_async_db()
+
+    first, second = asyncio.run(db()), asyncio.run(db())
+    assert first[0].client is first[1].client
+    assert first[0].client is not second[0].client
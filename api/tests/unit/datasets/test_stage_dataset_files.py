@@ -0,0 +1,78 @@
+from unittest.mock import patch
+
+import pytest
+
+
+class FakeOSRepo:
+    def get_presigned_url(self, dataset_id, file_name):
+        return f"https://s3/{dataset_id}/{file_name}?signature"
+
+    def exists(self, dataset_id, file_name):
+        return False
+
+
+@pytest.fixture(autouse=True)
+def staged_files():
+    # files in the catalog of the dataset
+    with patch(
+        "api.src.usecases.files.staged_files.retrieve_staged_files",
+        return_value={"a.tif", "folder/b.tif"},
+    ), patch("api.src.usecases.files.staged_files.OSRepo", FakeOSRepo):
+        yield
+
+
+def test_stage_dataset_files_returns_all_presigned_urls(client):
+    with patch("api.src.usecases.datasets.stage_dataset.OSRepo", FakeOSRepo):
+        response = client.post(
+            "/datasets/123/stage", json={"filenames": ["a.tif", "folder/b.tif"]}
+        )
+    assert response.status_code == 200
+    assert response.json() == {
+        "presigned_urls": {
+            "a.tif": "https://s3/123/a.tif?signature",
+            "folder/b.tif": "https://s3/123/folder/b.tif?signature",
+        },
+        "errors": {},
+    }
+
+
+def test_stage_dataset_files_returns_missing_files_as_errors(client):
+    with patch("api.src.usecases.datasets.stage_dataset.OSRepo", FakeOSRepo):
+        response = client.post(
+            "/datasets/123/stage", json={"filenames": ["a.tif", "missing.tif"]}
+        )
+    assert response.status_code == 200
+    assert response.json() == {
+        "presigned_urls": {"a.tif": "https://s3/123/a.tif?signature"},
+        "errors": {"missing.tif": "File `missing.tif` does not exist"},
+    }
+
+
+def test_stage_dataset_files_limits_batch_size(client):
+    with patch("api.src.usecases.datasets.stage_dataset.OSRepo", FakeOSRepo):
+        response = client.post(
+            "/datasets/123/stage", json={"filenames": [f"{i}.tif" for i in range(1001)]}
+        )
+    assert response.status_code == 409
+    assert response.json() == {"detail": "At most 1000 files can be requested at once"}
+
+
+def test_stage_dataset_files_does_not_request_the_storage(client, monkeypatch):
+    from api.src.repos.minio import client as minio_client
+
+    for name, value in {
+        "S3_ENDPOINT": "storage.test",
+        "S3_REGION": "us-east-1",
+        "S3_BUCKET": "bucket",
+        "ACCESS_KEY_ID": "key",
+        "SECRET_ACCESS_KEY": "secret",
+    }.items():
+        monkeypatch.setenv(name, value)
+    with patch.dict(minio_client.client, clear=True), patch(
+        "urllib3.PoolManager.urlopen", side_effect=AssertionError("request to the storage")
+    ):
+        response = client.post("/datasets/123/stage", json={"filenames": ["a.tif"]})
+    assert response.status_code == 200
+    url = response.json()["presigned_urls"]["a.tif"]
+    assert url.startswith("https://storage.test/bucket/123/a.tif?")
+    assert "X-Amz-Signature=" in url
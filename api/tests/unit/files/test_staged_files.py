@@ -0,0 +1,89 @@
+import asyncio
+from unittest.mock import patch, AsyncMock, MagicMock
+
+import pyarrow as pa
+import pytest
+
+from api.src.repos import MemoryCacheRepo
+from api.src.usecases.files.staged_files import StagedFiles, check_file_exists as check_file_exists_async
+
+API = "https://api.eotdl.com/datasets"
+
+
+def check_file_exists(*args):
+    return asyncio.run(check_file_exists_async(*args))
+
+
+def catalog(hrefs):
+    # one item per file, the second asset of some items is an external link
+    assets = pa.array(
+        [{"asset": {"href": href}, "link": {"href": "https://example.com/file.tif"}} for href in hrefs]
+    )
+    return pa.table({"id": [str(i) for i in range(len(hrefs))], "assets": assets})
+
+
+@pytest.fixture(autouse=True)
+def cache():
+    MemoryCacheRepo("staged-files", 0).invalidate()
+    yield
+    MemoryCacheRepo("staged-files", 0).invalidate()
+
+
+@pytest.fixture
+def os_repo():
+    repo = MagicMock()
+    repo.exists.return_value = False
+    with patch("api.src.usecases.files.staged_files.OSRepo", return_value=repo):
+        yield repo
+
+
+@pytest.fixture
+def collection():
+    collection = MagicMock()
+    collection.versions = [MagicMock(version_id=1), MagicMock(version_id=2)]
+    return AsyncMock(return_value=collection)
+
+
+def test_staged_files():
+    files = StagedFiles(
+        catalog([f"{API}/123/stage/b.tif", f"{API}/123/stage/folder/a.tif", f"{API}/456/stage/c.tif"]), "123"
+    )
+    assert "b.tif" in files
+    assert "folder/a.tif" in files
+    assert "c.tif" not in files
+    assert "file.tif" not in files
+    assert "a.tif" not in StagedFiles(pa.table({}), "123")
+
+
+def test_files_in_catalog_are_not_checked_in_storage(os_repo, collection):
+    table = catalog([f"{API}/123/stage/a.tif"])
+    with patch("api.src.usecases.stac.retrieve_catalog.retrieve_catalog_table", return_value=table) as retrieve:
+        check_file_exists("123", "a.tif", collection)
+        check_file_exists("123", "a.tif", collection)
+    retrieve.assert_called_once_with("123", 2)
+    collection.assert_awaited_once_with("123")
+    os_repo.exists.assert_not_called()
+
+
+def test_other_files_are_checked_in_storage(os_repo, collection):
+    table = catalog([f"{API}/123/stage/a.tif"])
+    with patch("api.src.usecases.stac.retrieve_catalog.retrieve_catalog_table", return_value=table):
+        with pytest.raises(Exception, match="File `b.tif` does not exist"):
+            check_file_exists("123", "b.tif", collection)
+        os_repo.exists.return_value = True
+        check_file_exists("123", "catalog.v2.parquet", collection)
+    os_repo.exists.assert_called_with("123", "catalog.v2.parquet")
+
+
+def test_collections_without_catalog(os_repo, collection):
+    with patch("api.src.usecases.stac.retrieve_catalog.retrieve_catalog_table", side_effect=Exception("NoSuchKey")):
+        with pytest.raises(Exception, match="does not exist"):
+            check_file_exists("123", "a.tif", collection)
+
+
+def test_storage_check(os_repo, collection, monkeypatch):
+    monkeypatch.setenv("STAGE_FILES_CHECK", "storage")
+    os_repo.exists.return_value = True
+    check_file_exists("123", "a.tif", collection)
+    collection.assert_not_called()
+    os_repo.exists.assert_called_once_with("123", "a.tif")
@@ -0,0 +1,159 @@
+from collections import OrderedDict
+import io
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from api.src.repos import CatalogCacheRepo
+from api.src.repos.minio.MinioRepo import RemoteFile
+from api.src.usecases.stac.retrieve_catalog import CatalogIndex, retrieve_catalog_item, retrieve_catalog_table
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(CatalogCacheRepo, "tables", OrderedDict())
+    monkeypatch.setattr(CatalogCacheRepo, "size", 0)
+    monkeypatch.delenv("CATALOG_CACHE_PATH", raising=False)
+
+
+def table(n):
+    return pa.table({"id": [f"item-{i}" for i in range(n)]})
+
+
+class FakeResponse(io.BytesIO):
+    def release_conn(self):
+        pass
+
+
+class FakeClient:
+    def __init__(self, data):
+        self.data = data
+        self.bytes_read = 0
+
+    def get_object(self, bucket, object, offset, length):
+        self.bytes_read += length
+        return FakeResponse(self.data[offset : offset + length])
+
+
+class FakeOSRepo:
+    downloads = 0
+    etag = "etag-1"
+    catalog = table(3)
+    row_group_size = None
+    client = None
+
+    def parquet(self):
+        f = io.BytesIO()
+        pq.write_table(self.catalog, f, row_group_size=self.row_group_size)
+        return f.getvalue()
+
+    def object_info(self, dataset_id, file_name):
+        return SimpleNamespace(etag=self.etag, size=len(self.parquet()))
+
+    def download_file(self, dataset_id, file_name, file_path):
+        FakeOSRepo.downloads += 1
+        pq.write_table(self.catalog, file_path)
+
+    def open_file(self, dataset_id, file_name, size):
+        FakeOSRepo.client = FakeClient(self.parquet())
+        return RemoteFile(FakeOSRepo.client, "bucket", f"{dataset_id}/{file_name}", size)
+
+
+def test_catalogs_are_downloaded_once_per_etag():
+    FakeOSRepo.downloads = 0
+    with patch("api.src.usecases.stac.retrieve_catalog.OSRepo", FakeOSRepo):
+        assert retrieve_catalog_table("dataset-id", 1).num_rows == 3
+        assert retrieve_catalog_table("dataset-id", 1).num_rows == 3
+        assert FakeOSRepo.downloads == 1
+        # the catalog changed in the storage
+        with patch.object(FakeOSRepo, "etag", "etag-2"), patch.object(FakeOSRepo, "catalog", table(5)):
+            assert retrieve_catalog_table("dataset-id", 1).num_rows == 5
+        assert FakeOSRepo.downloads == 2
+
+
+def test_least_recently_used_catalogs_are_evicted(monkeypatch):
+    monkeypatch.setenv("CATALOG_CACHE_SIZE", str(table(10).nbytes * 2))
+    cache = CatalogCacheRepo()
+    cache.put("a", 1, "etag", table(10))
+    cache.put("b", 1, "etag", table(10))
+    assert cache.get("a", 1, "etag") is not None
+    cache.put("c", 1, "etag", table(10))
+
+    assert cache.get("a", 1, "etag") is not None
+    assert cache.get("b", 1, "etag") is None
+    assert cache.get("c", 1, "etag") is not None
+
+
+def test_invalidate_removes_all_versions(tmp_path, monkeypatch):
+    monkeypatch.setenv("CATALOG_CACHE_PATH", str(tmp_path))
+    with patch("api.src.usecases.stac.retrieve_catalog.OSRepo", FakeOSRepo):
+        retrieve_catalog_table("dataset-id", 1)
+        retrieve_catalog_table("dataset-id", 2)
+    cache = CatalogCacheRepo()
+
+    cache.invalidate("dataset-id")
+
+    assert cache.size == 0
+    assert CatalogCacheRepo.tables == {}
+
+
+def test_stale_files_are_removed_when_the_catalog_changes(tmp_path, monkeypatch):
+    monkeypatch.setenv("CATALOG_CACHE_PATH", str(tmp_path))
+    with patch("api.src.usecases.stac.retrieve_catalog.OSRepo", FakeOSRepo):
+        retrieve_catalog_table("dataset-id", 1)
+        retrieve_catalog_table("dataset-id", 2)
+        # being downloaded by another worker
+        (tmp_path / "dataset-id" / "catalog.v1.etag-2.parquet.123.tmp").write_text("")
+        CatalogCacheRepo().invalidate("dataset-id")
+        with patch.object(FakeOSRepo, "etag", "etag-2"):
+            retrieve_catalog_table("dataset-id", 1)
+
+    assert sorted(f.name for f in (tmp_path / "dataset-id").iterdir()) == [
+        "catalog.v1.etag-2.parquet",
+        "catalog.v1.etag-2.parquet.123.tmp",
+        "catalog.v2.etag-1.parquet",
+    ]
+
+
+def test_items_are_found_with_the_catalog_index():
+    with patch("api.src.usecases.stac.retrieve_catalog.OSRepo", FakeOSRepo), \
+         patch.object(FakeOSRepo, "catalog", pa.table({"id": ["c", "a", "b"], "value": [0, 1, 2]})):
+        retrieve_catalog_table("dataset-id", 1)
+        assert retrieve_catalog_item("dataset-id", 1, "b").column("value").to_pylist() == [2]
+        assert retrieve_catalog_item("dataset-id", 1, "a").column("value").to_pylist() == [1]
+        assert retrieve_catalog_item("dataset-id", 1, "d") is None
+    # the index is kept with the cached table
+    entry = CatalogCacheRepo.tables[("dataset-id", 1)]
+    [index] = entry["indexes"].values()
+    assert isinstance(index, CatalogIndex)
+    assert CatalogCacheRepo.size == entry["table"].nbytes + index.nbytes
+
+
+def test_items_of_catalogs_not_cached_are_read_without_downloading_the_catalog():
+    FakeOSRepo.downloads = 0
+    catalog = pa.table({"id": [f"item-{i:06}" for i in range(100000)], "value": list(range(100000))})
+    with patch("api.src.usecases.stac.retrieve_catalog.OSRepo", FakeOSRepo), \
+         patch.object(FakeOSRepo, "catalog", catalog), patch.object(FakeOSRepo, "row_group_size", 10000):
+        assert retrieve_catalog_item("dataset-id", 1, "item-050000").column("value").to_pylist() == [50000]
+        # only the footer and the row group of the item are read
+        assert FakeOSRepo.client.bytes_read < len(FakeOSRepo().parquet()) / 5
+        assert retrieve_catalog_item("dataset-id", 1, "missing") is None
+    assert FakeOSRepo.downloads == 0
+    assert ("dataset-id", 1) not in CatalogCacheRepo.tables
+
+
+def test_indexes_are_built_without_the_lock():
+    cache = CatalogCacheRepo()
+    cache.put("a", 1, "etag", table(10))
+
+    def build(t):
+        assert not CatalogCacheRepo.lock.locked()
+        return CatalogIndex(t)
+
+    index = cache.get_index("a", 1, "etag", build)
+    assert index.find("item-3") == 3
+    assert cache.get_index("a", 1, "etag", build) is index
+    assert CatalogCacheRepo.size == table(10).nbytes + index.nbytes
@@ -0,0 +1,86 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pyarrow as pa
+import pytest
+
+from api.src.errors import TooManyQueriesError
+from api.src.repos import DuckDBRepo
+import api.src.repos.duckdb.client as duckdb_client
+from api.src.repos.duckdb.client import CursorPool, create_connection, client, get_pool
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = CursorPool(create_connection(), 2)
+    monkeypatch.setitem(client, "duckdb", pool)
+    return pool
+
+
+def test_cursors_are_reused(pool):
+    repo = DuckDBRepo()
+    name = repo.register(pa.table({"id": ["a", "b"]}))
+    assert repo.query(f"SELECT * FROM {name} WHERE id = ?", ["b"]).num_rows == 1
+    cursor = repo.cursor
+    repo.close()
+    assert pool.cursors.qsize() == 2
+
+    repos = [DuckDBRepo(), DuckDBRepo()]
+    assert cursor in [r.cursor for r in repos]
+    # registered tables are dropped when the cursor is returned
+    reused = next(r for r in repos if r.cursor is cursor)
+    with pytest.raises(Exception):
+        reused.query(f"SELECT * FROM {name}")
+    for r in repos:
+        r.close()
+
+
+def test_pool_settings(pool):
+    repo = DuckDBRepo()
+    assert repo.execute("SELECT current_setting('TimeZone'), current_setting('parquet_metadata_cache')") == [
+        ("UTC", True)
+    ]
+    repo.close()
+
+
+def test_busy_pool_times_out(pool, monkeypatch):
+    monkeypatch.setenv("DUCKDB_POOL_TIMEOUT", "0.01")
+    repos = [DuckDBRepo(), DuckDBRepo()]
+    with pytest.raises(TooManyQueriesError):
+        DuckDBRepo()
+    for r in repos:
+        r.close()
+    DuckDBRepo().close()
+
+
+def test_cursors_are_released_if_tables_can_not_be_unregistered(pool):
+    repo = DuckDBRepo()
+    repo.register(pa.table({"id": ["a"]}))
+    with patch.object(repo, "cursor") as cursor:
+        cursor.unregister.side_effect = Exception("unregister")
+        with pytest.raises(Exception, match="unregister"):
+            repo.close()
+    assert pool.cursors.qsize() == 2
+
+
+def test_one_pool_is_created_by_concurrent_queries(monkeypatch):
+    monkeypatch.delitem(client, "duckdb", raising=False)
+    monkeypatch.setitem(client, "s3", False)
+    def slow_connection():
+        time.sleep(0.05)
+        return create_connection()
+
+    with patch.object(duckdb_client, "create_connection", side_effect=slow_connection) as create:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            pools = list(executor.map(lambda _: get_pool(), range(8)))
+    create.assert_called_once()
+    assert all(p is pools[0] for p in pools)
+
+
+def test_busy_pool_returns_service_unavailable(client):
+    module = "api.src.usecases.stac.search_stac_items"
+    with patch(f"{module}.DuckDBRepo", side_effect=TooManyQueriesError()):
+        response = client.get("/stac/search?collections=test")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
@@ -0,0 +1,57 @@
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from api.src.repos import MemoryCacheRepo
+
+COLLECTIONS = [
+    {"name": f"collection-{i}", "metadata": {"description": f"description {i}", "license": "MIT"}, "versions": [{"version_id": 1}]}
+    for i in range(5)
+]
+COLLECTIONS[0]["versions"].append(
+    {
+        "version_id": 2,
+        "extent": {"spatial": {"bbox": [[0, 0, 1, 1]]}, "temporal": {"interval": [[None, None]]}},
+        "summaries": {"proj:epsg": [4326]},
+        "items": 10,
+        "assets_size": 100,
+    }
+)
+
+
+@pytest.fixture
+def stac_repo():
+    MemoryCacheRepo("stac-collections", 0).invalidate()
+    repo = MagicMock()
+    repo.retrieve_collections.side_effect = lambda offset, limit: COLLECTIONS[offset : offset + limit]
+    with patch("api.src.usecases.stac.retrieve_stac_collections.STACDBRepo", return_value=repo):
+        yield repo
+    MemoryCacheRepo("stac-collections", 0).invalidate()
+
+
+def test_collections_are_paginated(client, stac_repo):
+    response = client.get("/stac/collections?limit=2")
+    assert response.status_code == 200
+    page = response.json()
+    assert [c["id"] for c in page["collections"]] == ["collection-0", "collection-1"]
+    assert page["collections"][0]["extent"]["spatial"]["bbox"] == [[0, 0, 1, 1]]
+    assert page["collections"][0]["summaries"] == {"proj:epsg": [4326]}
+    assert page["collections"][1]["description"] == "description 1"
+    [next_link] = [link for link in page["links"] if link["rel"] == "next"]
+
+    names = []
+    while next_link:
+        page = client.get(next_link["href"]).json()
+        names += [c["id"] for c in page["collections"]]
+        next_link = next((link for link in page["links"] if link["rel"] == "next"), None)
+    assert names == ["collection-2", "collection-3", "collection-4"]
+
+
+def test_collections_are_cached(client, stac_repo):
+    response = client.get("/stac/collections")
+    etag = response.headers["etag"]
+    assert client.get("/stac/collections").headers["etag"] == etag
+    assert stac_repo.retrieve_collections.call_count == 1
+    response = client.get("/stac/collections", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
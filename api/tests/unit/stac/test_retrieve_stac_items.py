@@ -0,0 +1,139 @@
+from collections import OrderedDict
+import io
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pyarrow.parquet as pq
+import pytest
+import stac_geoparquet
+
+from api.src.repos import CatalogCacheRepo
+from api.src.repos.minio.MinioRepo import RemoteFile
+
+
+def catalog(n):
+    items = [
+        {
+            "type": "Feature",
+            "stac_version": "1.0.0",
+            "id": f"item-{i}",
+            "geometry": {"type": "Point", "coordinates": [i, i]},
+            "bbox": [i, i, i, i],
+            "properties": {"datetime": "2024-01-01T00:00:00Z"},
+            "assets": {"asset": {"href": f"https://api/datasets/123/stage/{i}.tif"}},
+            "links": [],
+        }
+        for i in range(n)
+    ]
+    return stac_geoparquet.arrow.parse_stac_items_to_arrow(items, schema="FirstBatch").read_all()
+
+
+class FakeResponse(io.BytesIO):
+    def release_conn(self):
+        pass
+
+
+class FakeClient:
+    def __init__(self, data):
+        self.data = data
+
+    def get_object(self, bucket, object, offset, length):
+        return FakeResponse(self.data[offset : offset + length])
+
+
+class FakeOSRepo:
+    downloads = 0
+
+    def __init__(self):
+        f = io.BytesIO()
+        # two items in each row group
+        pq.write_table(catalog(5), f, row_group_size=2)
+        self.data = f.getvalue()
+
+    def object_info(self, dataset_id, file_name):
+        return SimpleNamespace(etag="etag", size=len(self.data))
+
+    def download_file(self, dataset_id, file_name, file_path):
+        FakeOSRepo.downloads += 1
+        with open(file_path, "wb") as f:
+            f.write(self.data)
+
+    def open_file(self, dataset_id, file_name, size):
+        return RemoteFile(FakeClient(self.data), "bucket", f"{dataset_id}/{file_name}", size)
+
+
+# catalogs that fit in the cache, and larger catalogs read from the storage
+@pytest.fixture(params=["cached", "remote"])
+def mock_catalog(request, monkeypatch):
+    monkeypatch.setattr(CatalogCacheRepo, "tables", OrderedDict())
+    monkeypatch.setattr(CatalogCacheRepo, "size", 0)
+    monkeypatch.delenv("CATALOG_CACHE_PATH", raising=False)
+    if request.param == "remote":
+        monkeypatch.setenv("CATALOG_CACHE_SIZE", "0")
+    FakeOSRepo.downloads = 0
+    with (
+        patch("api.src.usecases.stac.retrieve_stac_items.retrieve_collection", return_value=SimpleNamespace(id="123")),
+        patch("api.src.usecases.stac.retrieve_catalog.OSRepo", FakeOSRepo),
+    ):
+        yield request.param
+
+
+def test_items_are_paginated(client, mock_catalog):
+    response = client.get("/stac/collections/test/items?limit=2")
+    assert response.status_code == 200
+    page = response.json()
+    assert [item["id"] for item in page["features"]] == ["item-0", "item-1"]
+    assert page["numberMatched"] == 5
+    assert page["numberReturned"] == 2
+    [next_link] = [link for link in page["links"] if link["rel"] == "next"]
+
+    ids = []
+    while next_link:
+        page = client.get(next_link["href"]).json()
+        ids += [item["id"] for item in page["features"]]
+        next_link = next((link for link in page["links"] if link["rel"] == "next"), None)
+    assert ids == ["item-2", "item-3", "item-4"]
+
+
+def test_links_are_absolute(client, mock_catalog):
+    page = client.get("/stac/collections/test/items?limit=2").json()
+    links = {link["rel"]: link["href"] for link in page["links"]}
+    assert links["root"] == "http://testserver/stac"
+    assert links["next"] == "http://testserver/stac/collections/test/items?version=1&limit=2&token=2"
+    # behind the reverse proxy
+    page = client.get("/stac/collections/test/items?limit=2", headers={"x-forwarded-proto": "https"}).json()
+    assert all(link["href"].startswith("https://testserver/stac") for link in page["links"])
+
+
+def test_invalid_token(client, mock_catalog):
+    response = client.get("/stac/collections/test/items?token=abc")
+    assert response.status_code == 409
+
+
+def test_items_are_streamed_as_ndjson(client, mock_catalog):
+    response = client.get("/stac/collections/test/items?f=ndjson")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.strip().split("\n")
+    assert [json.loads(line)["id"] for line in lines] == [f"item-{i}" for i in range(5)]
+
+
+def test_pages_of_catalogs_not_cached_only_read_their_row_groups(client, mock_catalog):
+    if mock_catalog == "cached":
+        pytest.skip("cached catalogs are downloaded once")
+    read_row_groups = pq.ParquetFile.read_row_groups
+    with patch.object(pq.ParquetFile, "read_row_groups", autospec=True, side_effect=read_row_groups) as read:
+        page = client.get("/stac/collections/test/items?limit=2&token=1").json()
+    assert [item["id"] for item in page["features"]] == ["item-1", "item-2"]
+    assert page["numberMatched"] == 5
+    # items 1 and 2 are in the first and second row groups, the third is not read
+    assert read.call_args.args[1] == [0, 1]
+    assert FakeOSRepo.downloads == 0
+
+
+def test_pages_after_the_last_item_are_empty(client, mock_catalog):
+    page = client.get("/stac/collections/test/items?limit=2&token=10").json()
+    assert page["features"] == []
+    assert page["numberMatched"] == 5
+    assert not [link for link in page["links"] if link["rel"] == "next"]
@@ -0,0 +1,131 @@
+import json
+import sys
+from collections import OrderedDict
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+
+import pytest
+import stac_geoparquet
+
+from api.src.repos import CatalogCacheRepo
+
+
+def catalog(n, prefix="item"):
+    items = [
+        {
+            "type": "Feature",
+            "stac_version": "1.0.0",
+            "id": f"{prefix}-{i}",
+            "geometry": {"type": "Point", "coordinates": [i, i]},
+            "bbox": [i, i, i, i],
+            "properties": {"datetime": f"2024-01-0{i + 1}T00:00:00Z", "eo:cloud_cover": i * 10},
+            "assets": {"asset": {"href": f"https://api/datasets/123/stage/{i}.tif"}},
+            "links": [],
+        }
+        for i in range(n)
+    ]
+    return stac_geoparquet.arrow.parse_stac_items_to_arrow(items, schema="FirstBatch").read_all()
+
+
+@pytest.fixture
+def mock_catalogs():
+    module = "api.src.usecases.stac.search_stac_items"
+    catalogs = {"a": catalog(5, "a"), "b": catalog(3, "b")}
+    os_repo = MagicMock()
+    os_repo.object_info.return_value = SimpleNamespace(size=1000, etag="etag")
+    with (
+        patch(
+            f"{module}.retrieve_collection",
+            side_effect=lambda name: SimpleNamespace(id=name, versions=[SimpleNamespace(version_id=1)]),
+        ),
+        patch(f"{module}.OSRepo", return_value=os_repo),
+        patch(f"{module}.load_catalog_table", side_effect=lambda id, version, etag: catalogs[id]),
+    ):
+        yield
+
+
+def ids(response):
+    assert response.status_code == 200, response.text
+    return [item["id"] for item in response.json()["features"]]
+
+
+def test_search_bbox(client, mock_catalogs):
+    response = client.get("/stac/search?collections=a&bbox=0.5,0.5,2.5,2.5")
+    assert ids(response) == ["a-1", "a-2"]
+    assert response.json()["features"][0]["collection"] == "a"
+
+
+def test_search_intersects(client, mock_catalogs):
+    triangle = {"type": "Polygon", "coordinates": [[[0, 0], [3.5, 0], [3.5, 3.5], [0, 0]]]}
+    response = client.post("/stac/search", json={"collections": ["a"], "intersects": triangle})
+    assert ids(response) == ["a-0", "a-1", "a-2", "a-3"]
+    # the bbox of the geometry contains a point outside of it
+    outside = {"type": "Polygon", "coordinates": [[[0, 1], [0, 4], [3, 4], [0, 1]]]}
+    response = client.post("/stac/search", json={"collections": ["a"], "intersects": outside})
+    assert ids(response) == []
+
+
+def test_search_datetime_and_ids(client, mock_catalogs):
+    response = client.get("/stac/search?collections=a&datetime=2024-01-02T00:00:00Z/..")
+    assert ids(response) == ["a-1", "a-2", "a-3", "a-4"]
+    response = client.get("/stac/search?collections=a&datetime=../2024-01-02&ids=a-1,a-3")
+    assert ids(response) == ["a-1"]
+
+
+def test_search_filter(client, mock_catalogs):
+    query = {
+        "op": "and",
+        "args": [
+            {"op": ">=", "args": [{"property": "eo:cloud_cover"}, 20]},
+            {"op": "in", "args": [{"property": "id"}, ["a-1", "a-2", "a-4"]]},
+        ],
+    }
+    response = client.get("/stac/search", params={"collections": "a", "filter": json.dumps(query)})
+    assert ids(response) == ["a-2", "a-4"]
+
+
+def test_search_filter_values_are_parameters(client, mock_catalogs):
+    query = {"op": "=", "args": [{"property": "id"}, "a-1' OR '1'='1"]}
+    response = client.post("/stac/search", json={"collections": ["a"], "filter": query})
+    assert ids(response) == []
+    # unknown properties match nothing
+    query = {"op": "=", "args": [{"property": "id; DROP TABLE x"}, "a-1"]}
+    response = client.post("/stac/search", json={"collections": ["a"], "filter": query})
+    assert ids(response) == []
+
+
+def test_search_unsupported_filter(client, mock_catalogs):
+    query = {"op": "s_crosses", "args": [{"property": "geometry"}, {"type": "Point", "coordinates": [0, 0]}]}
+    response = client.post("/stac/search", json={"collections": ["a"], "filter": query})
+    assert response.status_code == 409
+
+
+def test_search_is_paginated_across_collections(client, mock_catalogs):
+    response = client.post("/stac/search", json={"collections": ["a", "b"], "limit": 3})
+    result = ids(response)
+    next_link = next(link for link in response.json()["links"] if link["rel"] == "next")
+    while next_link:
+        assert next_link["method"] == "POST"
+        response = client.post(next_link["href"], json=next_link["body"])
+        result += ids(response)
+        next_link = next((link for link in response.json()["links"] if link["rel"] == "next"), None)
+    assert result == ["a-0", "a-1", "a-2", "a-3", "a-4", "b-0", "b-1", "b-2"]
+
+
+def test_search_get_next_link(client, mock_catalogs):
+    response = client.get("/stac/search?collections=a&bbox=0.5,0.5,3.5,3.5&limit=2")
+    assert ids(response) == ["a-1", "a-2"]
+    [next_link] = [link for link in response.json()["links"] if link["rel"] == "next"]
+    assert next_link["href"].startswith("http://testserver/stac/search?")
+    assert ids(client.get(next_link["href"])) == ["a-3"]
+
+
+def test_row_numbers_are_kept_with_the_cached_catalog(client, mock_catalogs, monkeypatch):
+    module = sys.modules["api.src.usecases.stac.search_stac_items"]
+    monkeypatch.setattr(CatalogCacheRepo, "tables", OrderedDict())
+    monkeypatch.setattr(CatalogCacheRepo, "size", 0)
+    CatalogCacheRepo().put("a", 1, "etag", catalog(5, "a"))
+    with patch.object(module, "row_numbers", wraps=module.row_numbers) as row_numbers:
+        assert ids(client.get("/stac/search?collections=a&ids=a-1")) == ["a-1"]
+        assert ids(client.get("/stac/search?collections=a&ids=a-3")) == ["a-3"]
+    row_numbers.assert_called_once()
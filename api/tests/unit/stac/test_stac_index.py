@@ -0,0 +1,158 @@
+import io
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import shapely
+import stac_geoparquet
+
+from api.src.usecases.stac.stac_index import (
+    CollectionsIndex,
+    footprints_table,
+    search_collections,
+)
+
+
+def catalog(n, x=0, prefix="item"):
+    items = [
+        {
+            "type": "Feature",
+            "stac_version": "1.0.0",
+            "id": f"{prefix}-{i}",
+            "geometry": {"type": "Point", "coordinates": [x + i, x + i]},
+            "bbox": [x + i, x + i, x + i, x + i],
+            "properties": {"datetime": f"2024-01-0{i + 1}T00:00:00Z"},
+            "assets": {},
+            "links": [],
+        }
+        for i in range(n)
+    ]
+    return stac_geoparquet.arrow.parse_stac_items_to_arrow(items, schema="FirstBatch").read_all()
+
+
+def test_footprints_of_items_without_geometry_have_no_bounds():
+    # as written by the library for files that are not rasters
+    table = pa.table(
+        {
+            "id": pa.array(["a.txt", "b.tif"], pa.large_string()),
+            "geometry": [shapely.to_wkb(shapely.Polygon()), shapely.to_wkb(shapely.box(1, 2, 3, 4))],
+            "datetime": pa.array([datetime(2024, 1, 1), datetime(2024, 1, 2)], pa.timestamp("us")),
+        }
+    )
+    footprints = footprints_table(table, "test").to_pylist()
+    assert footprints == [
+        {
+            "collection": "test",
+            "id": "a.txt",
+            "xmin": None,
+            "ymin": None,
+            "xmax": None,
+            "ymax": None,
+            "start_datetime": datetime(2024, 1, 1, tzinfo=timezone.utc),
+            "end_datetime": datetime(2024, 1, 1, tzinfo=timezone.utc),
+        },
+        {
+            "collection": "test",
+            "id": "b.tif",
+            "xmin": 1.0,
+            "ymin": 2.0,
+            "xmax": 3.0,
+            "ymax": 4.0,
+            "start_datetime": datetime(2024, 1, 2, tzinfo=timezone.utc),
+            "end_datetime": datetime(2024, 1, 2, tzinfo=timezone.utc),
+        },
+    ]
+
+
+@patch("api.src.usecases.stac.stac_index.collections_index")
+def test_items_without_geometry_are_found_by_ids_and_datetime(collections_index):
+    table = pa.table(
+        {
+            "id": pa.array(["a.txt"], pa.large_string()),
+            "geometry": [shapely.to_wkb(shapely.Polygon())],
+            "datetime": pa.array([datetime(2024, 1, 1)], pa.timestamp("us")),
+        }
+    )
+    collections_index.get_table.return_value = footprints_table(table, "files")
+    assert search_collections(ids=["a.txt"]) == ["files"]
+    start = datetime(2023, 12, 31, tzinfo=timezone.utc)
+    assert search_collections(datetime=(start, None)) == ["files"]
+    assert search_collections(bbox=[-180, -90, 180, 90]) == []
+    assert search_collections(bbox=[170, -90, -170, 90]) == []
+
+
+@patch("api.src.usecases.stac.stac_index.collections_index")
+def test_search_collections(collections_index):
+    collections_index.get_table.return_value = pa.concat_tables(
+        [footprints_table(catalog(3, 0, "a"), "a"), footprints_table(catalog(3, 10, "b"), "b")]
+    )
+    assert search_collections(bbox=[-1, -1, 20, 20]) == ["a", "b"]
+    assert search_collections(bbox=[9, 9, 11, 11]) == ["b"]
+    assert search_collections(bbox=[5, 5, 6, 6]) == []
+    start = datetime(2024, 1, 3, tzinfo=timezone.utc)
+    assert search_collections(bbox=[9, 9, 11, 11], datetime=(start, None)) == []
+    assert search_collections(ids=["a-1"]) == ["a"]
+
+
+def partition(table):
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer)
+    return buffer.getvalue()
+
+
+def test_only_changed_partitions_are_downloaded(monkeypatch):
+    monkeypatch.setenv("STAC_INDEX_TTL", "0")
+    files = {
+        "a.parquet": ("etag-1", partition(footprints_table(catalog(2, 0, "a"), "a"))),
+        "b.parquet": ("etag-1", partition(footprints_table(catalog(3, 0, "b"), "b"))),
+    }
+    os_repo = MagicMock()
+    os_repo.list_files.side_effect = lambda prefix: [
+        SimpleNamespace(object_name=f"{prefix}/{name}", etag=etag) for name, (etag, _) in files.items()
+    ]
+    os_repo.read_file.side_effect = lambda prefix, name: MagicMock(read=lambda: files[name][1])
+    index = CollectionsIndex()
+    with patch("api.src.usecases.stac.stac_index.OSRepo", return_value=os_repo):
+        assert index.get_table().num_rows == 5
+        files["a.parquet"] = ("etag-2", partition(footprints_table(catalog(4, 0, "a"), "a")))
+        del files["b.parquet"]
+        assert index.get_table().num_rows == 4
+    assert [call.args[1] for call in os_repo.read_file.call_args_list] == ["a.parquet", "b.parquet", "a.parquet"]
+
+
+def test_search_without_collections_uses_the_index(client):
+    module = "api.src.usecases.stac.search_stac_items"
+    catalogs = {"a": catalog(3, 0, "a"), "b": catalog(3, 10, "b")}
+    os_repo = MagicMock()
+    os_repo.object_info.return_value = SimpleNamespace(size=1000, etag="etag")
+    with (
+        patch(f"{module}.search_collections", return_value=["b"]) as search_collections,
+        patch(
+            f"{module}.retrieve_collection",
+            side_effect=lambda name: SimpleNamespace(id=name, versions=[SimpleNamespace(version_id=1)]),
+        ),
+        patch(f"{module}.OSRepo", return_value=os_repo),
+        patch(f"{module}.load_catalog_table", side_effect=lambda id, version, etag: catalogs[id]),
+    ):
+        response = client.get("/stac/search?bbox=9.5,9.5,11.5,11.5")
+        assert response.status_code == 200
+        assert [(item["collection"], item["id"]) for item in response.json()["features"]] == [
+            ("b", "b-0"),
+            ("b", "b-1"),
+        ]
+        assert search_collections.call_args.args[0] == [9.5, 9.5, 11.5, 11.5]
+        # searches need some criteria to narrow down the collections
+        assert client.get("/stac/search").status_code == 409
+
+
+def test_index_is_rebuilt_by_admins(client, monkeypatch):
+    monkeypatch.setenv("ADMIN_API_KEY", "admin-key")
+    with patch("api.routers.stac.stac.rebuild_stac_index", return_value={"a": 3}) as rebuild:
+        assert client.post("/stac/index").status_code == 401
+        assert client.post("/stac/index", headers={"X-API-Key": "other"}).status_code == 401
+        response = client.post("/stac/index", headers={"X-API-Key": "admin-key"})
+    assert response.status_code == 200
+    assert response.json() == {"a": 3}
+    rebuild.assert_called_once()
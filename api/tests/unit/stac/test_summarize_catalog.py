@@ -0,0 +1,70 @@
+from datetime import datetime
+
+import pyarrow as pa
+import shapely
+import stac_geoparquet
+
+from api.src.models import Version
+from api.src.usecases.stac.stac_index import footprints_table
+from api.src.usecases.stac.summarize_catalog import summarize_catalog, collection_fields
+
+
+def catalog():
+    items = [
+        {
+            "type": "Feature",
+            "stac_version": "1.0.0",
+            "id": f"item-{i}",
+            "geometry": {"type": "Point", "coordinates": [i, -i]},
+            "bbox": [i, -i, i, -i],
+            "properties": {
+                "datetime": f"2024-01-{i + 1:02d}T00:00:00Z",
+                "eo:cloud_cover": i * 10.5,
+                "proj:epsg": 4326 if i < 5 else 32630,
+                "label": f"label-{i}",
+            },
+            "assets": {"image": {"href": f"{i}.tif", "size": 100 * i}},
+            "links": [],
+        }
+        for i in range(12)
+    ]
+    return stac_geoparquet.arrow.parse_stac_items_to_arrow(items, schema="FirstBatch").read_all()
+
+
+def test_summarize_catalog():
+    table = catalog()
+    summary = summarize_catalog(table, footprints_table(table, "test"))
+    assert summary["extent"] == {
+        "spatial": {"bbox": [[0.0, -11.0, 11.0, 0.0]]},
+        "temporal": {"interval": [["2024-01-01T00:00:00Z", "2024-01-12T00:00:00Z"]]},
+    }
+    assert summary["items"] == 12
+    assert summary["assets_size"] == 100 * sum(range(12))
+    assert summary["summaries"] == {
+        "eo:cloud_cover": {"minimum": 0.0, "maximum": 115.5},
+        "proj:epsg": [4326, 32630],
+        # too many values to list, and strings have no range
+    }
+
+
+def test_catalogs_without_geometry_have_the_world_extent():
+    table = pa.table(
+        {
+            "id": ["a.txt"],
+            "geometry": [shapely.to_wkb(shapely.Polygon())],
+            "datetime": pa.array([datetime(2024, 1, 1)], pa.timestamp("us")),
+        }
+    )
+    summary = summarize_catalog(table, footprints_table(table, "test"))
+    assert summary["extent"]["spatial"] == {"bbox": [[-180.0, -90.0, 180.0, 90.0]]}
+
+
+def test_collection_fields():
+    table = catalog()
+    version = Version(version_id=2, **summarize_catalog(table, footprints_table(table, "test")))
+    fields = collection_fields([Version(version_id=1), version])
+    assert fields["extent"] == version.extent
+    assert fields["eotdl:items"] == 12
+    # versions ingested before summaries were computed have the whole world as extent
+    fields = collection_fields([Version(version_id=1)])
+    assert fields["extent"]["spatial"]["bbox"] == [[-180.0, -90.0, 180.0, 90.0]]
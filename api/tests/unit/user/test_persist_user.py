@@ -1,9 +1,17 @@
 import pytest
+from datetime import datetime
 from unittest.mock import patch
 
 from api.src.models import User
 from api.src.usecases.user import persist_user
 from api.src.errors import UserDoesNotExistError
+from api.src.repos import MemoryCacheRepo
+
+@pytest.fixture(autouse=True)
+def cache():
+    MemoryCacheRepo("users", 0).invalidate()
+    yield
+    MemoryCacheRepo("users", 0).invalidate()
 
 @pytest.fixture
 def user():
@@ -21,11 +29,11 @@ def test_update_user(mocked_retrieve, mocked_repo, user):
     mocked_retrieve.return_value = user
     mocked_repo_instance = mocked_repo.return_value
     mocked_repo_instance.update_user.return_value = user
-    result = persist_user(user.model_dump())
+    result = persist_user({**user.model_dump(), 'name': 'new name'})
     # repo.persist.assert_called_once_with('users', User(**user).dict())
     # repo.update.assert_not_called()
     assert result.uid == user.uid
-    assert result.name == user.name
+    assert result.name == 'new name'
     assert result.email == user.email
     assert result.picture == user.picture
     assert result.dataset_count == 0
@@ -49,4 +57,34 @@ def test_create_new_user(mocked_retrieve, mocked_repo, user):
     mocked_retrieve.assert_called_once_with(user.uid)
     mocked_repo_instance.update_user.assert_not_called()
     mocked_repo_instance.persist_user.assert_called_once()    
-    mocked_repo_instance.persist_user.generate_id()
\ No newline at end of file
+    mocked_repo_instance.persist_user.generate_id()
+
+@patch('api.src.usecases.user.persist_user.UserDBRepo')
+@patch('api.src.usecases.user.persist_user.retrieve_user')
+def test_unchanged_user_is_not_written(mocked_retrieve, mocked_repo, user):
+    mocked_retrieve.return_value = user
+    result = persist_user(user.model_dump())
+    assert result == user
+    mocked_repo.return_value.update_user.assert_not_called()
+
+@patch('api.src.usecases.user.persist_user.UserDBRepo')
+@patch('api.src.usecases.user.persist_user.retrieve_user')
+def test_user_is_written_once_per_interval(mocked_retrieve, mocked_repo, user):
+    mocked_retrieve.return_value = user.model_copy(update={'updatedAt': datetime(2020, 1, 1)})
+    result = persist_user(user.model_dump())
+    assert result.updatedAt > datetime(2020, 1, 1)
+    mocked_repo.return_value.update_user.assert_called_once()
+
+@patch('api.src.usecases.user.persist_user.UserDBRepo')
+@patch('api.src.usecases.user.persist_user.retrieve_user')
+def test_cached_user(mocked_retrieve, mocked_repo, user):
+    mocked_retrieve.return_value = user
+    persist_user(user.model_dump())
+    result = persist_user(user.model_dump())
+    assert result == user
+    mocked_retrieve.assert_called_once_with(user.uid)
+    # a new profile is written even if the user is cached
+    result = persist_user({**user.model_dump(), 'email': 'new email'})
+    assert result.email == 'new email'
+    assert mocked_retrieve.call_count == 2
+    mocked_repo.return_value.update_user.assert_called_once()
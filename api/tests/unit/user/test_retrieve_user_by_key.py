@@ -0,0 +1,48 @@
+import pytest
+from unittest.mock import patch
+
+from api.src.models import User
+from api.src.usecases.user import retrieve_user_by_key, delete_api_key
+from api.src.errors import InvalidApiKey
+from api.src.repos import MemoryCacheRepo
+
+@pytest.fixture(autouse=True)
+def cache():
+    for namespace in ["users", "api-keys"]:
+        MemoryCacheRepo(namespace, 0).invalidate()
+    yield
+    for namespace in ["users", "api-keys"]:
+        MemoryCacheRepo(namespace, 0).invalidate()
+
+@pytest.fixture
+def user():
+    return User(uid='test', name='test name', email='test email', picture=None, id='123')
+
+@patch('api.src.usecases.user.retrieve_user_by_key.UserDBRepo')
+def test_retrieve_user_by_key(mocked_repo, user):
+    repo = mocked_repo.return_value
+    repo.retrieve_user_by_key.return_value = {'id': 'key', 'uid': 'test'}
+    repo.retrieve_user_by_uid.return_value = user.model_dump()
+    assert retrieve_user_by_key('key') == user
+    assert retrieve_user_by_key('key') == user
+    repo.retrieve_user_by_key.assert_called_once_with('key')
+    repo.retrieve_user_by_uid.assert_called_once_with('test')
+
+@patch('api.src.usecases.user.retrieve_user_by_key.UserDBRepo')
+def test_retrieve_user_by_invalid_key(mocked_repo):
+    mocked_repo.return_value.retrieve_user_by_key.return_value = None
+    with pytest.raises(InvalidApiKey):
+        retrieve_user_by_key('key')
+
+@patch('api.src.usecases.user.delete_api_key.UserDBRepo')
+@patch('api.src.usecases.user.retrieve_user_by_key.UserDBRepo')
+def test_deleted_key_is_not_cached(mocked_repo, mocked_delete_repo, user):
+    repo = mocked_repo.return_value
+    repo.retrieve_user_by_key.return_value = {'id': 'key', 'uid': 'test'}
+    repo.retrieve_user_by_uid.return_value = user.model_dump()
+    retrieve_user_by_key('key')
+    mocked_delete_repo.return_value.retrieve_user_by_key.return_value = {'id': 'key', 'uid': 'test'}
+    delete_api_key(user, 'key')
+    repo.retrieve_user_by_key.return_value = None
+    with pytest.raises(InvalidApiKey):
+        retrieve_user_by_key('key')
@@ -45,6 +45,12 @@ def ingest(
         "--ignore-stac",
         "-is",
         help="Ignore STAC catalog.json (if found) for geneating metadata."
+    ),
+    raster_metadata: bool = typer.Option(
+        False,
+        "--raster-metadata",
+        "-rm",
+        help="Read the footprint and projection of rasters (GeoTIFF, JP2) into the catalog. Requires rasterio."
     )
 ):
     """
@@ -73,7 +79,7 @@ def ingest(
     $ eotdl dataset ingest --path /path/to/folder-with-dataset --verbose True
     """
     try:
-        ingest_dataset(path, verbose, typer.echo, foce_metadata_update, sync_metadata, private, ignore_stac)
+        ingest_dataset(path, verbose, typer.echo, foce_metadata_update, sync_metadata, private, ignore_stac, raster_metadata)
     except Exception as e:
         typer.echo(e)
         
@@ -127,6 +133,12 @@ def get(
         "--verbose",
         help="Verbose output. This will print the progress of the download",
     ),
+    resume: bool = typer.Option(
+        False,
+        "--resume",
+        "-r",
+        help="Only download the assets that are missing or corrupted, resuming partial downloads",
+    ),
 ):
     """
     Download a dataset from the EOTDL.
@@ -136,6 +148,7 @@ def get(
     If using --assets when the dataset is STAC, it will also download the STAC assets of the dataset. If not provided, it will only download the STAC metadata.\n
     If using --force, it will download the dataset even if the file already exists.\n
     If using --verbose, it will print the progress of the download.\n
+    If using --resume, it will only download the assets that are missing or do not match the checksum in the catalog.\n
     \n\n
     Examples\n
     --------\n
@@ -151,6 +164,7 @@ def get(
             assets,
             force,
             verbose,
+            resume=resume,
         )
         typer.echo(f"Data available at {dst_path}")
     except Exception as e:
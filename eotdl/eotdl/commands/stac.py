@@ -49,9 +49,15 @@ def item(collection_id: str, item_id: str):
         typer.echo(e)
 
 @app.command()
-def search(collection_id: str, query: Optional[str] = None):
+def search(
+    collection_id: str,
+    query: Optional[str] = typer.Option(None, help="CQL2-JSON filter"),
+    bbox: Optional[str] = typer.Option(None, help="Bounding box, as minx,miny,maxx,maxy"),
+    datetime: Optional[str] = typer.Option(None, help="RFC 3339 datetime or interval"),
+):
     try:
-        data = search_stac_items(collection_id, query)
+        bbox = [float(x) for x in bbox.split(",")] if bbox else None
+        data = search_stac_items(collection_id, query, bbox, datetime)
         typer.echo(data)
     except Exception as e:
         typer.echo(e)
\ No newline at end of file
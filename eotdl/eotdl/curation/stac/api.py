@@ -37,17 +37,24 @@ def retrieve_stac_item(collection_id, item_id):
         raise Exception(error)
     return data
 
-def search_stac_items(collection_id, query = None):
+def search_stac_items(collection_id, query = None, bbox = None, datetime = None):
+    """
+    Searches the items of a collection. `query` is a CQL2-JSON filter (as a dict or a
+    JSON string), e.g. {"op": "<", "args": [{"property": "eo:cloud_cover"}, 10]}.
+    Without query, bbox or datetime the columns of the catalog are returned.
+    """
     repo = STACAPIRepo()
-    if query is None:
+    if query is None and bbox is None and datetime is None:
         data, error = repo.search_columns(collection_id)
         if error:
             raise Exception(error)
         return data
-    data, error = repo.search(collection_id, str(query))
+    if isinstance(query, str):
+        query = json.loads(query)
+    data, error = repo.search(collection_id, query, bbox, datetime)
     if error:
         raise Exception(error)
-    return json.loads(data)
+    return data
     
 
 def search_stac_columns(collection_id):
@@ -34,6 +34,7 @@ def ingest_dataset(
 	sync_metadata=False,
 	private=False,
 	ignore_stac=False,
+	raster_metadata=False,
 ):
 	if private: print("Ingesting private dataset")
 	path = Path(path)
@@ -44,7 +45,7 @@ def ingest_dataset(
 		prep_ingest_stac(path, logger)
 	else:
 		print("Ingesting folder")
-		prep_ingest_folder(path, verbose, logger, force_metadata_update, sync_metadata)
+		prep_ingest_folder(path, verbose, logger, force_metadata_update, sync_metadata, raster_metadata)
 	return ingest(path, DatasetsAPIRepo(), retrieve_dataset, 'datasets', private)
 
 
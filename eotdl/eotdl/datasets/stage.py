@@ -1,13 +1,17 @@
 import os
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
 from tqdm import tqdm
 import geopandas as gpd
+import pandas as pd
 
 from ..auth import with_auth
 from .retrieve import retrieve_dataset
-from ..repos import FilesAPIRepo
+from ..repos import FilesAPIRepo, AssetsCacheRepo
 from ..files.metadata import Metadata
+from ..files.presigned import PresignedURLs
+from ..shared import calculate_checksum, ChecksumCache
 
 @with_auth
 def stage_dataset(
@@ -20,6 +24,7 @@ def stage_dataset(
     verbose=False,
     user=None,
     file=None,
+    resume=False,
 ):
     dataset = retrieve_dataset(dataset_name, user)
     if version is None:
@@ -36,7 +41,7 @@ def stage_dataset(
     else:
         download_path = path + "/" + dataset_name 
     # check if dataset already exists
-    if os.path.exists(download_path) and not force:
+    if os.path.exists(download_path) and not force and not resume:
         os.makedirs(download_path, exist_ok=True)
         # raise Exception(
         #     f"Dataset `{dataset['name']} v{str(version)}` already exists at {download_path}. To force download, use force=True or -f in the CLI."
@@ -53,22 +58,29 @@ def stage_dataset(
     # stage assets
     if assets:
         gdf = gpd.read_parquet(catalog_path)
-        asset_urls = []
-        for _, row in gdf.iterrows():
-            for _, v in row["assets"].items():
-                asset_urls.append(v["href"])
+        catalog_assets = [v for _, row in gdf.iterrows() for v in row["assets"].values()]
+        if resume:
+            catalog_assets = missing_assets(repo, catalog_assets, download_path, logger)
+        asset_urls = [asset["href"] for asset in catalog_assets]
+
+        # assets already staged for other datasets or versions are taken from the cache
+        cache = AssetsCacheRepo() if int(os.getenv("EOTDL_CACHE_SIZE", "1")) > 0 else None
+        # presigned urls of EOTDL assets are requested in batches instead of one request per asset
+        presigned_urls = PresignedURLs(lambda urls: repo.generate_presigned_urls(urls, user), asset_urls)
 
         workers = max(1, int(os.getenv("EOTDL_STAGE_WORKERS", "8")))
         workers = min(workers, len(asset_urls) or 1)
 
         if workers == 1:
-            for href in tqdm(asset_urls, total=len(asset_urls), desc="Staging assets"):
-                repo.stage_file_url(href, download_path, user)
+            for ix, asset in enumerate(tqdm(catalog_assets, total=len(catalog_assets), desc="Staging assets")):
+                stage_asset(repo, asset, download_path, user, resume, cache, partial(presigned_urls.get, ix))
         else:
             with ThreadPoolExecutor(max_workers=workers) as executor:
                 futures = [
-                    executor.submit(repo.stage_file_url, href, download_path, user)
-                    for href in asset_urls
+                    executor.submit(
+                        stage_asset, repo, asset, download_path, user, resume, cache, partial(presigned_urls.get, ix)
+                    )
+                    for ix, asset in enumerate(catalog_assets)
                 ]
                 for future in tqdm(
                     as_completed(futures),
@@ -76,9 +88,62 @@ def stage_dataset(
                     desc=f"Staging assets ({workers} workers)",
                 ):
                     future.result()
+        if cache is not None and cache.hits:
+            logger(f"Cache: {cache.hits} assets reused ({cache.bytes_reused / 1024 / 1024:.1f} MB), {cache.misses} downloaded")
     return download_path
 
 
+def asset_value(asset, field):
+    value = asset.get(field)
+    return None if value is None or pd.isna(value) else value
+
+
+def missing_assets(repo, catalog_assets, download_path, logger=print):
+    """
+    Returns the assets that are not staged yet, comparing local files against the size
+    and checksum in the catalog. Checksums are cached, so re-staging only hashes new files.
+    """
+    local_paths = [repo.get_file_path(asset["href"], download_path) for asset in catalog_assets]
+    candidates = [
+        i
+        for i, (asset, file_path) in enumerate(zip(catalog_assets, local_paths))
+        if os.path.isfile(file_path)
+        and asset_value(asset, "size") in (None, os.path.getsize(file_path))
+    ]
+    checksum_cache = ChecksumCache(download_path)
+    checksums = checksum_cache.checksums(
+        [local_paths[i] for i in candidates if asset_value(catalog_assets[i], "checksum")]
+    )
+    checksum_cache.save()
+    staged = {
+        i
+        for i in candidates
+        if asset_value(catalog_assets[i], "checksum") in (None, checksums.get(local_paths[i], (None,))[0])
+    }
+    missing = [asset for i, asset in enumerate(catalog_assets) if i not in staged]
+    logger(f"{len(catalog_assets) - len(missing)} assets already staged, {len(missing)} to download")
+    return missing
+
+
+def stage_asset(repo, asset, download_path, user, resume=False, cache=None, get_presigned_url=None):
+    checksum = asset_value(asset, "checksum")
+    if cache is not None and checksum:
+        file_path = repo.get_file_path(asset["href"], download_path)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        if cache.materialize(checksum, file_path):
+            return file_path
+    # only requested on cache misses
+    presigned_url = get_presigned_url() if get_presigned_url is not None else None
+    file_path = repo.stage_file_url(asset["href"], download_path, user, resume=resume, presigned_url=presigned_url)
+    if checksum and (resume or cache is not None) and os.path.isfile(file_path):
+        if calculate_checksum(file_path) != checksum:
+            os.remove(file_path)  # corrupted, will be downloaded again on the next attempt
+            raise Exception(f"Checksum mismatch for {file_path}")
+        if cache is not None:
+            cache.put(checksum, file_path)
+    return file_path
+
+
 @with_auth
 def stage_dataset_file(file_url, path, user):
     repo = FilesAPIRepo()
@@ -0,0 +1,301 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import batched
+from pathlib import Path
+import json
+import os
+import tempfile
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import pystac
+import shapely
+import stac_geoparquet
+from shapely.geometry import Polygon
+from tqdm import tqdm
+
+from ..shared import ChecksumCache
+
+ASSET_TYPE = pa.struct(
+	[
+		("href", pa.string()),
+		("checksum", pa.string()),
+		("timestamp", pa.timestamp("us")),
+		("size", pa.int64()),
+	]
+)
+BBOX_FIELDS = ["xmin", "ymin", "xmax", "ymax"]
+RASTER_EXTENSIONS = (".tif", ".tiff", ".jp2")
+PROJECTION_EXTENSION = "https://stac-extensions.github.io/projection/v1.1.0/schema.json"
+
+
+def catalog_schema(raster_metadata=False):
+	"""
+	Schema of the catalog. With `raster_metadata`, items have the footprint of the rasters
+	(in EPSG:4326) and the fields of the projection extension.
+	"""
+	fields = [
+		("type", pa.large_string()),
+		("stac_version", pa.large_string()),
+		("stac_extensions", pa.list_(pa.large_string() if raster_metadata else pa.null())),
+		("datetime", pa.timestamp("us")),
+		("id", pa.large_string()),
+		("bbox", pa.struct([(f, pa.float64()) for f in BBOX_FIELDS])),
+		pa.field(
+			"geometry",
+			pa.binary(),
+			metadata={"ARROW:extension:name": "geoarrow.wkb", "ARROW:extension:metadata": "{}"},
+		),
+		("assets", pa.struct([("asset", ASSET_TYPE)])),
+		("links", pa.list_(pa.null())),
+		("repository", pa.large_string()),
+	]
+	geometry = {"encoding": "WKB", "geometry_types": ["Polygon"]}
+	if raster_metadata:
+		fields += [
+			("proj:epsg", pa.int64()),
+			("proj:shape", pa.list_(pa.int64())),
+			("proj:transform", pa.list_(pa.float64())),
+		]
+	else:
+		geometry["crs"] = None  # empty geometries, unknown crs
+	geo = {
+		"primary_column": "geometry",
+		"columns": {"geometry": geometry},
+		"version": "1.1.0",
+		"creator": {"library": "eotdl"},
+	}
+	return pa.schema(fields, metadata={"geo": json.dumps(geo)})
+
+
+CATALOG_SCHEMA = catalog_schema()
+
+
+def get_read_workers():
+	return max(1, int(os.getenv("EOTDL_HASH_WORKERS", str(os.cpu_count() or 1))))
+
+
+def read_raster_metadata(path):
+	"""
+	Reads the footprint and projection of a raster from its header, without reading pixels.
+	Returns None if the file is not a georeferenced raster.
+	"""
+	import rasterio
+	import rasterio.warp
+
+	try:
+		with rasterio.open(path) as src:
+			if src.crs is None:
+				return None
+			# same as `tools.geo_utils.get_image_bbox`
+			bbox = rasterio.warp.transform_bounds(src.crs, "EPSG:4326", *src.bounds)
+			date = src.tags().get("TIFFTAG_DATETIME")  # YYYY:MM:DD HH:MM:SS
+			try:
+				date = datetime.strptime(date, "%Y:%m:%d %H:%M:%S").isoformat() if date else None
+			except ValueError:
+				date = None
+			return {
+				"bbox": list(bbox),
+				"epsg": src.crs.to_epsg(),
+				"shape": [src.height, src.width],
+				"transform": list(src.transform)[:6],
+				"datetime": date,
+			}
+	except rasterio.errors.RasterioError:
+		return None
+
+
+def read_rasters_metadata(file_paths, checksum_cache, workers=None):
+	"""
+	Returns the raster metadata of each file (None if it is not a raster). Headers are read
+	in parallel (GDAL releases the GIL) only for rasters that changed since the last ingestion.
+	"""
+	rasters = [f for f in file_paths if f.lower().endswith(RASTER_EXTENSIONS)]
+	missing = [f for f in rasters if not checksum_cache.has_metadata(f)]
+	if missing:
+		with ThreadPoolExecutor(max_workers=workers or get_read_workers()) as executor:
+			for f, metadata in zip(missing, executor.map(read_raster_metadata, missing)):
+				checksum_cache.set_metadata(f, metadata)
+	return [checksum_cache.get_metadata(f) if f in rasters else None for f in file_paths]
+
+
+def scan_files(folder, exclude=()):
+	"""
+	Yields the path of every file in the folder recursively. Hidden files and folders
+	are skipped, as `glob` does. Symlinked folders are followed, but each folder is only
+	visited once so symlinks to a parent do not loop forever.
+	"""
+	folders = [str(folder)]
+	visited = set()
+	while folders:
+		path = folders.pop()
+		stat = os.stat(path)
+		if (stat.st_dev, stat.st_ino) in visited:
+			continue
+		visited.add((stat.st_dev, stat.st_ino))
+		with os.scandir(path) as entries:
+			for entry in entries:
+				if entry.name.startswith("."):
+					continue
+				if entry.is_dir():
+					folders.append(entry.path)
+				elif entry.is_file() and entry.path not in exclude:
+					yield entry.path
+
+
+def stac_items_batch(ids, hrefs, checksums, sizes, rasters=None):
+	"""
+	Record batch with the minimum fields required for valid STAC items (see `create_stac_item`).
+	If the metadata of the `rasters` is given, the geometry, bbox, datetime and projection
+	fields are filled in for them.
+	"""
+	n = len(ids)
+	now = datetime.now()
+	schema = catalog_schema(raster_metadata=rasters is not None)
+	asset = pa.StructArray.from_arrays(
+		[
+			pa.array(hrefs, pa.string()),
+			pa.array(checksums, pa.string()),
+			pa.repeat(pa.scalar(now, pa.timestamp("us")), n),
+			pa.array(sizes, pa.int64()),
+		],
+		fields=list(ASSET_TYPE),
+	)
+	if rasters is None:
+		bbox = [pa.repeat(pa.scalar(0.0, pa.float64()), n)] * 4
+		geometry = pa.repeat(pa.scalar(shapely.to_wkb(Polygon()), pa.binary()), n)  # empty polygon
+		dates = pa.repeat(pa.scalar(now, pa.timestamp("us")), n)
+		extensions = pa.repeat(pa.scalar([], pa.list_(pa.null())), n)
+		proj = []
+	else:
+		bounds = [r["bbox"] if r else [0.0] * 4 for r in rasters]
+		bbox = [pa.array(c, pa.float64()) for c in zip(*bounds)] if n else [pa.array([], pa.float64())] * 4
+		geometry = pa.array(
+			[shapely.to_wkb(shapely.box(*b) if r else Polygon()) for b, r in zip(bounds, rasters)],
+			pa.binary(),
+		)
+		dates = pa.array(
+			[datetime.fromisoformat(r["datetime"]) if r and r["datetime"] else now for r in rasters],
+			pa.timestamp("us"),
+		)
+		extensions = pa.array([[PROJECTION_EXTENSION] if r else [] for r in rasters], pa.list_(pa.large_string()))
+		proj = [
+			pa.array([r["epsg"] if r else None for r in rasters], pa.int64()),
+			pa.array([r["shape"] if r else None for r in rasters], pa.list_(pa.int64())),
+			pa.array([r["transform"] if r else None for r in rasters], pa.list_(pa.float64())),
+		]
+	return pa.RecordBatch.from_arrays(
+		[
+			pa.repeat(pa.scalar("Feature", pa.large_string()), n),
+			pa.repeat(pa.scalar("1.0.0", pa.large_string()), n),
+			extensions,
+			dates,
+			pa.array(ids, pa.large_string()),
+			pa.StructArray.from_arrays(bbox, names=BBOX_FIELDS),
+			geometry,
+			pa.StructArray.from_arrays([asset], names=["asset"]),
+			pa.repeat(pa.scalar([], pa.list_(pa.null())), n),
+			pa.repeat(pa.scalar("eotdl", pa.large_string()), n),
+			*proj,
+		],
+		schema=schema,
+	)
+
+
+def write_folder_catalog(folder, catalog_path, batch_size=10000, logger=print, raster_metadata=False):
+	"""
+	Scans the folder and writes one STAC item per file to the catalog, in batches so
+	only `batch_size` items are kept in memory at a time. With `raster_metadata`, the
+	footprint and projection of rasters are read from their headers (requires rasterio).
+	"""
+	if raster_metadata:
+		try:
+			import rasterio
+		except ImportError:
+			raise ImportError("rasterio is not installed. Please install it with `pip install rasterio`")
+	checksum_cache = ChecksumCache(folder)
+	files = scan_files(folder, exclude=(str(catalog_path),))
+	num_files = 0
+	schema = catalog_schema(raster_metadata)
+	with pq.ParquetWriter(catalog_path, schema) as writer, tqdm(desc="Preparing files", unit=" files") as pbar:
+		for batch in batched(files, batch_size):
+			checksums = checksum_cache.checksums(batch, progress=False)
+			rasters = read_rasters_metadata(batch, checksum_cache) if raster_metadata else None
+			writer.write_batch(
+				stac_items_batch(
+					[os.path.relpath(f, folder) for f in batch],
+					batch,
+					[checksums[f][0] for f in batch],
+					[checksums[f][1] for f in batch],
+					rasters,
+				)
+			)
+			num_files += len(batch)
+			pbar.update(len(batch))
+	checksum_cache.save()
+	logger(f"Checksums: {checksum_cache.hits} reused, {checksum_cache.misses} computed")
+	return num_files
+
+
+def read_stac_item(href):
+	item = pystac.Item.from_file(href)
+	item.make_asset_hrefs_absolute()
+	return item
+
+
+def scan_stac_items(catalog, workers=None):
+	"""
+	Yields the items of all the collections in the catalog, walking it once. Item JSONs
+	are read in parallel and in order, keeping at most a few items per worker in memory.
+	"""
+	workers = workers or get_read_workers()
+	with ThreadPoolExecutor(max_workers=workers) as executor:
+		for collection in catalog.get_collections():
+			hrefs = (link.get_absolute_href() for link in collection.get_item_links())
+			for batch in batched(hrefs, 4 * workers):
+				yield from executor.map(read_stac_item, batch)
+
+
+def write_stac_catalog(path, catalog_path, batch_size=10000, prepare_item=None, logger=print):
+	"""
+	Converts the STAC catalog in the folder to GeoParquet with bounded memory. Items are
+	parsed to Arrow in batches that are written to temporary parquet files, then the schemas
+	of the batches are unified (items may have different properties) and the batches are
+	streamed to the catalog.
+	"""
+	path = Path(path)
+	catalog = pystac.Catalog.from_file(path / "catalog.json")
+	checksum_cache = ChecksumCache(path)
+	num_items, schema = 0, None
+	with tempfile.TemporaryDirectory() as tmpdir:
+		items = scan_stac_items(catalog)
+		with tqdm(desc="Preparing items", unit=" items") as pbar:
+			for i, batch in enumerate(batched(items, batch_size)):
+				local_assets = [
+					asset
+					for item in batch
+					for asset in item.assets.values()
+					if not asset.href.startswith(("http://", "https://"))
+				]
+				# checksums of files that did not change since the last ingestion are reused
+				checksums = checksum_cache.checksums([str(Path(a.href)) for a in local_assets], progress=False)
+				for asset in local_assets:
+					checksum, size = checksums[str(Path(asset.href))]
+					asset.extra_fields["size"] = size
+					asset.extra_fields["checksum"] = checksum
+				if prepare_item is not None:
+					batch = [prepare_item(item) for item in batch]
+				table = stac_geoparquet.arrow.parse_stac_items_to_arrow(batch).read_all()
+				schema = table.schema if schema is None else pa.unify_schemas(
+					[schema, table.schema], promote_options="permissive"
+				)
+				pq.write_table(table, os.path.join(tmpdir, f"{i:08d}.parquet"))
+				num_items += len(batch)
+				pbar.update(len(batch))
+		checksum_cache.save()
+		logger(f"Checksums: {checksum_cache.hits} reused, {checksum_cache.misses} computed")
+		if schema is None:
+			raise Exception("No items found in the STAC catalog")
+		batches = ds.dataset(tmpdir, schema=schema, format="parquet").to_batches(batch_size=batch_size)
+		stac_geoparquet.arrow.to_parquet(pa.RecordBatchReader.from_batches(schema, batches), catalog_path)
+	return num_items
@@ -1,10 +1,6 @@
-from glob import glob
 from pathlib import Path
 import geopandas as gpd
 import os
-import pystac
-from tqdm import tqdm
-import stac_geoparquet
 import frontmatter
 import random
 import pandas as pd
@@ -13,12 +9,14 @@ from shapely.geometry import Polygon
 
 from ..auth import with_auth
 from ..files.metadata import Metadata
+from ..files.upload import upload_assets
+from ..files.catalog import write_folder_catalog, write_stac_catalog
 from ..repos import FilesAPIRepo
 from ..shared import calculate_checksum
 
 def fix_timestamp(item, field='created'):
-	if 'properties' in item.to_dict() and field in item.to_dict()['properties']:
-		created = item.to_dict()['properties'][field]
+	if field in item.properties:
+		created = item.properties[field]
 		if isinstance(created, str):
 			# Parse and reformat the timestamp to ensure it's compatible with parquet
 			try:
@@ -39,65 +37,29 @@ def prep_ingest_folder(
 	logger=print,
 	force_metadata_update=False,
 	sync_metadata=False,
+	raster_metadata=False,
 ):
 	logger("Ingesting directory: " + str(folder))
 	catalog_path = folder.joinpath("catalog.parquet")
-	files = glob(str(folder) + '/**/*', recursive=True)
-	# remove catalog.parquet from files
-	files = [f for f in files if f != str(catalog_path)]
 	# ingest geometry from files (if tifs) or additional list of geometries
 	# https://stac-utils.github.io/stac-geoparquet/latest/spec/stac-geoparquet-spec/#use-cases
-	data = []
-	for file in tqdm(files, total=len(files), desc="Preparing files"):
-		file_path = Path(file)
-		if file_path.is_file():
-			relative_path = os.path.relpath(file_path, catalog_path.parent)
-			absolute_path = str(file_path)
-			# THIS IS THE MINIMUM REQUIRED FIELDS TO CREATE A VALID STAC ITEM
-			data.append(create_stac_item(relative_path, absolute_path))
-	gdf = gpd.GeoDataFrame(data, geometry='geometry')
-	# Save to parquet
-	gdf.to_parquet(catalog_path)
+	# items are written to parquet in batches, never keeping all of them in memory
+	write_folder_catalog(folder, catalog_path, logger=logger, raster_metadata=raster_metadata)
 	return catalog_path
 
-# IF THE KEYS IN THE ASSETS ARE NOT THE SAME ON ALL ITEMS, THE PARQUET WILL NOT BE VALID !!!
-def prep_ingest_stac(path, logger=None): # in theory should work with a remote catalog (given URL)
-	# read stac catalog
-	stac_catalog = path / "catalog.json"
-	print("Reading STAC catalog...", end="", flush=True)
-	catalog = pystac.Catalog.from_file(stac_catalog)
-	print("done")
-	# make all items paths hredf in assets absolute
-	catalog.make_all_asset_hrefs_absolute() 
-	# generate list of items for all collections
-	print(f"Found {len(list(catalog.get_collections()))} collections")
-	items = []
-	for collection in catalog.get_collections():
-		print(f"Preparing items from collection {collection.id}", flush=True)
-		# iterate over items
-		for item in tqdm(collection.get_items(), total=len(list(collection.get_items()))):
-			assert isinstance(item, pystac.Item)
-			# Process each asset in the item
-			for asset in item.assets.values():
-				if not asset.href.startswith(('http://', 'https://')):
-					# Asset is a local file
-					file_path = Path(asset.href)
-					# Calculate and add file size
-					asset.extra_fields['size'] = file_path.stat().st_size
-					# Calculate and add checksum
-					asset.extra_fields['checksum'] = calculate_checksum(str(file_path))
-					# print(asset.to_dict())
-			# Fix timestamp format in properties.created (did this to solve errors with charter challenge... but I guess people should fix their STAC metadata)
-			item = fix_timestamp(item, 'created')
-			item = fix_timestamp(item, 'updated')
-			items.append(item)
-	# save parquet file
-	print("Saving parquet file...", end="", flush=True)
+def prep_ingest_stac(path, logger=print): # in theory should work with a remote catalog (given URL)
+	# the catalog is walked once and items are converted to parquet in batches, never keeping all of them in memory
+	print("Reading STAC catalog...")
+	output_path = path / "catalog.parquet"
 	try:
-		record_batch_reader = stac_geoparquet.arrow.parse_stac_items_to_arrow(items)
-		output_path = stac_catalog.parent / "catalog.parquet"
-		stac_geoparquet.arrow.to_parquet(record_batch_reader, output_path)
-		print("done")
+		# Fix timestamp format in properties.created (did this to solve errors with charter challenge... but I guess people should fix their STAC metadata)
+		num_items = write_stac_catalog(
+			path,
+			output_path,
+			prepare_item=lambda item: fix_timestamp(fix_timestamp(item, 'created'), 'updated'),
+			logger=logger or print,
+		)
+		print(f"Saved {num_items} items to parquet file")
 		return output_path
 	except Exception as e:
 		print(f"\nError saving parquet file: {e}")
@@ -166,36 +128,20 @@ def ingest(path, repo, retrieve, mode, private, user):
 	catalog_url = files_repo.generate_presigned_url(f'catalog.v{current_version}.parquet', dataset_or_model['id'], user, endpoint=mode)
 	# first time ingesting
 	if catalog_url is None:
-		total_size = 0
-		for row in tqdm(gdf.iterrows(), total=len(gdf), desc="Ingesting files"):
-			try:
-				assets_count = len(row[1]["assets"])
-				for k, v in row[1]["assets"].items():
-					if not v: continue # skip empty assets
-					if v["href"].startswith("http"): continue
-					item_id = row[1]["id"]
-					# Determine file name based on number of assets
-					if assets_count == 1:
-						file_name = item_id
-					else:
-						file_name = f"{item_id}_{k}"
-					# print(f"Ingesting file {v['href']} with id {file_name}")
-					data, error = files_repo.ingest_file(
-						v["href"],
-						file_name, 
-						# Path(v["href"]).stat().st_size,
-						dataset_or_model['id'],
-						user,
-						mode,
-					)
-					if error:
-						raise Exception(error)
-					file_url = f"{repo.url}{mode}/{dataset_or_model['id']}/stage/{file_name}"
-					gdf.loc[row[0], "assets"][k]["href"] = file_url
-					total_size += v["size"]
-			except Exception as e:
-				print(f"Error uploading asset {row[0]}: {e}")
-				break
+		uploads, targets = [], []
+		for row in gdf.iterrows():
+			assets_count = len(row[1]["assets"])
+			for k, v in row[1]["assets"].items():
+				if not v: continue # skip empty assets
+				if v["href"].startswith("http"): continue
+				# Determine file name based on number of assets
+				file_name = asset_file_name(row[1]["id"], k, assets_count)
+				uploads.append({"href": v["href"], "file_name": file_name, "size": v["size"], "checksum": v.get("checksum")})
+				targets.append((row[0], k))
+		results, error = upload_assets(files_repo, uploads, dataset_or_model['id'], user, mode)
+		if error:
+			print(error)
+		total_size = update_asset_hrefs(gdf, uploads, targets, results, repo.url, mode, dataset_or_model['id'])
 		gdf.to_parquet(catalog_path)
 		files_repo.ingest_file(str(catalog_path), f'catalog.v{current_version}.parquet', dataset_or_model['id'], user, mode)
 		data, error = repo.complete_ingestion(dataset_or_model['id'], current_version, total_size, user)
@@ -204,76 +150,35 @@ def ingest(path, repo, retrieve, mode, private, user):
 		return catalog_path
 	
 	# files were already ingested
-	# TODO: check for deleted files (currently only updating existing files and ingesting new ones)
 	# TODO: adding new links in virtual datasets dont trigger new version (but changing README does)
-	new_version = False
-	num_changes = 0
-	total_size = 0
-	for row in tqdm(gdf.iterrows(), total=len(gdf), desc="Ingesting files"):
-		try:
-			item_id = row[1]["id"]
-			# check if item exists in previous versions
-			df = pd.read_parquet(
-				path=catalog_url,
-				filters=[('id', '=', item_id)]
-			)
-			exists = len(df) > 0
-			updated = False
-			assets_count = len(row[1]["assets"])
-			for k, v in row[1]["assets"].items():
-				if not v: continue # skip empty assets
-				if v["href"].startswith("http"): continue
-				if assets_count == 1:
-					file_name = item_id
-				else:
-					file_name = f"{item_id}_{k}"
-				if exists:
-					if df.iloc[0]['assets'][k]["checksum"] == v["checksum"]: # file is the same
-						# still need to update the required fields
-						# file_url = f"{repo.url}{mode}/{dataset_or_model['id']}/stage/{file_name}"
-						file_url = df.iloc[0]['assets'][k]["href"] # keep previous file url to avoid overwriting
-						gdf.loc[row[0], "assets"][k]["href"] = file_url
-						total_size += v["size"]
-						continue
-					else: # file is different, so ingest new version but with a different name
-						file_name = file_name + f"-{random.randint(1, 1000000)}"
-				updated = True
-				new_version = True
-				num_changes += 1
-				# ingest new files
-				data, error = files_repo.ingest_file(
-					v["href"],
-					file_name, # file_name, will be path in local or given id in STAC. if not unique, will overwrite previous file in storage
-					# Path(v["href"]).stat().st_size,
-					dataset_or_model['id'],
-					user,
-					# calculate_checksum(asset["href"]),  # is always absolute?
-					mode,
-					# version,
-				)
-				if error:
-					raise Exception(error)
-				file_url = f"{repo.url}{mode}/{dataset_or_model['id']}/stage/{file_name}"
-				gdf.loc[row[0], "assets"][k]["href"] = file_url
-				total_size += v["size"]
-			# if exists and updated:
-			# 	if assets_count == 1:
-			# 		item_id = file_name
-			# 	else:
-			# 		item_id = item_id + f"-{random.randint(1, 1000000)}"
-			# 	gdf.loc[row[0], "id"] = item_id
-		except Exception as e:
-			print(f"Error uploading asset {row[0]}: {e}")
-			break
-	
-	# check for deleted files
-	df = pd.read_parquet(catalog_url)
-	rows_to_remove = df[~df['id'].isin(gdf['id'])]
-	if len(rows_to_remove) > 0:
-		ids_to_remove = rows_to_remove['id'].values
-		gdf = gdf[~gdf['id'].isin(ids_to_remove)]
-		new_version = True
-		num_changes += len(ids_to_remove)
+	# compare against the previous version, fetched only once
+	previous = pd.read_parquet(catalog_url)
+	diff, deleted_ids = diff_catalogs(gdf, previous)
+	counts = diff["status"].value_counts()
+	print(
+		f"{counts.get('new', 0)} new, {counts.get('changed', 0)} changed, "
+		f"{counts.get('unchanged', 0)} unchanged and {len(deleted_ids)} deleted files"
+	)
+	# keep previous file url of unchanged files to avoid overwriting
+	unchanged = diff[diff["status"] == "unchanged"]
+	for ix, k, href in zip(unchanged["ix"], unchanged["key"], unchanged["previous_href"]):
+		gdf.loc[ix, "assets"][k]["href"] = href
+	total_size = int(unchanged["size"].sum())
+	# ingest new files, changed files are ingested with a different name
+	uploads, targets = [], []
+	for asset in diff[diff["status"] != "unchanged"].to_dict("records"):
+		# file_name will be path in local or given id in STAC. if not unique, will overwrite previous file in storage
+		file_name = asset_file_name(asset["id"], asset["key"], asset["assets_count"])
+		if asset["status"] == "changed":
+			file_name = file_name + f"-{random.randint(1, 1000000)}"
+		uploads.append({"href": asset["href"], "file_name": file_name, "size": asset["size"], "checksum": asset["checksum"]})
+		targets.append((asset["ix"], asset["key"]))
+	results, error = upload_assets(files_repo, uploads, dataset_or_model['id'], user, mode)
+	if error:
+		print(error)
+	total_size += update_asset_hrefs(gdf, uploads, targets, results, repo.url, mode, dataset_or_model['id'])
+	num_changes = len(uploads) + len(deleted_ids)
+	new_version = num_changes > 0
 	
 	if not new_version:
 		print("No new version was created, your dataset has not changed.")
@@ -288,7 +193,59 @@ def ingest(path, repo, retrieve, mode, private, user):
 			raise Exception(error)
 		return catalog_path
 
-def create_stac_item(item_id, asset_href):
+def catalog_assets(df):
+	# one row per asset of each item in the catalog
+	records = [
+		(ix, item_id, k, v["href"], v.get("checksum"), v.get("size"), len(assets))
+		for ix, item_id, assets in zip(df.index, df["id"], df["assets"])
+		for k, v in assets.items() if v # skip empty assets
+	]
+	return pd.DataFrame(records, columns=["ix", "id", "key", "href", "checksum", "size", "assets_count"])
+
+def diff_catalogs(gdf, previous):
+	"""
+	Compares the local catalog with the previous version of the dataset or model.
+
+	Returns the local assets with their `status` (new, changed or unchanged, by id, asset
+	key and checksum, or size if a checksum is missing) and the `previous_href` of the
+	assets that already exist, together with the ids of the items that were deleted.
+	"""
+	local = catalog_assets(gdf)
+	local = local[~local["href"].str.startswith("http")]
+	remote = catalog_assets(previous)[["id", "key", "href", "checksum", "size"]]
+	remote = remote.drop_duplicates(subset=["id", "key"]).rename(
+		columns={"href": "previous_href", "checksum": "previous_checksum", "size": "previous_size"}
+	)
+	diff = local.merge(remote, on=["id", "key"], how="left")
+	diff["status"] = "changed"
+	diff.loc[diff["previous_href"].isna(), "status"] = "new"
+	has_checksums = diff["checksum"].notna() & diff["previous_checksum"].notna()
+	same_checksum = has_checksums & (diff["checksum"] == diff["previous_checksum"])
+	same_size = ~has_checksums & diff["size"].notna() & (diff["size"] == diff["previous_size"])
+	diff.loc[same_checksum | same_size, "status"] = "unchanged"
+	deleted_ids = previous.loc[~previous["id"].isin(gdf["id"]), "id"].tolist()
+	return diff, deleted_ids
+
+def asset_file_name(item_id, asset_key, assets_count):
+	if assets_count == 1:
+		return item_id
+	return f"{item_id}_{asset_key}"
+
+def update_asset_hrefs(gdf, uploads, targets, results, url, mode, dataset_or_model_id):
+	# point uploaded assets to their location in the EOTDL, returns the uploaded size
+	total_size = 0
+	for (ix, k), upload, uploaded in zip(targets, uploads, results):
+		if not uploaded: continue
+		gdf.loc[ix, "assets"][k]["href"] = f"{url}{mode}/{dataset_or_model_id}/stage/{upload['file_name']}"
+		total_size += upload["size"]
+	return total_size
+
+def create_stac_item(item_id, asset_href, checksum=None, size=None):
+	is_local = not asset_href.startswith("http")
+	if is_local and checksum is None:
+		checksum = calculate_checksum(asset_href)
+	if is_local and size is None:
+		size = Path(asset_href).stat().st_size
 	return {
 		'type': 'Feature',
 		'stac_version': '1.0.0',
@@ -304,9 +261,9 @@ def create_stac_item(item_id, asset_href):
 		'geometry': Polygon(), # empty polygon
 		'assets': { 'asset': { # STAC needs this to be a Dict[str, Asset], not list !!! use same key or parquet breaks !!!
 			'href': asset_href,
-			'checksum': calculate_checksum(asset_href) if not asset_href.startswith("http") else None,
+			'checksum': checksum,
 			'timestamp': datetime.now(),
-			'size': Path(asset_href).stat().st_size if not asset_href.startswith("http") else None,
+			'size': size,
 		}},
 		"links": [],
 		# 'collection': 'source',
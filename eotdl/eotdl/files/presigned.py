@@ -0,0 +1,34 @@
+import threading
+
+# files per request to the batch endpoints of the API
+PRESIGNED_URLS_BATCH_SIZE = 1000
+
+
+class PresignedURLs:
+	"""
+	Presigned urls for a list of files, requested to the API in batches the first time
+	a file of the batch is needed. Batches are requested as workers reach them, so urls
+	do not expire before being used. If a batch can not be requested (e.g. the API does
+	not support batches), `get` returns None and each file requests its own url.
+	"""
+
+	def __init__(self, fetch, keys, batch_size=PRESIGNED_URLS_BATCH_SIZE):
+		self.fetch = fetch  # list of keys -> (dict of key: url, error)
+		self.keys = keys
+		self.batch_size = batch_size
+		self.batches = {}
+		self.lock = threading.Lock()
+		self.requests = 0
+
+	def get(self, ix):
+		batch = ix // self.batch_size
+		with self.lock:
+			if batch not in self.batches:
+				keys = self.keys[batch * self.batch_size : (batch + 1) * self.batch_size]
+				try:
+					data, error = self.fetch(keys)
+				except Exception as e:
+					data, error = None, str(e)
+				self.batches[batch] = data if not error and data else {}
+				self.requests += 1
+		return self.batches[batch].get(self.keys[ix])
@@ -0,0 +1,76 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from tqdm import tqdm
+
+from .presigned import PresignedURLs
+
+
+def get_upload_workers(num_uploads):
+	workers = max(1, int(os.getenv("EOTDL_INGEST_WORKERS", "8")))
+	return min(workers, num_uploads or 1)
+
+def upload_assets(files_repo, uploads, dataset_or_model_id, user, mode, logger=print):
+	"""
+	Upload assets to the EOTDL concurrently.
+
+	Each upload is a dict with the local `href`, the `file_name` in storage, its `size` and `checksum`.
+	Presigned urls are requested in batches as workers reach them, so url requests
+	overlap with transfers of other files. Results are returned in the same order as
+	`uploads` (True if the file was uploaded), together with the first error found, if any.
+	After an error no new uploads are started.
+	"""
+	results = [False] * len(uploads)
+	if len(uploads) == 0:
+		return results, None
+	workers = get_upload_workers(len(uploads))
+	error = None
+	uploaded_size = 0
+	t0 = time.time()
+	presigned_urls = PresignedURLs(
+		lambda file_names: files_repo.generate_presigned_put_urls(file_names, dataset_or_model_id, user, mode),
+		[upload["file_name"] for upload in uploads],
+	)
+
+	def upload_asset(ix):
+		upload = uploads[ix]
+		return files_repo.ingest_file(
+			upload["href"],
+			upload["file_name"],
+			dataset_or_model_id,
+			user,
+			mode,
+			checksum=upload.get("checksum"),
+			presigned_url=presigned_urls.get(ix),
+		)
+
+	with ThreadPoolExecutor(max_workers=workers) as executor:
+		futures = {executor.submit(upload_asset, ix): ix for ix in range(len(uploads))}
+		for future in tqdm(
+			as_completed(futures),
+			total=len(futures),
+			desc=f"Ingesting files ({workers} workers)",
+		):
+			ix = futures[future]
+			if future.cancelled():
+				continue
+			try:
+				_, _error = future.result()
+			except Exception as e:
+				_error = str(e)
+			if _error:
+				if error is None:
+					error = f"Error uploading asset {uploads[ix]['href']}: {_error}"
+					for f in futures:
+						f.cancel()
+				continue
+			results[ix] = True
+			uploaded_size += uploads[ix]["size"] or 0
+	elapsed = time.time() - t0
+	num_uploaded = sum(results)
+	logger(
+		f"Uploaded {num_uploaded} files ({uploaded_size / 1024 / 1024:.2f} MB) in {elapsed:.2f}s "
+		f"({num_uploaded / elapsed if elapsed > 0 else 0:.2f} files/s, "
+		f"{uploaded_size / 1024 / 1024 / elapsed if elapsed > 0 else 0:.2f} MB/s)"
+	)
+	return results, error
@@ -23,6 +23,7 @@ def ingest_model(
 	force_metadata_update=False,
 	sync_metadata=False,
 	private=False,
+	raster_metadata=False,
 ):
 	path = Path(path)
 	if not path.is_dir():
@@ -30,7 +31,7 @@ def ingest_model(
 	if "catalog.json" in [f.name for f in path.iterdir()]:
 		prep_ingest_stac(path, logger)
 	else:
-		prep_ingest_folder(path, verbose, logger, force_metadata_update, sync_metadata)
+		prep_ingest_folder(path, verbose, logger, force_metadata_update, sync_metadata, raster_metadata)
 	return ingest(path, ModelsAPIRepo(), retrieve_model, 'models', private)
 
 def ingest_virtual_model( # could work for a list of paths with minimal changes...
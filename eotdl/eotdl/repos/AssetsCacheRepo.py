@@ -0,0 +1,112 @@
+from pathlib import Path
+import os
+import re
+import shutil
+import threading
+import uuid
+
+# sha1 checksums, stored in folders named after their first two characters
+CHECKSUM_PATTERN = re.compile(r"[0-9a-f]{40}")
+
+
+class AssetsCacheRepo:
+    """
+    Local cache of staged assets addressed by their checksum, shared by all the datasets
+    and versions so identical files are downloaded once. Files are copied in and out of
+    the cache, so editing a staged file never changes the cached one, and the least
+    recently used files are evicted when the cache exceeds its size limit. Only files
+    named after a checksum are counted and evicted, other files in the folder are left
+    untouched.
+    """
+
+    def __init__(self, base_path=None, max_size=None):
+        # a folder of its own, EOTDL_CACHE_PATH may contain files of the user
+        self.base_path = base_path or os.path.join(
+            os.getenv("EOTDL_CACHE_PATH", str(Path.home()) + "/.cache/eotdl"), "assets"
+        )
+        self.max_size = (
+            max_size
+            if max_size is not None
+            else int(os.getenv("EOTDL_CACHE_SIZE", str(50 * 1024 * 1024 * 1024)))
+        )
+        os.makedirs(self.base_path, exist_ok=True)
+        self.lock = threading.Lock()
+        self.size = sum(size for _, size, _ in self.entries())
+        self.hits, self.misses, self.bytes_reused = 0, 0, 0
+
+    def get_path(self, checksum):
+        return os.path.join(self.base_path, checksum[:2], checksum)
+
+    def entries(self):
+        for folder in os.scandir(self.base_path):
+            if len(folder.name) != 2 or not folder.is_dir(follow_symlinks=False):
+                continue
+            for entry in os.scandir(folder.path):
+                if (
+                    CHECKSUM_PATTERN.fullmatch(entry.name)
+                    and entry.name.startswith(folder.name)
+                    and entry.is_file(follow_symlinks=False)
+                ):
+                    stat = entry.stat()
+                    yield entry.path, stat.st_size, stat.st_mtime
+
+    def copy(self, src, dst):
+        # copy to a temporary name first, so dst is replaced atomically
+        tmp_path = f"{dst}.{uuid.uuid4().hex}.tmp"
+        try:
+            shutil.copyfile(src, tmp_path)
+            os.replace(tmp_path, dst)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def materialize(self, checksum, file_path):
+        """
+        Places the cached file with the checksum at file_path. Returns False on a cache miss.
+        """
+        cache_path = self.get_path(checksum)
+        try:
+            self.copy(cache_path, file_path)
+            os.utime(cache_path)  # mtime tracks the last use, for the LRU eviction
+        except FileNotFoundError:
+            with self.lock:
+                self.misses += 1
+            return False
+        with self.lock:
+            self.hits += 1
+            self.bytes_reused += os.path.getsize(file_path)
+        return True
+
+    def put(self, checksum, file_path):
+        cache_path = self.get_path(checksum)
+        if os.path.exists(cache_path):
+            return cache_path
+        size = os.path.getsize(file_path)
+        if size > self.max_size:
+            return None
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        self.copy(file_path, cache_path)
+        with self.lock:
+            self.size += size
+            if self.size > self.max_size:
+                self.evict()
+        return cache_path
+
+    def evict(self):
+        # remove the least recently used files until the cache fits in its size limit
+        for path, size, _ in sorted(self.entries(), key=lambda entry: entry[2]):
+            if self.size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+                self.size -= size
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes_reused": self.bytes_reused,
+            "size": self.size,
+        }
@@ -1,6 +1,7 @@
 from pathlib import Path
 import os
 import json
+import time
 import jwt
 
 
@@ -26,9 +27,24 @@ class AuthRepo:
                 "EOTDL_API_KEY", None
             ):
                 return None
+            # the API rejects expired tokens, so they are not used to login
+            if "id_token" in creds and self.is_expired(creds["id_token"]):
+                return None
             return creds
         return None
 
+    def is_expired(self, id_token, margin=60):
+        try:
+            exp = jwt.decode(
+                id_token,
+                algorithms=self.algorithms,
+                options={"verify_signature": False},
+            ).get("exp")
+        except jwt.InvalidTokenError:
+            return True
+        # tokens about to expire would fail in the middle of long operations
+        return exp is not None and exp < time.time() + margin
+
     def decode_token(self, token_data):
         return jwt.decode(
             token_data["id_token"],
@@ -1,47 +1,83 @@
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 import requests
+import hashlib
+import math
 import os
+import uuid
 
-from ..repos import APIRepo
+from ..repos import APIRepo, UploadsRepo
+from ..shared import calculate_checksum
 
 
 class FilesAPIRepo(APIRepo):
+    # endpoints that accept multipart uploads for large files
+    multipart_endpoints = ("datasets", "models")
+
     def __init__(self, url=None):
         super().__init__(url)
+        # files larger than this are uploaded in parts
+        self.multipart_threshold = int(
+            os.getenv("EOTDL_MULTIPART_THRESHOLD", str(1024 * 1024 * 1024))
+        )
+        self.chunk_size = int(os.getenv("EOTDL_CHUNK_SIZE", str(64 * 1024 * 1024)))
+        # staging threads share a session, reusing connections instead of a new TLS handshake per file
+        self.session = requests.Session()
+        pool_size = max(10, int(os.getenv("EOTDL_STAGE_WORKERS", "8")))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
     def ingest_file(
-        self, file_path_or_bytes, file_name, dataset_or_model_id, user, endpoint, version=None
+        self,
+        file_path_or_bytes,
+        file_name,
+        dataset_or_model_id,
+        user,
+        endpoint,
+        version=None,
+        checksum=None,
+        presigned_url=None,
     ):
-        url = self.url + f"{endpoint}/{dataset_or_model_id}"
-        if version is not None:
-            url += "?version=" + str(version)
-        # get a presigned url to upload the file directly to the bucket
-        reponse = requests.post(
-            url,
-            json={
-                "file_name": file_name,
-                # "file_size": files_size,
-                # "checksum": checksum
-            },
-            headers=self.generate_headers(user),
-        )
-        data, error = self.format_response(reponse)
-        if error:
-            raise Exception(error)
+        if isinstance(file_path_or_bytes, str) and endpoint in self.multipart_endpoints:
+            file_size = os.path.getsize(file_path_or_bytes)
+            if file_size > self.multipart_threshold:
+                return self.ingest_large_file(
+                    file_path_or_bytes, file_size, file_name, dataset_or_model_id, user, endpoint, checksum
+                )
+        if presigned_url is not None:  # requested in a batch
+            data = {"presigned_url": presigned_url}
+        else:
+            url = self.url + f"{endpoint}/{dataset_or_model_id}"
+            if version is not None:
+                url += "?version=" + str(version)
+            # get a presigned url to upload the file directly to the bucket
+            reponse = requests.post(
+                url,
+                json={
+                    "file_name": file_name,
+                    # "file_size": files_size,
+                    # "checksum": checksum
+                },
+                headers=self.generate_headers(user),
+            )
+            data, error = self.format_response(reponse)
+            if error:
+                raise Exception(error)
         # ingest the file
         error = None
         try:
             presigned_url = data["presigned_url"]
-            if isinstance(file_path_or_bytes, (str, bytes)):
-                if isinstance(file_path_or_bytes, str):
-                    # Handle file path
-                    with open(file_path_or_bytes, 'rb') as f:
-                        file_data = f.read()
-                else:
-                    # Handle bytes directly
-                    file_data = file_path_or_bytes
-                # Send file data to presigned URL
-                response = requests.put(presigned_url, data=file_data)
+            if isinstance(file_path_or_bytes, str):
+                # Handle file path, streaming the file instead of loading it in memory
+                with open(file_path_or_bytes, 'rb') as f:
+                    # empty files would be sent with chunked encoding, not supported by presigned urls
+                    file_data = f if os.fstat(f.fileno()).st_size > 0 else b""
+                    response = requests.put(presigned_url, data=file_data)
+                response.raise_for_status()
+            elif isinstance(file_path_or_bytes, bytes):
+                # Send bytes directly to presigned URL
+                response = requests.put(presigned_url, data=file_path_or_bytes)
                 response.raise_for_status()
             else:
                 raise TypeError("file_path_or_bytes must be either a file path string or bytes")
@@ -49,6 +85,123 @@ class FilesAPIRepo(APIRepo):
             error = str(e)
         return data, error
 
+    def generate_presigned_put_urls(self, file_names, dataset_or_model_id, user, endpoint):
+        response = self.session.post(
+            self.url + f"{endpoint}/{dataset_or_model_id}/batch",
+            json={"file_names": list(file_names)},
+            headers=self.generate_headers(user),
+        )
+        data, error = self.format_response(response)
+        return (data["presigned_urls"], None) if not error else (None, error)
+
+    def get_chunk_size(self, file_size):
+        # S3 allows at most 10000 parts of at least 5 MB
+        return max(self.chunk_size, 5 * 1024 * 1024, math.ceil(file_size / 10000))
+
+    def ingest_large_file(
+        self, file_path, file_size, file_name, dataset_or_model_id, user, endpoint, checksum=None
+    ):
+        if checksum is None:
+            checksum = calculate_checksum(file_path)
+        uploads_repo = UploadsRepo()
+        error = None
+        try:
+            # progress of previous attempts of the same upload
+            progress = uploads_repo.load_upload(dataset_or_model_id, file_name, checksum)
+            if progress is None or progress["file_size"] != file_size:
+                progress = {"upload_id": None, "chunk_size": self.get_chunk_size(file_size)}
+            upload_id, parts, chunk_size = self.prepare_large_upload(
+                file_name, dataset_or_model_id, checksum, user, endpoint, progress["chunk_size"]
+            )
+            # the parts in the server can only be resumed with the size they were uploaded with,
+            # which older servers do not store: trust them only if this client started the upload
+            if chunk_size is None:
+                chunk_size = progress["chunk_size"]
+                if progress["upload_id"] != upload_id:
+                    parts = []
+            uploads_repo.save_upload(
+                dataset_or_model_id,
+                file_name,
+                checksum,
+                {"upload_id": upload_id, "file_size": file_size, "chunk_size": chunk_size},
+            )
+            num_parts = math.ceil(file_size / chunk_size)
+            # only upload the parts missing in the server
+            missing_parts = [p for p in range(1, num_parts + 1) if p not in parts]
+            workers = max(1, int(os.getenv("EOTDL_UPLOAD_PART_WORKERS", "4")))
+            workers = min(workers, len(missing_parts) or 1)
+            # each worker keeps one chunk in memory at a time
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        self.ingest_file_part,
+                        file_path,
+                        part_number,
+                        chunk_size,
+                        upload_id,
+                        user,
+                        endpoint,
+                    )
+                    for part_number in missing_parts
+                ]
+                for future in as_completed(futures):
+                    future.result()
+            data, error = self.complete_upload(upload_id, user, endpoint)
+            if not error:
+                uploads_repo.delete_upload(dataset_or_model_id, file_name, checksum)
+        except Exception as e:
+            data, error = None, str(e)
+        return data, error
+
+    def ingest_file_part(self, file_path, part_number, chunk_size, upload_id, user, endpoint, retries=3):
+        with open(file_path, "rb") as f:
+            f.seek((part_number - 1) * chunk_size)
+            chunk = f.read(chunk_size)
+        checksum = hashlib.md5(chunk).hexdigest()
+        # the server checks the checksum of the stored part, retry if it does not match
+        for attempt in range(retries):
+            try:
+                return self.ingest_file_chunk(chunk, part_number, upload_id, user, endpoint, checksum)
+            except Exception as e:
+                if attempt == retries - 1:
+                    raise Exception(f"Error uploading part {part_number}: {e}")
+
+    def prepare_large_upload(self, file_name, dataset_or_model_id, checksum, user, endpoint, chunk_size=None):
+        response = requests.post(
+            self.url + f"{endpoint}/{dataset_or_model_id}/uploadId",
+            json={"filname": file_name, "checksum": checksum, "chunk_size": chunk_size},
+            headers=self.generate_headers(user),
+        )
+        data, error = self.format_response(response)
+        if error:
+            raise Exception(error)
+        # the size of the parts of the upload, if the server stores it
+        return data["upload_id"], data["parts"], data.get("chunk_size")
+
+    def ingest_file_chunk(self, chunk, part_number, upload_id, user, endpoint, checksum=None):
+        if checksum is None:
+            checksum = hashlib.md5(chunk).hexdigest()
+        response = requests.post(
+            self.url + f"{endpoint}/chunk/{upload_id}",
+            files={"file": chunk},
+            data={
+                "part_number": part_number,
+                "checksum": checksum,
+            },
+            headers=self.generate_headers(user),
+        )
+        data, error = self.format_response(response)
+        if error:
+            raise Exception(error)
+        return data
+
+    def complete_upload(self, upload_id, user, endpoint):
+        response = requests.post(
+            self.url + f"{endpoint}/complete_upload/{upload_id}",
+            headers=self.generate_headers(user),
+        )
+        return self.format_response(response)
+
     def stage_file(
         self,
         dataset_or_model_id,
@@ -63,17 +216,31 @@ class FilesAPIRepo(APIRepo):
         #     url += "?version=" + str(file_version)
         return self.stage_file_url(url, path, user)
 
+    def parse_file_url(self, url):
+        if '/stage/' in url:  # asset is in EOTDL (can do better...)
+            splitted = url.split("/stage/")
+        else:
+            splitted = url.split("//")
+        file_name = splitted[-1]
+        dataset_or_model_id = splitted[0].split("/")[-1]
+        return dataset_or_model_id, file_name
+
+    def get_file_path(self, url, path):
+        return f"{path}/{self.parse_file_url(url)[1]}"
+
     def stage_file_url(
         self,
         url,
         path,
         user,
+        resume=False,
+        presigned_url=None,
     ):
-        if '/stage/' in url:  # asset is in EOTDL (can do better...)
-            splitted = url.split("/stage/")
-            file_name = splitted[-1]
-            dataset_or_model_id = splitted[0].split("/")[-1]
-            response = requests.get(url, headers=self.generate_headers(user))  # fixed typo
+        _, file_name = self.parse_file_url(url)
+        if presigned_url is not None:  # requested in a batch
+            pass
+        elif '/stage/' in url:  # asset is in EOTDL (can do better...)
+            response = self.session.get(url, headers=self.generate_headers(user))  # fixed typo
             #print(url)
             data, error = self.format_response(response)
             #print(data)
@@ -81,42 +248,69 @@ class FilesAPIRepo(APIRepo):
                 raise Exception(error)
             presigned_url = data["presigned_url"]
         else:
-            splitted = url.split("//")
-            file_name = splitted[-1]
-            dataset_or_model_id = splitted[0].split("/")[-1]
             presigned_url = url
 
         file_path = f"{path}/{file_name}"
-        for i in range(1, len(file_path.split("/")) - 1):
-            os.makedirs("/".join(file_path.split("/")[: i + 1]), exist_ok=True)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
         try:
-            symbolic_link = False
-            cache_base_path = os.getenv("EOTDL_CACHE_PATH", "")
-            if cache_base_path:
-                cache_path = Path(f"{cache_base_path}/{dataset_or_model_id}/{file_name}")
-                #print(cache_path)
-                if cache_path.exists():
-                    symbolic_link = True
-                    #print(f"Using cache: {cache_path}")
-
-            if symbolic_link:
-                if os.path.exists(file_path):
-                    os.unlink(file_path)
-                os.symlink(cache_path, file_path)
-                #print(f"Symlinked {file_path} → {cache_path}")
-            else:
-                response = requests.get(presigned_url)
-                response.raise_for_status()  # This will raise an HTTPError for 4XX and 5XX status codes
-                with open(file_path, 'wb') as f:
-                    f.write(response.content)
-                #print(f"Downloaded to: {file_path}")
+            self.download_file(presigned_url, file_path, resume=resume)
+            #print(f"Downloaded to: {file_path}")
         except requests.exceptions.HTTPError as e:
             raise Exception(f"Failed to stage file: {str(e)}")
         except Exception as e:
             raise Exception(f"Unexpected error while staging file: {str(e)}")
         return file_path
     
+    def download_file(self, url, file_path, chunk_size=1024 * 1024, resume=False):
+        # stream to a temporary file and rename it when complete, so a partial
+        # download never looks like a staged file. When resuming, the partial file
+        # is kept on errors and the download continues from where it stopped.
+        tmp_path = f"{file_path}.part" if resume else f"{file_path}.{uuid.uuid4().hex}.part"
+        offset = os.path.getsize(tmp_path) if resume and os.path.exists(tmp_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            with self.session.get(url, stream=True, headers=headers) as response:
+                if response.status_code == 416:  # partial file is already complete
+                    response.close()
+                else:
+                    response.raise_for_status()  # This will raise an HTTPError for 4XX and 5XX status codes
+                    # servers that ignore the range send the whole file again
+                    mode = "ab" if response.status_code == 206 else "wb"
+                    with open(tmp_path, mode) as f:
+                        for chunk in response.iter_content(chunk_size=chunk_size):
+                            f.write(chunk)
+            os.replace(tmp_path, file_path)
+        finally:
+            if not resume and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return file_path
+
+    def generate_presigned_urls(self, urls, user):
+        """
+        Presigned urls for a list of asset urls, with one request for each dataset or model
+        in the list. Assets that are not in EOTDL are returned as they are.
+        """
+        groups = {}
+        for url in urls:
+            if '/stage/' in url:
+                base_url, file_name = url.split("/stage/", 1)
+                groups.setdefault(base_url, []).append((url, file_name))
+        presigned_urls = {url: url for url in urls if '/stage/' not in url}
+        for base_url, files in groups.items():
+            response = self.session.post(
+                base_url + "/stage",
+                json={"filenames": [file_name for _, file_name in files]},
+                headers=self.generate_headers(user),
+            )
+            data, error = self.format_response(response)
+            if error:
+                return None, error
+            # files that do not exist have no url, staging them reports the error
+            for url, file_name in files:
+                presigned_urls[url] = data["presigned_urls"].get(file_name)
+        return presigned_urls, None
+
     def generate_presigned_url(self, filename, dataset_or_model_id, user, endpoint="datasets"):
         url = f"{self.url}{endpoint}/{dataset_or_model_id}/stage/{filename}"
         reponse = requests.get(url, headers=self.generate_headers(user))
@@ -12,27 +12,72 @@ class STACAPIRepo(APIRepo):
         return self.format_response(response)
     
     def collections(self):
-        response = requests.get(self.url + "stac/collections")
-        return self.format_response(response)
+        # collections are paginated, follow the next links to retrieve all of them
+        url = self.url + "stac/collections"
+        data = None
+        while url:
+            response = requests.get(url)
+            page, error = self.format_response(response)
+            if error:
+                return None, error
+            if data is None:
+                data = page
+            else:
+                data["collections"] += page["collections"]
+                data["links"] += [link for link in page["links"] if link["rel"] == "child"]
+            next_links = [link["href"] for link in page.get("links", []) if link["rel"] == "next"]
+            url = next_links[0] if next_links else None
+        data["links"] = [link for link in data.get("links", []) if link["rel"] != "next"]
+        return data, None
 
     def collection(self, collection_name):
         response = requests.get(self.url + f"stac/collections/{collection_name}")
         return self.format_response(response)
 
     def items(self, collection_id):
-        response = requests.get(self.url + f"stac/collections/{collection_id}/items")
-        return self.format_response(response)
+        # items are paginated, follow the next links to retrieve all of them
+        url = self.url + f"stac/collections/{collection_id}/items"
+        data = None
+        while url:
+            response = requests.get(url)
+            page, error = self.format_response(response)
+            if error:
+                return None, error
+            if data is None:
+                data = page
+            else:
+                data["features"] += page["features"]
+            next_links = [link["href"] for link in page.get("links", []) if link["rel"] == "next"]
+            url = next_links[0] if next_links else None
+        data["numberReturned"] = len(data["features"])
+        data["links"] = [link for link in data.get("links", []) if link["rel"] != "next"]
+        return data, None
 
     def item(self, collection_id, item_id):
         response = requests.get(self.url + f"stac/collections/{collection_id}/items/{item_id}")
         return self.format_response(response)
     
-    def search(self, collection_id, query):
-        body = {"collection_id": collection_id}
-        if query is not None:
-            body["query"] = query
-        response = requests.post(self.url + f"stac/search", json=body)
-        return self.format_response(response)
+    def search(self, collection_id, query=None, bbox=None, datetime=None, limit=None):
+        # STAC item search, query is a CQL2-JSON filter. Follows the next links
+        body = {"collections": [collection_id]}
+        for key, value in [("filter", query), ("bbox", bbox), ("datetime", datetime), ("limit", limit)]:
+            if value is not None:
+                body[key] = value
+        data = None
+        while body:
+            response = requests.post(self.url + "stac/search", json=body)
+            page, error = self.format_response(response)
+            if error:
+                return None, error
+            if data is None:
+                data = page
+            else:
+                data["features"] += page["features"]
+            next_links = [link for link in page.get("links", []) if link["rel"] == "next"]
+            body = next_links[0]["body"] if next_links else None
+        data["numberReturned"] = len(data["features"])
+        data["links"] = [link for link in data.get("links", []) if link["rel"] != "next"]
+        return data, None
     
     def search_columns(self, collection_id):
         response = requests.get(self.url + f"stac/search?collection={collection_id}")
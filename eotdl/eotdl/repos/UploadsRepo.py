@@ -0,0 +1,37 @@
+from pathlib import Path
+import hashlib
+import json
+import os
+
+
+class UploadsRepo:
+    def __init__(self):
+        self.base_path = str(Path.home()) + "/.cache/eotdl/uploads/"
+        os.makedirs(self.base_path, exist_ok=True)
+
+    def get_upload_path(self, dataset_or_model_id, file_name, checksum):
+        key = f"{dataset_or_model_id}/{file_name}/{checksum}"
+        return self.base_path + hashlib.sha1(key.encode()).hexdigest() + ".json"
+
+    def load_upload(self, dataset_or_model_id, file_name, checksum):
+        path = self.get_upload_path(dataset_or_model_id, file_name, checksum)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except json.JSONDecodeError:  # interrupted while saving
+            return None
+
+    def save_upload(self, dataset_or_model_id, file_name, checksum, data):
+        path = self.get_upload_path(dataset_or_model_id, file_name, checksum)
+        # write to a temporary file first so an interruption never corrupts the progress
+        with open(path + ".tmp", "w") as f:
+            json.dump(data, f)
+        os.replace(path + ".tmp", path)
+        return path
+
+    def delete_upload(self, dataset_or_model_id, file_name, checksum):
+        path = self.get_upload_path(dataset_or_model_id, file_name, checksum)
+        if os.path.exists(path):
+            os.remove(path)
@@ -1,4 +1,6 @@
 from .AuthRepo import AuthRepo
+from .UploadsRepo import UploadsRepo
+from .AssetsCacheRepo import AssetsCacheRepo
 from .APIRepo import APIRepo
 from .AuthAPIRepo import AuthAPIRepo
 from .DatasetsAPIRepo import DatasetsAPIRepo
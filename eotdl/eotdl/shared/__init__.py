@@ -1 +1 @@
-from .checksum import calculate_checksum
+from .checksum import calculate_checksum, ChecksumCache
\ No newline at end of file
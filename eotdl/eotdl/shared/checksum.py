@@ -1,4 +1,11 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 import hashlib
+import json
+import os
+import pyarrow as pa
+import pyarrow.parquet as pq
+from tqdm import tqdm
 
 
 # def calculate_checksum(file_path):
@@ -9,9 +16,108 @@ import hashlib
 #     return hasher.hexdigest()
 
 
-def calculate_checksum(file_path):
-    sha1_hash = hashlib.sha1()
-    with open(file_path, "rb") as file:
-        for chunk in iter(lambda: file.read(4096), b""):
-            sha1_hash.update(chunk)
+def calculate_checksum(file_path, buffer_size=1024 * 1024):
+    with open(file_path, "rb", buffering=0) as file:
+        # small files are read at once, avoiding the buffer allocation
+        if os.fstat(file.fileno()).st_size <= buffer_size:
+            return hashlib.sha1(file.read()).hexdigest()
+        sha1_hash = hashlib.sha1()
+        buffer = bytearray(buffer_size)
+        view = memoryview(buffer)
+        while n := file.readinto(buffer):
+            sha1_hash.update(view[:n])
     return sha1_hash.hexdigest()
+
+
+class ChecksumCache:
+    """
+    Checksums of local files, stored next to the catalog so that files that did not
+    change since the last ingestion are not hashed again. Entries are invalidated
+    when the size, modification time or inode of a file changes. Other metadata
+    extracted from the files (e.g. raster footprints) can be cached with the checksum.
+    """
+
+    file_name = ".checksums.parquet"  # hidden, so it is not ingested as an asset
+
+    def __init__(self, folder):
+        self.path = Path(folder) / self.file_name
+        self.entries = self.load()
+        self.hits, self.misses = 0, 0
+        self.seen = set()
+
+    def load(self):
+        if not self.path.exists():
+            return {}
+        try:
+            data = pq.read_table(self.path).to_pydict()
+        except Exception:  # corrupted cache, will be rebuilt
+            return {}
+        metadata = data.get("metadata", [None] * len(data["path"]))
+        return {
+            path: entry
+            for path, *entry in zip(
+                data["path"], data["size"], data["mtime"], data["inode"], data["checksum"], metadata
+            )
+        }
+
+    def save(self):
+        # only keep the files checked in this ingestion, removed files are dropped
+        paths = [p for p in self.entries if p in self.seen]
+        values = [self.entries[p] for p in paths]
+        size, mtime, inode, checksum, metadata = zip(*values) if values else ([], [], [], [], [])
+        table = pa.table(
+            {
+                "path": pa.array(paths, pa.string()),
+                "size": pa.array(size, pa.int64()),
+                "mtime": pa.array(mtime, pa.int64()),
+                "inode": pa.array(inode, pa.uint64()),
+                "checksum": pa.array(checksum, pa.string()),
+                "metadata": pa.array(metadata, pa.string()),
+            }
+        )
+        pq.write_table(table, self.path)
+        return self.path
+
+    def checksums(self, file_paths, workers=None, progress=True):
+        """
+        Returns a dict with the (checksum, size) of each file, hashing in parallel only
+        the files that are not in the cache. Hashing releases the GIL, so threads use all cores.
+        """
+        results, missing = {}, []
+        for file_path in file_paths:
+            file_path = str(file_path)
+            self.seen.add(file_path)
+            stat = os.stat(file_path)
+            key = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+            entry = self.entries.get(file_path)
+            if entry and tuple(entry[:3]) == key:
+                results[file_path] = (entry[3], stat.st_size)
+                self.hits += 1
+            else:
+                missing.append((file_path, key))
+        self.misses += len(missing)
+        if missing:
+            workers = workers or int(os.getenv("EOTDL_HASH_WORKERS", str(os.cpu_count() or 1)))
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                checksums = executor.map(calculate_checksum, [p for p, _ in missing])
+                for (file_path, key), checksum in tqdm(
+                    zip(missing, checksums),
+                    total=len(missing),
+                    desc="Computing checksums",
+                    disable=not progress,
+                ):
+                    self.entries[file_path] = (*key, checksum, None)
+                    results[file_path] = (checksum, key[0])
+        return results
+
+    def has_metadata(self, file_path):
+        # only valid after computing the checksums, that invalidate changed files
+        entry = self.entries.get(str(file_path))
+        return entry is not None and entry[4] is not None
+
+    def get_metadata(self, file_path):
+        return json.loads(self.entries[str(file_path)][4])
+
+    def set_metadata(self, file_path, metadata):
+        entry = self.entries[str(file_path)]
+        self.entries[str(file_path)] = (*entry[:4], json.dumps(metadata))
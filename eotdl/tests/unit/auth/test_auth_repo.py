@@ -0,0 +1,34 @@
+import time
+
+import jwt
+
+from eotdl.repos import AuthRepo
+
+
+def id_token(exp):
+    return jwt.encode({"sub": "test", "exp": int(time.time()) + exp}, "secret" * 8, algorithm="HS256")
+
+
+def test_valid_credentials_are_loaded(monkeypatch, tmp_path):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    repo = AuthRepo()
+    repo.save_creds({"id_token": id_token(3600), "email": "test", "uid": "test"})
+    assert repo.load_creds()["uid"] == "test"
+
+
+def test_expired_credentials_are_not_loaded(monkeypatch, tmp_path):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    repo = AuthRepo()
+    repo.save_creds({"id_token": id_token(-60), "email": "test", "uid": "test"})
+    assert repo.load_creds() is None
+    # about to expire
+    repo.save_creds({"id_token": id_token(30), "email": "test", "uid": "test"})
+    assert repo.load_creds() is None
+
+
+def test_api_keys_do_not_expire(monkeypatch, tmp_path):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("EOTDL_API_KEY", "key")
+    repo = AuthRepo()
+    repo.save_creds({"api_key": "key", "email": "test", "uid": "test"})
+    assert repo.load_creds()["api_key"] == "key"
@@ -0,0 +1,95 @@
+import hashlib
+import os
+
+from eotdl.datasets.stage import stage_asset
+from eotdl.repos import AssetsCacheRepo
+
+
+def checksum(content):
+    return hashlib.sha1(content).hexdigest()
+
+
+class FakeFilesAPIRepo:
+    def __init__(self, content):
+        self.content = content
+        self.downloads = 0
+
+    def get_file_path(self, url, path):
+        return f"{path}/{url.split('//')[-1]}"
+
+    def stage_file_url(self, url, path, user, resume=False, presigned_url=None):
+        self.downloads += 1
+        file_path = self.get_file_path(url, path)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "wb") as f:
+            f.write(self.content)
+        return file_path
+
+
+def test_staged_assets_are_reused_across_versions(tmp_path):
+    cache = AssetsCacheRepo(str(tmp_path / "cache"), max_size=1024)
+    repo = FakeFilesAPIRepo(b"image")
+    asset = {"href": "https://example.com/dataset//images/image.tif", "checksum": checksum(b"image")}
+
+    stage_asset(repo, asset, str(tmp_path / "v1"), {}, cache=cache)
+    file_path = stage_asset(repo, asset, str(tmp_path / "v2"), {}, cache=cache)
+
+    assert repo.downloads == 1
+    assert file_path == f"{tmp_path}/v2/images/image.tif"
+    with open(file_path, "rb") as f:
+        assert f.read() == b"image"
+    assert cache.hits == 1 and cache.misses == 1 and cache.bytes_reused == 5
+
+
+def test_least_recently_used_assets_are_evicted(tmp_path):
+    cache = AssetsCacheRepo(str(tmp_path / "cache"), max_size=10)
+    for i, name in enumerate(["a", "b", "c"]):
+        file_path = tmp_path / name
+        file_path.write_bytes(name.encode() * 4)
+        cache.put(checksum(name.encode() * 4), str(file_path))
+        os.utime(cache.get_path(checksum(name.encode() * 4)), (i, i))
+        if name == "b":
+            # "a" is used after "b", so "b" is evicted first
+            cache.materialize(checksum(b"aaaa"), str(tmp_path / "a-copy"))
+            os.utime(cache.get_path(checksum(b"aaaa")), (10, 10))
+
+    assert cache.size == 8
+    assert os.path.exists(cache.get_path(checksum(b"aaaa")))
+    assert not os.path.exists(cache.get_path(checksum(b"bbbb")))
+    assert os.path.exists(cache.get_path(checksum(b"cccc")))
+
+
+def test_editing_a_staged_asset_does_not_change_the_cache(tmp_path):
+    cache = AssetsCacheRepo(str(tmp_path / "cache"), max_size=1024)
+    repo = FakeFilesAPIRepo(b"image")
+    asset = {"href": "https://example.com/dataset//image.tif", "checksum": checksum(b"image")}
+
+    v1 = stage_asset(repo, asset, str(tmp_path / "v1"), {}, cache=cache)
+    with open(v1, "r+b") as f:
+        f.write(b"edit!")
+    v2 = stage_asset(repo, asset, str(tmp_path / "v2"), {}, cache=cache)
+
+    with open(v2, "rb") as f:
+        assert f.read() == b"image"
+
+
+def test_other_files_in_the_cache_path_are_not_evicted(tmp_path, monkeypatch):
+    monkeypatch.setenv("EOTDL_CACHE_PATH", str(tmp_path))
+    # files staged by the user in the cache folder before it held the assets
+    (tmp_path / "dataset").mkdir()
+    (tmp_path / "dataset" / "file.tif").write_bytes(b"x" * 100)
+    # only files named after their checksum are assets
+    (tmp_path / "assets" / "ab").mkdir(parents=True)
+    (tmp_path / "assets" / "ab" / "notes.txt").write_bytes(b"x" * 100)
+
+    cache = AssetsCacheRepo(max_size=10)
+    assert cache.base_path == str(tmp_path / "assets")
+    assert cache.size == 0
+    file_path = tmp_path / "new"
+    file_path.write_bytes(b"x" * 8)
+    cache.put(checksum(b"x" * 8), str(file_path))
+    cache.evict()
+
+    assert (tmp_path / "dataset" / "file.tif").exists()
+    assert (tmp_path / "assets" / "ab" / "notes.txt").exists()
+    assert cache.size == 8
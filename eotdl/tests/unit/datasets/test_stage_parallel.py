@@ -45,7 +45,7 @@ def test_stage_dataset_downloads_all_assets_in_parallel_path(monkeypatch, tmp_pa
             catalog_path.write_bytes(b"catalog")
             return str(catalog_path)
 
-        def stage_file_url(self, url, path, user):
+        def stage_file_url(self, url, path, user, resume=False, presigned_url=None):
             staged_urls.append(url)
             return str(tmp_path / "downloaded-file")
 
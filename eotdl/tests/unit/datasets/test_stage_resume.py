@@ -0,0 +1,23 @@
+import hashlib
+
+from eotdl.datasets.stage import missing_assets
+from eotdl.repos import FilesAPIRepo
+
+
+def test_missing_assets_skips_staged_files(tmp_path):
+    (tmp_path / "ok.tif").write_bytes(b"ok")
+    (tmp_path / "corrupted.tif").write_bytes(b"xx")
+    (tmp_path / "truncated.tif").write_bytes(b"t")
+    (tmp_path / "external.tif").write_bytes(b"external")
+    catalog_assets = [
+        {"href": "https://api/datasets/id/stage/ok.tif", "checksum": hashlib.sha1(b"ok").hexdigest(), "size": 2},
+        {"href": "https://api/datasets/id/stage/corrupted.tif", "checksum": hashlib.sha1(b"ok").hexdigest(), "size": 2},
+        {"href": "https://api/datasets/id/stage/truncated.tif", "checksum": hashlib.sha1(b"tt").hexdigest(), "size": 2},
+        {"href": "https://api/datasets/id/stage/missing.tif", "checksum": hashlib.sha1(b"m").hexdigest(), "size": 1},
+        # assets without checksum (e.g. virtual datasets) are staged if the file exists
+        {"href": "https://example.com/data//external.tif", "checksum": None, "size": None},
+    ]
+
+    missing = missing_assets(FilesAPIRepo("http://api/"), catalog_assets, str(tmp_path), logger=lambda _: None)
+
+    assert [asset["href"].split("/")[-1] for asset in missing] == ["corrupted.tif", "truncated.tif", "missing.tif"]
@@ -0,0 +1,76 @@
+import hashlib
+
+import geopandas as gpd
+
+from eotdl.files.catalog import scan_files, write_folder_catalog
+
+
+def test_scan_files_skips_hidden_and_excluded_files(tmp_path):
+    (tmp_path / "sub" / ".hidden").mkdir(parents=True)
+    (tmp_path / "a.txt").write_text("a")
+    (tmp_path / "sub" / "b.txt").write_text("b")
+    (tmp_path / "sub" / ".hidden" / "c.txt").write_text("c")
+    (tmp_path / ".d.txt").write_text("d")
+    (tmp_path / "catalog.parquet").write_text("")
+
+    files = scan_files(tmp_path, exclude=(str(tmp_path / "catalog.parquet"),))
+
+    assert sorted(files) == [str(tmp_path / "a.txt"), str(tmp_path / "sub" / "b.txt")]
+
+
+def test_scan_files_follows_symlinks_without_loops(tmp_path):
+    (tmp_path / "data" / "sub").mkdir(parents=True)
+    (tmp_path / "data" / "sub" / "a.txt").write_text("a")
+    (tmp_path / "data" / "sub" / "parent").symlink_to(tmp_path / "data")
+    (tmp_path / "folder").mkdir()
+    (tmp_path / "folder" / "linked").symlink_to(tmp_path / "data" / "sub")
+
+    files = scan_files(tmp_path / "folder")
+
+    assert list(files) == [str(tmp_path / "folder" / "linked" / "a.txt")]
+
+
+def test_write_folder_catalog_in_batches(tmp_path):
+    for i in range(5):
+        (tmp_path / f"{i}.txt").write_text(str(i))
+    catalog_path = tmp_path / "catalog.parquet"
+
+    num_files = write_folder_catalog(tmp_path, catalog_path, batch_size=2, logger=lambda _: None)
+
+    gdf = gpd.read_parquet(catalog_path)
+    assert num_files == 5
+    assert sorted(gdf["id"]) == [f"{i}.txt" for i in range(5)]
+    item = gdf[gdf["id"] == "3.txt"].iloc[0]
+    assert item["assets"]["asset"]["href"] == str(tmp_path / "3.txt")
+    assert item["assets"]["asset"]["checksum"] == hashlib.sha1(b"3").hexdigest()
+    assert item["assets"]["asset"]["size"] == 1
+    assert item["geometry"].is_empty
+
+
+def test_write_folder_catalog_with_raster_metadata(tmp_path):
+    import numpy as np
+    import rasterio
+    from rasterio.transform import from_origin
+
+    with rasterio.open(
+        tmp_path / "image.tif", "w", driver="GTiff", width=10, height=5, count=1,
+        dtype="uint8", crs="EPSG:4326", transform=from_origin(2.0, 41.0, 0.1, 0.1),
+    ) as dst:
+        dst.update_tags(TIFFTAG_DATETIME="2024:05:01 10:30:00")
+        dst.write(np.zeros((1, 5, 10), dtype="uint8"))
+    (tmp_path / "labels.txt").write_text("labels")
+    catalog_path = tmp_path / "catalog.parquet"
+
+    write_folder_catalog(tmp_path, catalog_path, logger=lambda _: None, raster_metadata=True)
+    # metadata is cached with the checksums for the next ingestion
+    write_folder_catalog(tmp_path, catalog_path, logger=lambda _: None, raster_metadata=True)
+
+    gdf = gpd.read_parquet(catalog_path)
+    image = gdf[gdf["id"] == "image.tif"].iloc[0]
+    assert image["geometry"].bounds == (2.0, 40.5, 3.0, 41.0)
+    assert image["proj:epsg"] == 4326
+    assert list(image["proj:shape"]) == [5, 10]
+    assert str(image["datetime"]) == "2024-05-01 10:30:00"
+    labels = gdf[gdf["id"] == "labels.txt"].iloc[0]
+    assert labels["geometry"].is_empty
+    assert labels["proj:epsg"] is None or np.isnan(labels["proj:epsg"])
@@ -0,0 +1,46 @@
+import hashlib
+import os
+
+from eotdl.shared import ChecksumCache, calculate_checksum
+
+
+def test_calculate_checksum_matches_sha1(tmp_path):
+    file_path = tmp_path / "file.bin"
+    content = os.urandom(3 * 1024 * 1024 + 17)
+    file_path.write_bytes(content)
+
+    assert calculate_checksum(str(file_path)) == hashlib.sha1(content).hexdigest()
+
+
+def test_checksum_cache_only_hashes_changed_files(tmp_path):
+    a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+    a.write_text("a")
+    b.write_text("b")
+
+    cache = ChecksumCache(tmp_path)
+    checksums = cache.checksums([a, b])
+    cache.save()
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert checksums[str(a)] == (hashlib.sha1(b"a").hexdigest(), 1)
+
+    b.write_text("bb")
+    cache = ChecksumCache(tmp_path)
+    checksums = cache.checksums([a, b])
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert checksums[str(b)] == (hashlib.sha1(b"bb").hexdigest(), 2)
+
+
+def test_checksum_cache_drops_removed_files(tmp_path):
+    a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+    a.write_text("a")
+    b.write_text("b")
+    cache = ChecksumCache(tmp_path)
+    cache.checksums([a, b])
+    cache.save()
+
+    b.unlink()
+    cache = ChecksumCache(tmp_path)
+    cache.checksums([a])
+    cache.save()
+
+    assert list(ChecksumCache(tmp_path).entries) == [str(a)]
@@ -0,0 +1,56 @@
+import pandas as pd
+
+from eotdl.files.ingest import diff_catalogs
+
+
+def asset(href, checksum, size=1):
+    return {"href": href, "checksum": checksum, "size": size}
+
+
+def test_diff_catalogs_classifies_assets():
+    local = pd.DataFrame(
+        [
+            {"id": "same", "assets": {"asset": asset("/data/same", "a")}},
+            {"id": "changed", "assets": {"asset": asset("/data/changed", "new")}},
+            {"id": "new", "assets": {"asset": asset("/data/new", "c")}},
+            {"id": "link", "assets": {"asset": asset("https://example.com/link", None)}},
+        ]
+    )
+    previous = pd.DataFrame(
+        [
+            {"id": "same", "assets": {"asset": asset("https://api/stage/same", "a")}},
+            {"id": "changed", "assets": {"asset": asset("https://api/stage/changed", "old")}},
+            {"id": "deleted", "assets": {"asset": asset("https://api/stage/deleted", "d")}},
+        ]
+    )
+
+    diff, deleted_ids = diff_catalogs(local, previous)
+
+    status = dict(zip(diff["id"], diff["status"]))
+    assert status == {"same": "unchanged", "changed": "changed", "new": "new"}
+    same = diff[diff["id"] == "same"].iloc[0]
+    assert same["previous_href"] == "https://api/stage/same"
+    assert same["ix"] == 0
+    assert deleted_ids == ["deleted"]
+
+
+def test_diff_catalogs_compares_assets_without_checksum_by_size():
+    local = pd.DataFrame(
+        [
+            {"id": "same", "assets": {"asset": asset("/data/same", None, 10)}},
+            {"id": "resized", "assets": {"asset": asset("/data/resized", None, 20)}},
+            {"id": "unknown", "assets": {"asset": asset("/data/unknown", None, None)}},
+        ]
+    )
+    previous = pd.DataFrame(
+        [
+            {"id": "same", "assets": {"asset": asset("https://api/stage/same", None, 10)}},
+            {"id": "resized", "assets": {"asset": asset("https://api/stage/resized", None, 10)}},
+            {"id": "unknown", "assets": {"asset": asset("https://api/stage/unknown", None, None)}},
+        ]
+    )
+
+    diff, _ = diff_catalogs(local, previous)
+
+    status = dict(zip(diff["id"], diff["status"]))
+    assert status == {"same": "unchanged", "resized": "changed", "unknown": "changed"}
@@ -0,0 +1,113 @@
+import hashlib
+import json
+
+import requests
+
+from eotdl.repos import FilesAPIRepo
+
+MB = 1024 * 1024
+
+
+class FakeResponse:
+    def __init__(self, data, status_code=200):
+        self.status_code = status_code
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+def fake_server(content, chunks, fail_complete=False, parts=[2], chunk_size=5 * MB):
+    def fake_post(url, json=None, files=None, data=None, headers=None):
+        if url.endswith("/uploadId"):
+            # parts uploaded in a previous attempt, with the size they were uploaded with
+            upload = {"upload_id": "upload-id", "parts": parts}
+            if chunk_size is not None:
+                upload["chunk_size"] = chunk_size
+            return FakeResponse(upload)
+        if "/chunk/" in url:
+            chunk = files["file"]
+            assert data["checksum"] == hashlib.md5(chunk).hexdigest()
+            chunks[data["part_number"]] = chunk
+            return FakeResponse({"message": "Chunk uploaded"})
+        if "/complete_upload/" in url:
+            if fail_complete:
+                return FakeResponse({"detail": "Upload Id not found."}, 409)
+            return FakeResponse({"size": len(content)})
+        raise AssertionError(f"unexpected request to {url}")
+
+    return fake_post
+
+
+def setup(monkeypatch, tmp_path):
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setenv("EOTDL_MULTIPART_THRESHOLD", str(10 * MB))
+    monkeypatch.setenv("EOTDL_CHUNK_SIZE", str(5 * MB))
+    file_path = tmp_path / "large.bin"
+    content = bytes(range(256)) * (12 * 4 * 1024)  # 12 MB
+    file_path.write_bytes(content)
+    return file_path, content
+
+
+def test_large_files_are_uploaded_in_parts(monkeypatch, tmp_path):
+    file_path, content = setup(monkeypatch, tmp_path)
+    chunks = {}
+    monkeypatch.setattr(requests, "post", fake_server(content, chunks))
+
+    data, error = FilesAPIRepo("http://api/").ingest_file(
+        str(file_path), "large.bin", "dataset-id", {"id_token": "token"}, "datasets", checksum="sha1"
+    )
+
+    assert error is None
+    assert data == {"size": len(content)}
+    assert sorted(chunks) == [1, 3]
+    assert chunks[1] == content[: 5 * MB]
+    assert chunks[3] == content[10 * MB :]
+    # progress is removed once the upload is completed
+    assert list((tmp_path / "home/.cache/eotdl/uploads").iterdir()) == []
+
+
+def test_large_file_progress_is_persisted(monkeypatch, tmp_path):
+    file_path, content = setup(monkeypatch, tmp_path)
+    chunks = {}
+    monkeypatch.setattr(requests, "post", fake_server(content, chunks, fail_complete=True))
+
+    data, error = FilesAPIRepo("http://api/").ingest_file(
+        str(file_path), "large.bin", "dataset-id", {"id_token": "token"}, "datasets", checksum="sha1"
+    )
+
+    assert error == "Upload Id not found."
+    [progress_path] = list((tmp_path / "home/.cache/eotdl/uploads").iterdir())
+    progress = json.loads(progress_path.read_text())
+    assert progress["upload_id"] == "upload-id"
+    assert progress == {"upload_id": "upload-id", "file_size": len(content), "chunk_size": 5 * MB}
+
+
+def test_large_files_are_resumed_with_the_chunk_size_of_the_server(monkeypatch, tmp_path):
+    file_path, content = setup(monkeypatch, tmp_path)
+    chunks = {}
+    # the upload was started with a different EOTDL_CHUNK_SIZE
+    monkeypatch.setattr(requests, "post", fake_server(content, chunks, parts=[1], chunk_size=8 * MB))
+
+    data, error = FilesAPIRepo("http://api/").ingest_file(
+        str(file_path), "large.bin", "dataset-id", {"id_token": "token"}, "datasets", checksum="sha1"
+    )
+
+    assert error is None
+    assert sorted(chunks) == [2]
+    assert chunks[2] == content[8 * MB :]
+
+
+def test_unknown_uploads_are_not_resumed_without_chunk_size(monkeypatch, tmp_path):
+    file_path, content = setup(monkeypatch, tmp_path)
+    chunks = {}
+    # older servers do not store the chunk size, and there is no local progress
+    monkeypatch.setattr(requests, "post", fake_server(content, chunks, chunk_size=None))
+
+    data, error = FilesAPIRepo("http://api/").ingest_file(
+        str(file_path), "large.bin", "dataset-id", {"id_token": "token"}, "datasets", checksum="sha1"
+    )
+
+    assert error is None
+    assert sorted(chunks) == [1, 2, 3]
+    assert b"".join(chunks[p] for p in [1, 2, 3]) == content
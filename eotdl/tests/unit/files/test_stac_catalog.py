@@ -0,0 +1,47 @@
+import hashlib
+from datetime import datetime
+
+import geopandas as gpd
+import pystac
+from shapely.geometry import box, mapping
+
+from eotdl.files.catalog import write_stac_catalog
+
+
+def create_catalog(path, num_items):
+    catalog = pystac.Catalog(id="catalog", description="test")
+    extent = pystac.Extent(
+        pystac.SpatialExtent([[0, 0, 1, 1]]), pystac.TemporalExtent([[datetime(2024, 1, 1), None]])
+    )
+    collection = pystac.Collection(id="collection", description="test", extent=extent)
+    catalog.add_child(collection)
+    for i in range(num_items):
+        (path / f"{i}.tif").write_bytes(str(i).encode())
+        # properties differ between items, schemas of the batches have to be unified
+        properties = {"cloud_cover": i} if i % 2 else {"platform": "sentinel-2"}
+        item = pystac.Item(
+            id=f"item-{i}",
+            geometry=mapping(box(0, 0, 1, 1)),
+            bbox=[0, 0, 1, 1],
+            datetime=datetime(2024, 1, 1),
+            properties=properties,
+        )
+        item.add_asset("image", pystac.Asset(href=str(path / f"{i}.tif")))
+        collection.add_item(item)
+    catalog.normalize_and_save(str(path), catalog_type=pystac.CatalogType.SELF_CONTAINED)
+
+
+def test_write_stac_catalog_in_batches(tmp_path):
+    create_catalog(tmp_path, 5)
+    catalog_path = tmp_path / "catalog.parquet"
+
+    num_items = write_stac_catalog(tmp_path, catalog_path, batch_size=2, logger=lambda _: None)
+
+    gdf = gpd.read_parquet(catalog_path)
+    assert num_items == 5
+    assert sorted(gdf["id"]) == [f"item-{i}" for i in range(5)]
+    item = gdf[gdf["id"] == "item-3"].iloc[0]
+    assert item["cloud_cover"] == 3
+    assert item["assets"]["image"]["checksum"] == hashlib.sha1(b"3").hexdigest()
+    assert item["assets"]["image"]["size"] == 1
+    assert gdf[gdf["id"] == "item-2"].iloc[0]["platform"] == "sentinel-2"
@@ -0,0 +1,69 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from eotdl.repos import FilesAPIRepo
+
+CONTENT = os.urandom(3 * 1024 * 1024 + 17)
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.endswith("missing.tif"):
+            self.send_response(404)
+            self.end_headers()
+            return
+        content, status = CONTENT, 200
+        if "Range" in self.headers:
+            offset = int(self.headers["Range"].split("=")[1].rstrip("-"))
+            content, status = CONTENT[offset:], 206
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+def test_stage_file_url_streams_to_disk(server, tmp_path):
+    file_path = FilesAPIRepo("http://api/").stage_file_url(
+        f"{server}/dataset-id//images/image.tif", str(tmp_path), {"id_token": "token"}
+    )
+
+    assert file_path == f"{tmp_path}/images/image.tif"
+    with open(file_path, "rb") as f:
+        assert f.read() == CONTENT
+    assert os.listdir(tmp_path / "images") == ["image.tif"]
+
+
+def test_stage_file_url_leaves_no_partial_files(server, tmp_path):
+    with pytest.raises(Exception, match="Failed to stage file"):
+        FilesAPIRepo("http://api/").stage_file_url(
+            f"{server}/dataset-id//missing.tif", str(tmp_path), {"id_token": "token"}
+        )
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_stage_file_url_resumes_partial_downloads(server, tmp_path):
+    (tmp_path / "image.tif.part").write_bytes(CONTENT[:1000])
+
+    file_path = FilesAPIRepo("http://api/").stage_file_url(
+        f"{server}/dataset-id//image.tif", str(tmp_path), {"id_token": "token"}, resume=True
+    )
+
+    with open(file_path, "rb") as f:
+        assert f.read() == CONTENT
+    assert os.listdir(tmp_path) == ["image.tif"]
@@ -0,0 +1,78 @@
+import threading
+
+from eotdl.files.upload import upload_assets
+
+
+def test_upload_assets_keeps_results_in_order(monkeypatch):
+    uploaded = []
+    lock = threading.Lock()
+
+    class FakeFilesAPIRepo:
+        def ingest_file(self, href, file_name, dataset_or_model_id, user, endpoint, checksum=None, presigned_url=None):
+            with lock:
+                uploaded.append(file_name)
+            return {"presigned_url": "https://example.com"}, None
+
+    monkeypatch.setenv("EOTDL_INGEST_WORKERS", "4")
+    uploads = [
+        {"href": f"/tmp/file-{i}", "file_name": f"file-{i}", "size": 10}
+        for i in range(10)
+    ]
+
+    results, error = upload_assets(
+        FakeFilesAPIRepo(), uploads, "dataset-id", {}, "datasets", logger=lambda _: None
+    )
+
+    assert error is None
+    assert results == [True] * 10
+    assert sorted(uploaded) == sorted(u["file_name"] for u in uploads)
+
+
+def test_upload_assets_reports_errors(monkeypatch):
+    class FakeFilesAPIRepo:
+        def ingest_file(self, href, file_name, dataset_or_model_id, user, endpoint, checksum=None, presigned_url=None):
+            if file_name == "broken":
+                return None, "upload failed"
+            return {"presigned_url": "https://example.com"}, None
+
+    monkeypatch.setenv("EOTDL_INGEST_WORKERS", "1")
+    uploads = [
+        {"href": "/tmp/ok", "file_name": "ok", "size": 10},
+        {"href": "/tmp/broken", "file_name": "broken", "size": 10},
+    ]
+
+    results, error = upload_assets(
+        FakeFilesAPIRepo(), uploads, "dataset-id", {}, "datasets", logger=lambda _: None
+    )
+
+    assert results == [True, False]
+    assert "upload failed" in error
+
+
+def test_upload_assets_requests_presigned_urls_in_batches(monkeypatch):
+    batches = []
+    used_urls = []
+
+    class FakeFilesAPIRepo:
+        def generate_presigned_put_urls(self, file_names, dataset_or_model_id, user, endpoint):
+            batches.append(list(file_names))
+            return {f: f"https://s3/{f}" for f in file_names}, None
+
+        def ingest_file(self, href, file_name, dataset_or_model_id, user, endpoint, checksum=None, presigned_url=None):
+            used_urls.append(presigned_url)
+            return {"presigned_url": presigned_url}, None
+
+    monkeypatch.setenv("EOTDL_INGEST_WORKERS", "4")
+    uploads = [
+        {"href": f"/tmp/file-{i}", "file_name": f"file-{i}", "size": 10}
+        for i in range(2500)
+    ]
+
+    results, error = upload_assets(
+        FakeFilesAPIRepo(), uploads, "dataset-id", {}, "datasets", logger=lambda _: None
+    )
+
+    assert error is None
+    assert all(results)
+    assert [len(b) for b in batches] == [1000, 1000, 500]
+    assert sorted(used_urls) == sorted(f"https://s3/file-{i}" for i in range(2500))
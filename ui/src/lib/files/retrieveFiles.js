@@ -3,7 +3,14 @@ import fetch from '$lib/shared/fetcher';
 
 export default async (collection, version) => {
     let url = `${PUBLIC_EOTDL_API}/stac/collections/${collection}/items?version=${version}`;
-    const { data, error } = await fetch(url);
-    if (error) throw new Error(error);
-    return data.features;
+    let features = [];
+    // items are paginated, follow the next links to retrieve all of them
+    while (url) {
+        const { data, error } = await fetch(url);
+        if (error) throw new Error(error);
+        features = features.concat(data.features);
+        const next = data.links?.find((link) => link.rel === 'next');
+        url = next ? next.href : null;
+    }
+    return features;
 };